@@ -37,15 +37,18 @@ their terrific work into this project!
 # We'll first import a range of libraries: 
 import os
 from flask import Flask, request, redirect, session, jsonify, \
-url_for, render_template
+url_for, render_template, Response
 from flask_login import login_user, LoginManager, UserMixin, \
-logout_user, current_user
+logout_user, current_user, login_required
 import dash
 from dash import dcc, html, Input, Output, State, ALL, callback
 import pandas as pd
 import plotly.express as px
 import sqlalchemy
 import dash_bootstrap_components as dbc
+import itertools
+from app_functions_and_variables import start_table_maintenance_thread, \
+get_export_spec, generate_export_chunks, export_formats, export_slots
 
 # Exposing the Flask Server so that it can be configured for the login process:
 server = Flask(__name__)
@@ -103,10 +106,51 @@ def logout():
     return render_template('login.html', message="You have \
 now been logged out.")
 
+@server.route('/export', methods=['GET'])
+@login_required
+def export():
+    '''This route streams a pivot table or the student-level rows behind
+    it as a CSV or Parquet file. The links to this route are created by
+    create_export_links(); see the 'Streaming table exports' section of
+    app_functions_and_variables.py for more information.'''
+    try:
+        export_spec = get_export_spec(request.args)
+    except ValueError as error:
+        return jsonify({'status':'400', 'statusText':str(error)}), 400
+    if export_slots.acquire(blocking = False) == False:
+        return jsonify({'status':'503', 'statusText':'Too many exports \
+are currently running. Please try again shortly.'}), 503, {'Retry-After':'10'}
+    # Invalid specs (e.g. those with an unsupported aggregate function)
+    # have already been rejected by get_export_spec(). The first chunk is
+    # still created before the response begins so that any unexpected
+    # error will produce a 500 response rather than a truncated file.
+    export_chunks = generate_export_chunks(export_spec)
+    try:
+        first_chunk = next(export_chunks, b'')
+    except Exception:
+        export_slots.release()
+        raise
+    response = Response(itertools.chain([first_chunk], export_chunks),
+    mimetype = export_formats[export_spec['format']],
+    headers = {'Content-Disposition':f"attachment; \
+filename={export_spec['table_name']}_{export_spec['level']}.\
+{export_spec['format']}"})
+    # Once the download finishes (or the user cancels it), the export's
+    # generator is closed (which releases its table) and its slot is
+    # freed up for another export:
+    response.call_on_close(export_chunks.close)
+    response.call_on_close(export_slots.release)
+    return response
+
 app = dash.Dash(
     __name__, server=server, use_pages=True, suppress_callback_exceptions=True,
     external_stylesheets=[dbc.themes.BOOTSTRAP])
 
+# Starting the background thread that removes idle tables from memory:
+# (See the table_cache section of app_functions_and_variables.py for
+# more information.)
+start_table_maintenance_thread()
+
 # In a real-life app with actual data to protect, I would move these
 # username and password pairs out of the source code.
 VALID_USERNAME_PASSWORD = {"test": "test", "hello": "world"}
@@ -10,15 +10,43 @@
 # functions stored here within multiple parts of the app.
 
 import plotly.express as px
+import plotly.graph_objects as go
+import plotly.io as pio
 import pandas as pd
+import numpy as np
 import platform
+import os
+import json
+import urllib.parse
+import hashlib
+import base64
+import io
+import time
+import threading
+import contextlib
+import itertools
+import collections
+from concurrent.futures import ThreadPoolExecutor
 import sqlalchemy
+import pyarrow
+import pyarrow.feather
+import pyarrow.parquet
 import dash_bootstrap_components as dbc
 # This is a great library for enhancing both the look and functionality of 
 # the app.
 # See https://dash-bootstrap-components.opensource.faculty.ai/examples/iris/#sourceCode
 import dash
-from dash import Dash, html, dcc, Output, Input
+from dash import Dash, html, dcc, Output, Input, Patch, dash_table
+
+# The app's cached tables are shared by every callback, so the pivot and
+# chart functions below avoid copying them. Instead, they rely on pandas'
+# copy-on-write behavior: DataFrames derived from a cached table (through
+# filtering, column selection, or shallow copies) share its data until one
+# of them gets modified, at which point only the modified columns get
+# copied. Copy-on-write is always enabled in pandas 3.0 and later; for
+# earlier versions, it needs to be turned on here.
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option('mode.copy_on_write', True)
 
 
 # Determining where the program is being run and how to access data:
@@ -47,6 +75,107 @@ read_from_online_db = False # When both this variable and offline_mode are set
 # will always read from the online database regardless of the value of
 # read_from_online_db.)
 
+use_database_aggregation = False # When this variable is set to True (and
+# the app is reading from the online database), the dashboards' pivot tables
+# will be calculated by the database via GROUP BY queries rather than within
+# pandas. (See aggregate_in_database() for more information.) The app
+# therefore won't need to keep the student-level tables in memory, which
+# can be helpful for districts with very large tables.
+
+use_snapshot_cache = True # When this variable is set to True,
+# retrieve_data_from_table() will save a copy of each table it retrieves
+# as a Parquet file within snapshot_folder. Later startups can then read
+# this typed, columnar copy (which is much faster than re-parsing a .csv file
+# or running a full query against the online database) as long as the
+# source data hasn't changed in the meantime.
+
+snapshot_folder = 'table_snapshots' # This folder will be created
+# within the app's working directory if it doesn't exist already.
+# Note that the Cloud Run filesystem only lasts as long as a given instance,
+# so you'll need to include this folder within your container image
+# (or mount it as a volume) in order for new instances to benefit from it.
+
+use_shared_dataset = False # When this variable is set to True, the first
+# worker process to load a given table will publish the prepared table to
+# shared_dataset_folder as an Arrow IPC file. All workers (including the
+# one that published it) will then memory-map this file rather than
+# keeping their own copy of the table. This allows the number of gunicorn
+# workers specified within the Dockerfile to be increased without also 
+# multiplying the amount of memory that the tables require.
+
+shared_dataset_folder = '/dev/shm/dsd_shared_tables' # /dev/shm is stored
+# in memory, so reading from this folder won't require any disk access.
+
+snapshot_format_version = 3 # Incrementing this number will invalidate all
+# existing snapshots. (This is useful if you change the way in which
+# tables get processed before they are saved.)
+
+# The following dictionary specifies the column that the snapshot cache
+# will use to check whether an online database table has changed. (See
+# get_source_signature() for more information.)
+table_key_columns = {'curr_enrollment':'Student_ID',
+'test_results':'Student_ID', 'grad_outcomes':'Student_ID'}
+
+startup_loader_threads = 4 # The number of tables that
+# load_registered_tables() will retrieve at the same time
+
+# The following settings determine how many database connections the
+# app's SQLAlchemy engine can hold open at once. database_pool_size should be
+# at least as large as startup_loader_threads (so that every table can be
+# retrieved at the same time during startup) and as the number of gunicorn
+# threads specified within the Dockerfile (so that concurrent callbacks
+# don't need to wait for a connection).
+database_pool_size = 8
+database_max_overflow = 4
+
+csv_chunk_size = 100000 # The number of rows that retrieve_data_from_source()
+# will read at a time when filtering a local .csv file
+
+# Declaring the data types that each table's columns should use once they
+# have been imported:
+# Columns with a small number of repeated values (such as School or Gender)
+# are stored as categoricals, which replace each string with a small
+# integer code. Numeric columns are downcast to the smallest type that can
+# hold their values, and free-text columns (such as names and addresses)
+# are stored as Arrow-backed strings. Together, these changes greatly reduce
+# the amount of memory that each table requires, and they also make
+# filtering and pivoting faster.
+# (Columns that don't appear in a table's schema will retain the data type
+# that pandas assigned to them.)
+dimension_dtypes = {'Full_School_Name':'category', 'School':'category',
+'Grade':'category', 'Gender':'category', 'Race':'category',
+'Ethnicity':'category', 'Period':'category', 'Outcome':'category'}
+
+# Specifying the order in which the values of certain dimension columns
+# should appear within charts, tables, and filter menus:
+# (Without this ordering, these values would be sorted alphabetically, so K
+# would appear after 12 and Spring would appear before Fall.)
+# apply_table_schema() stores each of these columns as an ordered
+# categorical column whose categories follow this order. Pivot tables are
+# sorted by category code, so they will already be in the correct order
+# when they are created. Values that aren't listed here will be placed after
+# the listed values in sorted order, and a value of None indicates that the
+# column's values should simply be sorted. (Starting_Year is stored as an
+# integer column rather than a categorical one, so its order is only used
+# for filter menus.)
+ordered_dimensions = {
+    'Grade':['K'] + [str(grade) for grade in range(1, 13)],
+    'Period':['Fall', 'Winter', 'Spring'],
+    'Starting_Year':None,
+    'Outcome':['4 Year College', '2 Year College', 'Trade School',
+    'Employment', 'Other/Unknown']}
+
+text_dtypes = {column:'string[pyarrow]' for column in ['First_Name',
+'Last_Name', 'Street', 'City', 'State', 'Zip', 'Address', 'geometry']}
+
+table_schemas = {
+    'curr_enrollment': {**dimension_dtypes, **text_dtypes,
+    'Student_ID':'int32', 'Students':'int8', 'Grade_for_Sorting':'int8'},
+    'test_results': {**dimension_dtypes, 'Student_ID':'int32',
+    'Starting_Year':'int16', 'Score':'float32'},
+    'grad_outcomes': {**dimension_dtypes, 'Student_ID':'int32',
+    'Starting_Year':'int16', 'Students':'int8'}}
+
 def create_database_engine():
     '''This function allows us to create a SQLAlchemy engine that can connect
     to our database. 
@@ -98,8 +227,13 @@ def create_database_engine():
     # https://help.heroku.com/ZKNTJQSK/why-is-sqlalchemy-1-4-x-not-connecting-to-heroku-postgres
 
     elephantsql_engine = sqlalchemy.create_engine(
-    elephantsql_db_url_for_sqlalchemy)
+    elephantsql_db_url_for_sqlalchemy, pool_size = database_pool_size,
+    max_overflow = database_max_overflow, pool_pre_ping = True)
     # See https://docs.sqlalchemy.org/en/20/core/engines.html
+    # and https://docs.sqlalchemy.org/en/20/core/pooling.html
+    # (pool_pre_ping allows the engine to replace connections that the
+    # database closed while they were idle.)
+    # This single engine is shared by all of the app's threads.
     return elephantsql_engine
 
 # Using create_database_engine() to create an elephantsql engine that we can
@@ -109,80 +243,1925 @@ def create_database_engine():
 if (offline_mode == False) or (read_from_online_db == True): 
     elephantsql_engine = create_database_engine()
 
-def retrieve_data_from_table(table_name):
-    '''This function retrieves all data from a given database table. This
+def reading_from_local_csv():
+    '''Returns True if tables should be read from local .csv files and
+    False if they should instead be read from the online database.'''
+    # The file will be read locally, rather than from the online database,
+    # only if both of these conditions are met.
+    return (offline_mode == True) and (read_from_online_db == False)
+
+
+def aggregating_in_database():
+    '''Returns True if the dashboards' pivot tables should be calculated
+    by the online database (see use_database_aggregation) and False if
+    they should instead be calculated from tables loaded into memory.'''
+    return (use_database_aggregation == True) and (
+        reading_from_local_csv() == False)
+
+
+def get_source_signature(table_name):
+    '''This function returns a small dictionary that describes the current
+    state of the source of a given table. If this dictionary differs from
+    the one saved alongside a table's snapshot, the snapshot is out of date.
+
+    For local .csv files, the signature consists of the file's modification
+    time and size, both of which can be retrieved without opening the file.
+    For online database tables, the signature consists of the table's row
+    count and the maximum value of its key column (as specified within
+    table_key_columns). Retrieving these two values is far cheaper than
+    retrieving the entire table, but it will still catch most updates
+    (such as nightly data loads that add or remove rows).'''
+
+    if reading_from_local_csv():
+        file_stats = os.stat(f'../{table_name}.csv')
+        return {'source':'csv', 'mtime_ns':file_stats.st_mtime_ns,
+        'size':file_stats.st_size,
+        'format_version':snapshot_format_version}
+
+    key_column = table_key_columns.get(table_name, 'Student_ID')
+    with elephantsql_engine.connect() as connection:
+        row_count, max_key = connection.execute(sqlalchemy.text(
+            f"select count(*), max({key_column}) from {table_name}")).one()
+    # max_key is converted to a string so that the signature can be
+    # saved as JSON regardless of the key column's data type.
+    return {'source':'sql', 'row_count':int(row_count),
+    'max_key':str(max_key), 'format_version':snapshot_format_version}
+
+
+def filter_rows(df, filters):
+    '''This function returns the rows within df that match all of the
+    filters passed to the filters argument. This argument uses the same
+    format as the filter_list argument of create_pivot_for_charts():
+    a list of tuples whose first component is a column name and whose
+    second component is a list of values to include.'''
+
+    for column, values in filters:
+        if dimension_dtypes.get(column) == 'category':
+            # Dimension columns will later be converted to strings by
+            # apply_table_schema(), so we'll compare them as strings here.
+            # (This allows a filter value of '12' to match a Grade column
+            # that pandas imported as integers.)
+            df = df[df[column].astype('str').isin(
+                [str(value) for value in values])]
+        else:
+            df = df[df[column].isin(values)]
+    return df
+
+
+def get_dimension_domains(df, dimensions):
+    '''This function returns a dictionary that describes the values found
+    within each of the dimension columns passed to dimensions. Each
+    column is mapped to a dictionary containing a set of the column's
+    non-missing values ('values') and whether the column has any missing
+    values ('has_missing_values'). remove_unrestrictive_filters() uses
+    these domains to find filters that won't exclude any rows.'''
+    return {column:{'values':set(df[column].dropna().unique().tolist()),
+    'has_missing_values':bool(df[column].isna().any())}
+    for column in dimensions}
+
+
+def remove_unrestrictive_filters(filter_list, dimension_domains):
+    '''This function returns a copy of filter_list that excludes any
+    filters that select every value within their column. (These filters
+    won't remove any rows, so there's no need to apply them.) The
+    dashboards' filter menus select every value by default, so this step
+    often removes all of the filters.
+
+    A filter on a column with missing values is always kept, since those
+    missing values won't match any of the values within the filter.'''
+    remaining_filters = []
+    for column, values in filter_list:
+        domain = dimension_domains.get(column)
+        if ((domain is None) or (domain['has_missing_values'] == True)
+            or (domain['values'].issubset(values) == False)):
+            remaining_filters.append((column, values))
+    return remaining_filters
+
+
+def create_filter_mask(df, filter_list):
+    '''This function returns a Boolean NumPy array that indicates which
+    rows within df match all of the filters within filter_list.
+    (This argument uses the same format as the filter_list argument of
+    create_pivot_for_charts().)
+
+    For categorical columns, the filter values are first converted into
+    category codes, which allows each row's code to be checked without
+    comparing any strings. All of the filters are combined into a single
+    mask, so df only needs to be indexed once.'''
+    row_mask = np.ones(len(df), dtype = 'bool')
+    for column, values in filter_list:
+        if isinstance(df[column].dtype, pd.CategoricalDtype):
+            selected_codes = df[column].cat.categories.get_indexer(
+                pd.Index(values, dtype = 'object'))
+            row_mask &= np.isin(df[column].cat.codes.to_numpy(),
+            selected_codes[selected_codes >= 0])
+        else:
+            row_mask &= df[column].isin(values).to_numpy()
+    return row_mask
+
+
+def retrieve_data_from_source(table_name, columns = None, filters = None):
+    '''This function retrieves data from a given database table. This
     may be performed online or through an offline import of a .csv file
     containing a copy of this table.
 
-    If you only need a portion of the data stored in a given table,
-    your app may run faster if you define and use a separate read_sql()
-    call that retrieves only that portion of the data.
+    columns: A list of the columns to retrieve. If this is set to None,
+    all columns will be retrieved. Requesting only the columns that
+    your code actually uses reduces both transfer times and memory usage.
+    It also keeps sensitive fields, such as names and addresses, out of
+    the app.
+
+    filters: An optional list of (column, values) tuples that specify
+    which rows to retrieve. (See filter_rows() for more details.)
 
-    In order for this function to work correctly, 
-    the name of the offline .csv file that contains the table 
+    When reading from the online database, the columns and filters will be
+    converted into a SELECT ... WHERE query so that only the requested
+    data gets transferred. When reading from a local .csv file, the
+    columns will be passed to read_csv()'s usecols argument, and the
+    filters will be applied to each chunk of the file as it is read.
+
+    In order for this function to work correctly,
+    the name of the offline .csv file that contains the table
     must be the same as the table name within the online database.'''
 
     print("offline_mode is set to:", offline_mode)
     print("read_from_online_db is set to:", read_from_online_db)
-    if (offline_mode == True) and (read_from_online_db == False):
+    if reading_from_local_csv():
         print("Reading from local .csv file")
-        # The file will be read locally, rather than from the online database,
-        # only if both of these conditions are met.
-        df_query = pd.read_csv(f'../{table_name}.csv')
+        if filters is None:
+            df_query = pd.read_csv(f'../{table_name}.csv', usecols = columns)
+        else:
+            # Reading the file in chunks allows rows that don't match the
+            # filters to be discarded before the entire file is in memory.
+            df_query = pd.concat([filter_rows(chunk, filters) for chunk
+            in pd.read_csv(f'../{table_name}.csv', usecols = columns,
+            chunksize = csv_chunk_size)], ignore_index = True)
     else:
         print("Reading from online database")
-        df_query = pd.read_sql(f"select * from {table_name}", 
-        con = elephantsql_engine)
-        
+        # sqlalchemy.column() will quote column names when needed
+        # (e.g. because they contain uppercase letters), and the filter
+        # values will be sent to the database as bound parameters.
+        if columns is None:
+            selected_columns = [sqlalchemy.text('*')]
+        else:
+            selected_columns = [sqlalchemy.column(column)
+            for column in columns]
+        query = sqlalchemy.select(*selected_columns).select_from(
+            sqlalchemy.table(table_name))
+        if filters is not None:
+            for column, values in filters:
+                query = query.where(sqlalchemy.column(column).in_(values))
+        df_query = pd.read_sql(query, con = elephantsql_engine)
+
     return df_query
 
-# Retrieving all current enrollment data: 
-# (Initializing df_curr_enrollment
-# here will make it easier, and perhaps faster,
-# to use this data within multiple DataFrames.)
-df_curr_enrollment = retrieve_data_from_table(table_name = 'curr_enrollment')
+
+def get_dimension_order(column, values):
+    '''This function returns a list of the unique values passed to values
+    sorted in the order specified for column within ordered_dimensions.
+    (Values that aren't listed there, along with the values of columns
+    that don't appear in ordered_dimensions, are sorted normally.)'''
+    listed_values = ordered_dimensions.get(column) or []
+    values = set(values)
+    return [value for value in listed_values if value in values] + sorted(
+        value for value in values if value not in listed_values)
+
+
+def apply_table_schema(df, table_name, columns = None):
+    '''This function converts the columns within df to the data types
+    specified for table_name within table_schemas, then returns the
+    updated DataFrame. (Categorical columns that appear within
+    ordered_dimensions will be stored as ordered categoricals.)
+
+    columns: An optional list of the columns to convert. If this is set
+    to None, all columns found within the table's schema will be
+    converted.'''
+
+    for column, dtype in table_schemas.get(table_name, {}).items():
+        if column not in df.columns:
+            continue
+        if (columns is not None) and (column not in columns):
+            continue
+        if dtype == 'category':
+            # Dimension values are converted to strings before being
+            # stored as categories. This ensures that columns like Grade,
+            # which will be imported as integers if they don't contain any
+            # 'K' values, will always match the string values found within
+            # other tables (and within the filter menus).
+            # (The where() call keeps missing values from being converted
+            # to 'nan' strings.)
+            values = df[column].astype('str').where(df[column].notna())
+            if column in ordered_dimensions:
+                df[column] = values.astype(pd.CategoricalDtype(
+                    get_dimension_order(column, values.dropna().unique()),
+                    ordered = True))
+            else:
+                df[column] = values.astype('category')
+        else:
+            df[column] = df[column].astype(dtype)
+    return df
+
+
+def make_table_read_only(df):
+    '''This function returns a version of df whose columns are backed by
+    read-only arrays. (For categorical columns, the codes are made
+    read-only.) The new DataFrame shares its data with df rather than
+    copying it.
+
+    Tables stored within table_cache are shared by all callbacks, so any
+    attempt to modify one of them in place would affect every other user.
+    Making these tables read-only turns such an attempt into an immediate
+    error (e.g. 'assignment destination is read-only') rather than a
+    silent change to the cached data. Filtering, grouping, and pivoting
+    aren't affected, and, thanks to copy-on-write, DataFrames derived
+    from these tables can still be modified freely.
+
+    Columns that aren't backed by NumPy arrays (such as Arrow-backed
+    string columns) are already immutable, so they're left as they are.'''
+    read_only_columns = {}
+    for column in df.columns:
+        values = df[column].array
+        if isinstance(df[column].dtype, pd.CategoricalDtype):
+            codes = values.codes.view()
+            codes.flags.writeable = False
+            values = pd.Categorical.from_codes(codes,
+            dtype = df[column].dtype)
+        elif isinstance(values, pd.arrays.NumpyExtensionArray):
+            values = values.to_numpy().view()
+            values.flags.writeable = False
+        read_only_columns[column] = values
+    return pd.DataFrame(read_only_columns, index = df.index, copy = False)
+
+
+def retrieve_data_from_table(table_name, columns = None, filters = None,
+    use_snapshot = None):
+    '''This function retrieves data from a given table. If the snapshot
+    cache is enabled, it will first check whether an up-to-date snapshot
+    of the table exists within snapshot_folder; if so, the table will be
+    read from this snapshot. Otherwise, the table will be read from its
+    source (via retrieve_data_from_source()), and a new snapshot will then
+    be saved so that later startups can skip this step.
+
+    In either case, the columns within the table will use the data types
+    specified within table_schemas. (Parquet files preserve these types,
+    so they don't need to be reapplied when reading from a snapshot.)
+
+    columns and filters: These arguments allow you to retrieve only part
+    of a table. See retrieve_data_from_source() for more details.
+
+    use_snapshot: Set to True or False to override the value of
+    use_snapshot_cache for this particular call.'''
+
+    if use_snapshot is None:
+        use_snapshot = use_snapshot_cache
+    if use_snapshot == False:
+        return apply_table_schema(retrieve_data_from_source(
+            table_name, columns, filters), table_name)
+
+    # Each combination of columns and filters needs its own snapshot.
+    # Therefore, if either argument was used, a short hash of the two
+    # arguments will be added to the snapshot's name.
+    snapshot_name = table_name
+    if (columns is not None) or (filters is not None):
+        request_description = json.dumps([columns, filters], default = str)
+        snapshot_name += '_' + hashlib.sha1(
+            request_description.encode()).hexdigest()[:10]
+    snapshot_path = f'{snapshot_folder}/{snapshot_name}.parquet'
+    signature_path = f'{snapshot_folder}/{snapshot_name}_signature.json'
+    source_signature = get_source_signature(table_name)
+
+    if os.path.exists(snapshot_path) and os.path.exists(signature_path):
+        with open(signature_path) as file:
+            snapshot_signature = json.load(file)
+        if snapshot_signature == source_signature:
+            print(f"Reading {table_name} from snapshot")
+            try:
+                return pd.read_parquet(snapshot_path)
+            except (ImportError, OSError, ValueError) as error:
+                # If the snapshot can't be read (e.g. because it is
+                # corrupted or because pyarrow isn't installed), we'll
+                # simply fall back to the original source.
+                print(f"Unable to read snapshot for {table_name}:", error)
+        else:
+            print(f"Snapshot for {table_name} is out of date")
+
+    df_query = apply_table_schema(retrieve_data_from_source(
+        table_name, columns, filters), table_name)
+
+    # Saving the snapshot and its signature. Both files are first written to
+    # temporary paths and then renamed so that other processes that start up
+    # at the same time will never read a partially-written snapshot.
+    # The signature is written last so that it will only match a
+    # complete snapshot.
+    try:
+        os.makedirs(snapshot_folder, exist_ok = True)
+        process_id = os.getpid()
+        df_query.to_parquet(f'{snapshot_path}.{process_id}.tmp',
+        index = False)
+        os.replace(f'{snapshot_path}.{process_id}.tmp', snapshot_path)
+        with open(f'{signature_path}.{process_id}.tmp', 'w') as file:
+            json.dump(source_signature, file)
+        os.replace(f'{signature_path}.{process_id}.tmp', signature_path)
+        print(f"Saved snapshot for {table_name}")
+    except (ImportError, OSError) as error:
+        # A failure to save a snapshot shouldn't prevent the app from
+        # running, so we'll just report the error here.
+        print(f"Unable to save snapshot for {table_name}:", error)
+
+    return df_query
 
 # Defining a standard set of values by which we would like to compare
 # our fictional student data:
 enrollment_comparisons = ['School', 'Grade', 'Gender',
 'Race', 'Ethnicity'] 
 
+# The dashboards only need the following columns from the current enrollment
+# table. (Columns like First_Name, Last_Name, and Address will therefore
+# never be loaded into the app.)
+curr_enrollment_columns = ['Student_ID'] + enrollment_comparisons + [
+'Students']
+
 # The following code creates a copy of enrollment_comparisons with a
 # 'None' option
 # so that users can choose not to select a given value.
 enrollment_comparisons_plus_none = enrollment_comparisons.copy()
 enrollment_comparisons_plus_none.append('None')
 
-# This dictionary will be used to help order grades correctly within charts.
-# Without this reordering, K will often appear at the end of grade-based
-# charts.
-grade_reordering_map = {'K':0, '1':1, '2':2, '3':3, '4':4, '5':5, '6':6, 
-        '7':7, '8':8, '9':9, '10':10, '11':11, '12':12, 1:1, 2:2, 3:3, 
-        4:4, 5:5, 6:6, 7:7, 8:8, 9:9, 10:10, 11:11, 12:12} 
-
-
-def merge_demographics_into_df(df):
-    '''This function merges demographic variables from df_current_enrollment
-    into the DataFrame passed to df, then returns the new version
-    of the DataFrame.'''
-
-    # Creating a copy of df_current_enrollment that only contains 
-    # Student IDs (which will serve as the key for the merge) and 
-    # the demographic values contained in enrollment_comparisons:
-    df_curr_enrollment_for_merge = df_curr_enrollment.copy(
-    )[['Student_ID'] + enrollment_comparisons]
-    # Some of these demographic values may already be present within 
-    # the DataFrame, in which case they should be removed from
-    # df_curr_enrollment_for_merge so that we don't end up with multiple
-    # copies of the same column.
-    for column in df.columns:
-        if column in enrollment_comparisons:
-            df_curr_enrollment_for_merge.drop(column, 
-                axis = 1, inplace = True)
+
+def merge_demographics_into_df(df, df_demographics = None):
+    '''This function merges demographic variables from df_demographics
+    (which defaults to the curr_enrollment table) into the DataFrame
+    passed to df, then returns the new version of the DataFrame.'''
+
+    if df_demographics is None:
+        df_demographics = get_table('curr_enrollment')
+
+    # Selecting the Student IDs within df_demographics (which will serve
+    # as the key for the merge) along with the demographic values
+    # contained in enrollment_comparisons. Some of these demographic
+    # values may already be present within the DataFrame, in which case
+    # they are skipped so that we don't end up with multiple copies of
+    # the same column. (df_demographics may be a read-only cached table,
+    # so these columns are selected rather than copied and then dropped
+    # in place.)
+    df_curr_enrollment_for_merge = df_demographics[['Student_ID'] + [
+        column for column in enrollment_comparisons
+        if column not in df.columns]]
     return df.merge(df_curr_enrollment_for_merge, 
         on = 'Student_ID', how = 'left')
 
 
+# Registering the tables that the app will use:
+
+# Each entry within registered_tables describes how to load one of the
+# app's tables. Defining these entries in one place allows
+# load_registered_tables() to retrieve all of them at the same time
+# (rather than one after another as each page gets imported).
+registered_tables = {}
+
+def register_table(table_name, columns = None, filters = None,
+    prepare_function = None, dependencies = [], join_table = None,
+    dimensions = [], measures = [], sketched_measures = [],
+    distinct_measures = []):
+    '''This function adds a table to registered_tables.
+
+    columns and filters: The columns and rows to retrieve from the table.
+    (See retrieve_data_from_source() for more details.)
+
+    prepare_function: An optional function that will be applied to the
+    table after it has been retrieved. This function should accept two
+    arguments: the table itself and a dictionary of the other tables that
+    have already been loaded. It should then return the prepared table.
+
+    dependencies: A list of the tables that prepare_function needs.
+    These tables will be prepared before this one.
+
+    join_table: An optional table whose columns will be joined onto this
+    table (via Student_ID) when aggregate_in_database() needs a column
+    that this table doesn't have. This allows database queries to
+    reproduce any merges performed by prepare_function.
+
+    dimensions: The columns by which the dashboards group and filter the
+    table (such as School or Period). build_aggregation_cube() and
+    build_bitmap_index() use these columns to create the table's
+    aggregation cube and bitmap index. If this list is empty, neither
+    will be created.
+
+    measures: The columns (such as Students or Score) that the
+    dashboards aggregate. build_aggregation_cube() will calculate the
+    sum and count of each of these columns.
+
+    sketched_measures: The measures (such as Score) whose medians and
+    percentiles the dashboards display. build_aggregation_cube() will
+    also store quantile sketches of these columns.
+
+    distinct_measures: The measures within distinct_count_columns (such as
+    Unique_Students) that the table's aggregation cube should support.
+    build_aggregation_cube() will store distinct count sketches of the
+    columns that these measures count.'''
+
+    registered_tables[table_name] = {'columns':columns, 'filters':filters,
+    'prepare_function':prepare_function, 'dependencies':dependencies,
+    'join_table':join_table, 'dimensions':dimensions,
+    'measures':measures, 'sketched_measures':sketched_measures,
+    'distinct_measures':distinct_measures}
+
+
+def prepare_test_results(df, loaded_tables):
+    '''The test_results table doesn't have all of the demographic
+    values on which we want users to be able to filter,
+    so this function uses merge_demographics_into_df() to add in those
+    extra values.'''
+    return merge_demographics_into_df(df, loaded_tables['curr_enrollment'])
+
+
+register_table('curr_enrollment', columns = curr_enrollment_columns,
+dimensions = enrollment_comparisons, measures = ['Students'],
+distinct_measures = ['Unique_Students'])
+
+register_table('test_results', columns = ['Student_ID', 'School', 'Grade',
+'Period', 'Score'], prepare_function = prepare_test_results,
+dependencies = ['curr_enrollment'], join_table = 'curr_enrollment',
+dimensions = ['Period'] + enrollment_comparisons,
+measures = ['Score'], sketched_measures = ['Score'],
+distinct_measures = ['Unique_Students'])
+
+# (Full_School_Name is excluded from this table because the Grad Outcomes
+# page uses the abbreviated School column instead.)
+register_table('grad_outcomes', columns = ['Student_ID', 'Starting_Year',
+'School', 'Grade', 'Gender', 'Race', 'Ethnicity', 'Outcome', 'Students'],
+dimensions = ['Starting_Year', 'Outcome'] + enrollment_comparisons,
+measures = ['Students'], distinct_measures = ['Unique_Students'])
+
+
+# Aggregating rows by their category codes:
+
+# pivot_table() is designed to handle any combination of index columns
+# and aggregate functions, which adds a great deal of overhead to the
+# simple sums and means that the dashboards need. Therefore, 
+# group_by_codes() uses a faster approach. It first combines the integer
+# codes of each grouping column into a single 'mixed-radix' group ID
+# (much like the digits of a number), then uses np.bincount() to sum
+# and count the values within each group in a single pass.
+bincount_aggregate_functions = ['sum', 'count', 'mean']
+
+bincount_max_groups = 2 ** 24 # If the number of possible groups (i.e. the
+# product of the number of values within each grouping column) exceeds
+# this limit, group_by_codes() won't be used, since the arrays that
+# np.bincount() creates would take up too much memory.
+
+
+def group_by_codes(df, group_columns, value_columns,
+    return_group_positions = False, include_missing_groups = False):
+    '''This function groups df by the columns within group_columns, then
+    sums and counts the non-missing values within each of the columns in
+    value_columns. Only groups that contain at least one row are
+    included, and rows with missing group values are left out (just as
+    they would be by pivot_table()). The groups are sorted in the same
+    order that pivot_table() would use.
+
+    Returns a tuple containing (1) a DataFrame with one row for each
+    group and one column for each grouping column; (2) a dictionary that
+    maps each value column to an array of its sums; and (3) a dictionary
+    that maps each value column to an array of its counts. Integer sums
+    are returned as 64-bit integers; all other sums are returned as 64-bit
+    floats. If group_columns is empty, all rows will be placed within a
+    single group.
+
+    If return_group_positions is True, a fourth item will be returned:
+    an array that contains, for each row within df, the position of the
+    row's group within the grouped DataFrame (or -1 if the row was left
+    out because of a missing group value).
+
+    If include_missing_groups is True, rows with missing group values
+    will be kept, and missing values will be treated as a group value of
+    their own (as with groupby(dropna = False)). The grouped DataFrame
+    can then be rolled up to fewer group columns without losing any rows.
+
+    Returns None if the number of possible groups exceeds
+    bincount_max_groups.'''
+    group_ids = np.zeros(len(df), dtype = 'int64')
+    valid_rows = np.ones(len(df), dtype = 'bool')
+    group_count = 1
+    column_levels = []
+    for column in group_columns:
+        if isinstance(df[column].dtype, pd.CategoricalDtype):
+            codes = df[column].cat.codes.to_numpy()
+            levels = df[column].dtype
+            level_count = len(levels.categories)
+        else:
+            codes, levels = pd.factorize(df[column], sort = True)
+            level_count = len(levels)
+        if include_missing_groups == True:
+            # Missing values (which have a code of -1) will receive a code
+            # of 0, and all other codes will be shifted up by one.
+            codes = codes.astype('int64') + 1
+            level_count += 1
+        group_count *= level_count
+        if group_count > bincount_max_groups:
+            return None
+        # Adding this column's codes as the next 'digit' of each group ID:
+        # (Missing values have a code of -1; these rows are removed below.)
+        group_ids = group_ids * level_count + codes
+        valid_rows &= (codes >= 0)
+        column_levels.append((column, level_count, levels))
+
+    if valid_rows.all() == False:
+        group_ids = group_ids[valid_rows]
+    row_counts = np.bincount(group_ids, minlength = group_count)
+    present_groups = np.flatnonzero(row_counts)
+
+    sums = {}
+    counts = {}
+    for column in value_columns:
+        values = df[column].to_numpy()
+        if values.dtype.kind not in 'biuf':
+            # (e.g. because the column uses a nullable data type)
+            values = df[column].to_numpy(dtype = 'float64',
+            na_value = np.nan)
+        if len(values) != len(group_ids):
+            values = values[valid_rows]
+        column_group_ids = group_ids
+        column_counts = row_counts
+        # Missing values are excluded from both the sums and the counts:
+        # (Only float columns can contain them.)
+        if values.dtype.kind == 'f':
+            non_missing_values = ~np.isnan(values)
+            if non_missing_values.all() == False:
+                values = values[non_missing_values]
+                column_group_ids = group_ids[non_missing_values]
+                column_counts = np.bincount(column_group_ids,
+                minlength = group_count)
+        sums[column] = np.bincount(column_group_ids, weights = values,
+        minlength = group_count)[present_groups]
+        if values.dtype.kind in 'biu':
+            sums[column] = sums[column].astype('int64')
+        counts[column] = column_counts[present_groups]
+
+    # Converting each group ID back into the values of the grouping
+    # columns, starting with the last (i.e. least significant) column:
+    group_values = {}
+    remaining_ids = present_groups
+    for column, level_count, levels in reversed(column_levels):
+        codes = remaining_ids % level_count
+        remaining_ids = remaining_ids // level_count
+        if include_missing_groups == True:
+            codes = codes - 1
+        if isinstance(levels, pd.CategoricalDtype):
+            group_values[column] = pd.Categorical.from_codes(codes,
+            dtype = levels)
+        elif include_missing_groups == True:
+            group_values[column] = levels.take(np.maximum(codes, 0)).where(
+                codes >= 0)
+        else:
+            group_values[column] = levels.take(codes)
+    df_groups = pd.DataFrame({column:group_values[column]
+    for column in group_columns}, index = pd.RangeIndex(len(present_groups)))
+    if return_group_positions == True:
+        group_positions = np.full(group_count, -1, dtype = 'int64')
+        group_positions[present_groups] = np.arange(len(present_groups))
+        row_positions = np.full(len(df), -1, dtype = 'int64')
+        row_positions[valid_rows] = group_positions[group_ids]
+        return df_groups, sums, counts, row_positions
+    return df_groups, sums, counts
+
+
+def pivot_with_bincount(df, y_value, index_columns, pivot_aggfunc):
+    '''This function uses group_by_codes() to create the same DataFrame
+    that the following code would produce:
+    df.pivot_table(index = index_columns, values = y_value,
+    aggfunc = pivot_aggfunc, observed = True).reset_index()
+    (If index_columns is empty, the DataFrame will contain a single row
+    with the aggregated value for the entire table.)
+
+    Returns None if pivot_aggfunc isn't one of the functions within
+    bincount_aggregate_functions, if y_value isn't numeric, or if
+    group_by_codes() can't handle the request.'''
+    if ((pivot_aggfunc not in bincount_aggregate_functions)
+        or (df[y_value].dtype.kind not in 'biuf')):
+        return None
+    grouped_data = group_by_codes(df, index_columns, [y_value])
+    if grouped_data is None:
+        return None
+    df_pivot, sums, counts = grouped_data
+    if pivot_aggfunc == 'mean':
+        # Groups without any y values would have a missing mean, so
+        # they are removed (just as pivot_table() would remove them).
+        groups_with_values = counts[y_value] > 0
+        df_pivot = df_pivot[groups_with_values].reset_index(drop = True)
+        df_pivot[y_value] = (sums[y_value][groups_with_values]
+        / counts[y_value][groups_with_values])
+    elif pivot_aggfunc == 'sum':
+        df_pivot[y_value] = sums[y_value]
+    else:
+        df_pivot[y_value] = counts[y_value]
+    return df_pivot
+
+
+def create_group_labels(df, label_columns):
+    '''This function returns a categorical array that contains, for each
+    row within df, the values of the columns in label_columns joined
+    together by spaces. (For instance, a row with a School value of 'DA'
+    and a Grade value of '9' would receive a label of 'DA 9'.) These
+    labels serve as the x values of the dashboards' charts.
+
+    Rather than converting every value within each column to a string,
+    the function converts each column's categories to strings just once,
+    then looks up each row's labels through its category codes. As in
+    group_by_codes(), each column's codes also serve as one 'digit' of a
+    code that identifies the row's combination of values, so the labels
+    only need to be joined together for the first row with each
+    combination.'''
+    label_codes = np.zeros(len(df), dtype = 'int64')
+    combination_count = 1
+    column_labels = []
+    for column in label_columns:
+        if isinstance(df[column].dtype, pd.CategoricalDtype):
+            codes = df[column].cat.codes.to_numpy()
+            levels = df[column].cat.categories
+        else:
+            codes, levels = pd.factorize(df[column])
+        if (codes < 0).any():
+            # Missing values don't have a label to look up, so the
+            # labels are created directly from the column values instead.
+            labels = df[label_columns[0]].astype('str')
+            for label_column in label_columns[1:]:
+                labels = labels + ' ' + df[label_column].astype('str')
+            return pd.Categorical(labels)
+        combination_count *= len(levels)
+        if combination_count > bincount_max_groups:
+            # Renumbering the combinations found so far so that the
+            # codes won't overflow:
+            label_codes = np.unique(label_codes, return_inverse = True)[1]
+            combination_count = (label_codes.max() + 1) * len(levels)
+        label_codes = label_codes * len(levels) + codes
+        column_labels.append((codes, levels.astype('str').to_numpy(
+            dtype = 'object')))
+
+    first_rows, label_codes = np.unique(label_codes,
+    return_index = True, return_inverse = True)[1:]
+    codes, levels = column_labels[0]
+    labels = levels[codes[first_rows]]
+    for codes, levels in column_labels[1:]:
+        labels = labels + ' ' + levels[codes[first_rows]]
+    try:
+        return pd.Categorical.from_codes(label_codes, categories = labels)
+    except ValueError:
+        # Different combinations can, in rare cases, produce the same
+        # label (e.g. when a value contains a space). In that case, the
+        # labels are converted to categories (which will merge any
+        # duplicates) before being mapped back to each row.
+        labels = pd.Categorical(labels)
+        return pd.Categorical.from_codes(labels.codes[label_codes],
+        dtype = labels.dtype)
+
+
+# Sketching the distribution of each measure:
+
+# Medians, percentiles, and box plots can't be rolled up from sums and
+# counts, and sorting every matching score for each request would take
+# too long once the tables grow large. Therefore, these statistics are
+# calculated from quantile sketches: compact summaries of a column's
+# distribution that can be merged together by simple addition.
+# Each sketch is a histogram with (at most) quantile_sketch_max_bins
+# equal-width bins that span the column's range. When a column contains
+# only whole numbers, and its range fits within that many bins (as is
+# the case for Score), each bin holds a single value, so the quantiles
+# calculated from the sketches will exactly match those that pandas would
+# calculate from the raw values. Otherwise, each quantile will be off
+# by, at most, half of one bin's width.
+# build_aggregation_cube() stores a sketch for each cube row, so any
+# combination of filters and comparisons can be answered by merging the
+# sketches of the matching cube rows.
+quantile_sketch_max_bins = 1024
+
+# The quantile aggregate functions that the app supports, along with the
+# quantile that each one represents: ('box' can also be passed as a
+# pivot_aggfunc in order to calculate all of the statistics needed for
+# a box plot; see calculate_box_plot_statistics().)
+quantile_aggregate_functions = {'p10':0.1, 'p25':0.25, 'median':0.5,
+'p75':0.75, 'p90':0.9}
+sketch_aggregate_functions = list(quantile_aggregate_functions) + ['box']
+
+
+def get_sketch_bins(values):
+    '''This function chooses the bins that quantile sketches of a numeric
+    array will use. It returns a dictionary containing the lower edge of
+    the first bin ('lower'), the width of each bin ('width'), the number
+    of bins ('bin_count'), and whether each bin holds a single value
+    ('exact').'''
+    values = values[~np.isnan(values)] if values.dtype.kind == 'f' else values
+    if len(values) == 0:
+        return {'lower':0.0, 'width':1.0, 'bin_count':1, 'exact':True}
+    lower = float(values.min())
+    value_range = float(values.max()) - lower
+    if ((value_range < quantile_sketch_max_bins)
+        and (values.dtype.kind in 'biu' or np.all(values % 1 == 0))):
+        return {'lower':lower, 'width':1.0,
+        'bin_count':int(value_range) + 1, 'exact':True}
+    return {'lower':lower, 'width':max(value_range, 1.0)
+    / quantile_sketch_max_bins, 'bin_count':quantile_sketch_max_bins,
+    'exact':False}
+
+
+def create_quantile_sketches(values, row_positions, group_count,
+    sketch_bins):
+    '''This function returns a matrix with one quantile sketch
+    (i.e. one row of bin counts) for each of group_count groups.
+    values contains the values to add to the sketches, and row_positions
+    contains the position of each value's group (or -1 if the value
+    should be left out, as will also happen with missing values).
+    sketch_bins should come from get_sketch_bins().'''
+    bin_count = sketch_bins['bin_count']
+    values = np.asarray(values, dtype = 'float64')
+    included_values = (row_positions >= 0) & ~np.isnan(values)
+    value_bins = np.clip(np.floor((values[included_values]
+    - sketch_bins['lower']) / sketch_bins['width']).astype('int64'),
+    0, bin_count - 1)
+    return np.bincount(row_positions[included_values] * bin_count
+    + value_bins, minlength = group_count * bin_count).reshape(
+        group_count, bin_count).astype('int32')
+
+
+def merge_quantile_sketches(sketches, row_positions, group_count):
+    '''This function adds together the rows of a sketch matrix that
+    share the same position within row_positions (which uses the same
+    format as within create_quantile_sketches()). It returns a matrix
+    with one merged sketch for each of group_count groups.'''
+    bin_count = sketches.shape[1]
+    included_rows = row_positions >= 0
+    bin_positions = (row_positions[included_rows, np.newaxis] * bin_count
+    + np.arange(bin_count)).ravel()
+    return np.bincount(bin_positions,
+    weights = sketches[included_rows].ravel(),
+    minlength = group_count * bin_count).reshape(
+        group_count, bin_count).astype('int64')
+
+
+def get_sketch_bin_values(sketch_bins):
+    '''This function returns the value that each bin within a quantile
+    sketch represents. (For approximate sketches, this is the midpoint
+    of the bin.)'''
+    bin_values = sketch_bins['lower'] + sketch_bins['width'] * np.arange(
+        sketch_bins['bin_count'])
+    if sketch_bins['exact'] == False:
+        bin_values += sketch_bins['width'] / 2
+    return bin_values
+
+
+def calculate_sketch_quantiles(sketches, sketch_bins, quantile):
+    '''This function calculates the specified quantile (e.g. 0.5 for the
+    median) for each sketch within a sketch matrix. As with pandas'
+    quantile() method, the result is interpolated linearly between the
+    two values that surround the quantile's position. Sketches
+    without any values will receive a quantile of NaN.'''
+    bin_values = get_sketch_bin_values(sketch_bins)
+    cumulative_counts = sketches.cumsum(axis = 1)
+    value_counts = cumulative_counts[:, -1]
+    position = np.maximum(value_counts - 1, 0) * quantile
+    lower_rank = np.floor(position).astype('int64')
+    upper_rank = np.minimum(lower_rank + 1, np.maximum(value_counts - 1, 0))
+    # The bin that contains the value with a given (zero-based) rank
+    # is the first bin whose cumulative count exceeds that rank.
+    lower_values = bin_values[(cumulative_counts
+    > lower_rank[:, np.newaxis]).argmax(axis = 1)]
+    upper_values = bin_values[(cumulative_counts
+    > upper_rank[:, np.newaxis]).argmax(axis = 1)]
+    quantiles = lower_values + (position - lower_rank) * (
+        upper_values - lower_values)
+    return np.where(value_counts > 0, quantiles, np.nan)
+
+
+def calculate_box_plot_statistics(sketches, sketch_bins):
+    '''This function returns a dictionary containing the statistics
+    needed to draw a box plot for each sketch within a sketch matrix:
+    the lower fence, first quartile, median, third quartile, and upper
+    fence. As within Plotly's own box plots, the fences are the most
+    extreme values that fall within 1.5 interquartile ranges of the
+    quartiles.'''
+    bin_values = get_sketch_bin_values(sketch_bins)
+    first_quartiles = calculate_sketch_quantiles(sketches, sketch_bins, 0.25)
+    third_quartiles = calculate_sketch_quantiles(sketches, sketch_bins, 0.75)
+    interquartile_ranges = third_quartiles - first_quartiles
+    occupied_bins = sketches > 0
+    lower_fence_bins = occupied_bins & (bin_values >= (first_quartiles
+    - 1.5 * interquartile_ranges)[:, np.newaxis])
+    upper_fence_bins = occupied_bins & (bin_values <= (third_quartiles
+    + 1.5 * interquartile_ranges)[:, np.newaxis])
+    has_values = occupied_bins.any(axis = 1)
+    return {'lower_fence':np.where(has_values,
+    bin_values[lower_fence_bins.argmax(axis = 1)], np.nan),
+    'q1':first_quartiles,
+    'median':calculate_sketch_quantiles(sketches, sketch_bins, 0.5),
+    'q3':third_quartiles,
+    'upper_fence':np.where(has_values, bin_values[len(bin_values) - 1
+    - upper_fence_bins[:, ::-1].argmax(axis = 1)], np.nan)}
+
+
+def get_box_plot_columns(y_value):
+    '''This function returns a dictionary that maps each statistic
+    returned by calculate_box_plot_statistics() to the name of the
+    column that will store it within box plot pivot tables. (The median
+    is stored within the y value column itself.)'''
+    return {'lower_fence':f'{y_value}_Lower_Fence', 'q1':f'{y_value}_Q1',
+    'median':y_value, 'q3':f'{y_value}_Q3',
+    'upper_fence':f'{y_value}_Upper_Fence'}
+
+
+def pivot_with_sketches(df_groups, sketches, sketch_bins, y_value,
+    pivot_aggfunc):
+    '''This function adds the statistic specified by pivot_aggfunc
+    (one of the functions within sketch_aggregate_functions) to
+    df_groups, a DataFrame whose rows correspond to the rows of
+    the sketch matrix passed to sketches. For quantile functions, the
+    statistic is stored within the y_value column; for box plots, the
+    columns listed within get_box_plot_columns() are added. Groups without
+    any values are removed, just as pivot_table() would remove them.'''
+    groups_with_values = sketches.sum(axis = 1) > 0
+    df_pivot = df_groups[groups_with_values].reset_index(drop = True)
+    sketches = sketches[groups_with_values]
+    if pivot_aggfunc == 'box':
+        box_plot_statistics = calculate_box_plot_statistics(sketches,
+        sketch_bins)
+        for statistic, column in get_box_plot_columns(y_value).items():
+            df_pivot[column] = box_plot_statistics[statistic]
+    else:
+        df_pivot[y_value] = calculate_sketch_quantiles(sketches, sketch_bins,
+        quantile_aggregate_functions[pivot_aggfunc])
+    return df_pivot
+
+
+def pivot_rows_with_sketches(df, y_value, index_columns, pivot_aggfunc):
+    '''This function creates a pivot table for one of the functions within
+    sketch_aggregate_functions by building a quantile sketch for each
+    group of rows within df. (This is how these statistics get
+    calculated when a request can't be answered from an aggregation cube.)
+    Returns None if y_value isn't numeric or if group_by_codes() can't
+    handle the request.'''
+    if df[y_value].dtype.kind not in 'biuf':
+        return None
+    grouped_data = group_by_codes(df, index_columns, [],
+    return_group_positions = True)
+    if grouped_data is None:
+        return None
+    df_groups, sums, counts, row_positions = grouped_data
+    values = df[y_value].to_numpy(dtype = 'float64', na_value = np.nan)
+    sketch_bins = get_sketch_bins(values)
+    return pivot_with_sketches(df_groups, create_quantile_sketches(values,
+    row_positions, len(df_groups), sketch_bins), sketch_bins, y_value,
+    pivot_aggfunc)
+
+
+# Counting distinct values:
+
+# Summing the Students column only produces an accurate head count when
+# each student appears in a single row. Within test_results, however,
+# each student has one row per testing period. Therefore, the measures
+# within distinct_count_columns count the distinct values of another
+# column instead. (For instance, Unique_Students counts the distinct
+# Student_IDs within each group.) These measures can be passed to
+# create_pivot_for_charts() as y values; they are always aggregated by
+# counting distinct values, regardless of pivot_aggfunc.
+distinct_count_columns = {'Unique_Students':'Student_ID'}
+
+# Distinct counts can't be added together, so build_aggregation_cube()
+# stores a distinct count sketch for each cube row instead. These
+# sketches can be merged to find the distinct count of any combination
+# of cube rows. When the table contains few enough distinct values, each
+# sketch is an exact bitset (with one bit for each distinct value);
+# otherwise, a HyperLogLog sketch with 2 ** hyperloglog_precision
+# one-byte registers is used. Bitsets are chosen whenever they would be
+# no larger than a HyperLogLog sketch. HyperLogLog estimates have a
+# standard error of roughly 1.04 / sqrt(2 ** hyperloglog_precision)
+# (1.6% for a precision of 12). This precision must be at least 12 so
+# that each hash's remaining bits can be stored exactly as a float.
+hyperloglog_precision = 12
+
+
+def build_distinct_count_sketches(values, row_positions, group_count):
+    '''This function returns a dictionary containing the type of sketch
+    used ('bitset' or 'hyperloglog') and a matrix ('sketches') with one
+    distinct count sketch for each of group_count groups. values contains
+    the values to count, and row_positions contains the position of each
+    value's group (or -1 if the value should be left out, as will also
+    happen with missing values).'''
+    value_codes, unique_values = pd.factorize(values)
+    included_values = (row_positions >= 0) & (value_codes >= 0)
+    row_positions = row_positions[included_values]
+    value_codes = value_codes[included_values]
+    register_count = 2 ** hyperloglog_precision
+    byte_count = max((len(unique_values) + 7) // 8, 1)
+
+    if byte_count <= register_count:
+        # Setting the bit that corresponds to each value within its
+        # group's bitset: (Each bit is only counted once, so the bits
+        # within each byte can be added together.)
+        bit_positions = np.unique(row_positions * (byte_count * 8)
+        + value_codes)
+        sketches = np.bincount(bit_positions // 8,
+        weights = 2 ** (bit_positions % 8),
+        minlength = group_count * byte_count).astype('uint8')
+        return {'type':'bitset',
+        'sketches':sketches.reshape(group_count, byte_count)}
+
+    # The first hyperloglog_precision bits of each value's hash choose
+    # one of the group's registers, which stores the largest 'rank'
+    # (i.e. the position of the first 1 bit within the hash's remaining
+    # bits) that it has seen.
+    hashes = pd.util.hash_array(np.asarray(unique_values,
+    dtype = 'object'))[value_codes]
+    remaining_bit_count = 64 - hyperloglog_precision
+    register_positions = (hashes >> np.uint64(remaining_bit_count)).astype(
+        'int64')
+    remaining_bits = (hashes & np.uint64(2 ** remaining_bit_count - 1)
+    ).astype('float64')
+    ranks = remaining_bit_count - np.frexp(remaining_bits)[1] + 1
+    register_ids = row_positions * register_count + register_positions
+    # Keeping only the largest rank for each register:
+    sort_order = np.lexsort((ranks, register_ids))
+    register_ids = register_ids[sort_order]
+    ranks = ranks[sort_order]
+    last_in_register = np.append(register_ids[1:] != register_ids[:-1], True)
+    sketches = np.zeros(group_count * register_count, dtype = 'uint8')
+    sketches[register_ids[last_in_register]] = ranks[last_in_register]
+    return {'type':'hyperloglog',
+    'sketches':sketches.reshape(group_count, register_count)}
+
+
+def merge_distinct_count_sketches(sketch_type, sketches, row_positions,
+    group_count):
+    '''This function merges the rows of a distinct count sketch matrix
+    that share the same position within row_positions (which uses the
+    same format as within build_distinct_count_sketches()). Bitsets are
+    merged by combining their bits; HyperLogLog sketches are merged by
+    keeping the largest value of each register. Every position from 0 to
+    group_count - 1 must appear within row_positions.'''
+    if group_count == 0:
+        return sketches[:0]
+    included_rows = row_positions >= 0
+    sort_order = np.argsort(row_positions[included_rows], kind = 'stable')
+    sorted_positions = row_positions[included_rows][sort_order]
+    group_starts = np.flatnonzero(np.append(True,
+    sorted_positions[1:] != sorted_positions[:-1]))
+    merge_function = (np.bitwise_or if sketch_type == 'bitset'
+    else np.maximum)
+    return merge_function.reduceat(sketches[included_rows][sort_order],
+    group_starts, axis = 0)
+
+
+def count_distinct_values(sketch_type, sketches):
+    '''This function returns the number of distinct values (exact for
+    bitsets; estimated for HyperLogLog sketches) within each sketch of a
+    distinct count sketch matrix.'''
+    if sketch_type == 'bitset':
+        return np.unpackbits(sketches, axis = 1).sum(axis = 1).astype(
+            'int64')
+    register_count = sketches.shape[1]
+    estimates = (0.7213 / (1 + 1.079 / register_count) * register_count ** 2
+    / np.exp2(-sketches.astype('float64')).sum(axis = 1))
+    # Small counts are estimated more accurately by the number of
+    # registers that are still empty ('linear counting'):
+    empty_registers = (sketches == 0).sum(axis = 1)
+    use_linear_counting = (estimates <= 2.5 * register_count) & (
+        empty_registers > 0)
+    estimates = np.where(use_linear_counting, register_count * np.log(
+        register_count / np.maximum(empty_registers, 1)), estimates)
+    return np.round(estimates).astype('int64')
+
+
+def pivot_rows_with_distinct_counts(df, y_value, index_columns):
+    '''This function creates a pivot table that counts the distinct values
+    of the column that the y_value measure refers to (see
+    distinct_count_columns) within each group of rows in df. (This is how
+    distinct counts get calculated when a request can't be answered from
+    an aggregation cube.) The counts are exact. Returns None if
+    group_by_codes() can't handle the request.'''
+    grouped_data = group_by_codes(df, index_columns, [],
+    return_group_positions = True)
+    if grouped_data is None:
+        return None
+    df_groups, sums, counts, row_positions = grouped_data
+    value_codes, unique_values = pd.factorize(
+        df[distinct_count_columns[y_value]])
+    value_count = max(len(unique_values), 1)
+    included_rows = (row_positions >= 0) & (value_codes >= 0)
+    # Each distinct combination of group and value is counted once:
+    group_value_pairs = np.unique(row_positions[included_rows] * value_count
+    + value_codes[included_rows])
+    df_groups[y_value] = np.bincount(group_value_pairs // value_count,
+    minlength = len(df_groups))
+    return df_groups[df_groups[y_value] > 0].reset_index(drop = True)
+
+
+# Precomputing aggregates for each table:
+
+# Although each table contains one row per student (or per test result),
+# the dashboards only ever group and filter these rows by a small, fixed
+# set of dimension columns (such as School, Grade, and Period). Therefore,
+# when a table is loaded, build_aggregation_cube() sums up and counts
+# each of the table's measure columns (such as Students or Score) for every
+# combination of dimension values that appears within the table. 
+# create_pivot_for_charts() can then answer most requests by filtering
+# and rolling up this 'cube,' which contains far fewer rows than the
+# table itself. (Means are calculated by dividing the rolled-up sums
+# by the rolled-up counts.)
+use_aggregation_cubes = True
+
+# The pivot_table() aggregate functions that an aggregation cube can
+# reproduce: (The cubes are rolled up via group_by_codes(), so they
+# support the same functions.)
+cube_aggregate_functions = bincount_aggregate_functions
+
+
+def build_aggregation_cube(table_name, df):
+    '''This function builds the aggregation cube for a registered table
+    (using the dimensions and measures specified for it within
+    registered_tables). It returns a dictionary containing these dimensions
+    and measures, the cube itself ('df'), which has one row for
+    each combination of dimension values found within the table, and the
+    domain of each dimension (see get_dimension_domains()).
+    For each measure, the cube contains a [measure]_sum column and a
+    [measure]_count column (the latter of which excludes missing values).
+    For each of the table's sketched measures, the dictionary's
+    'sketches' item will also contain the bins used by the measure's
+    quantile sketches ('bins') and a matrix with one sketch for each
+    row of the cube ('counts'). Similarly, for each of the table's
+    distinct measures, the 'distinct_counts' item will contain the output
+    of build_distinct_count_sketches() (which includes one sketch for
+    each row of the cube).
+    Returns None if no cube has been specified for the table.'''
+    table_settings = registered_tables[table_name]
+    if (use_aggregation_cubes == False) or (
+        len(table_settings['dimensions']) == 0):
+        return None
+    dimensions = table_settings['dimensions']
+    measures = table_settings['measures']
+
+    # Float measures (such as Score) are summed as 64-bit floats so that
+    # large sums won't lose precision.
+    df_measures = df[dimensions + measures].astype({measure:'float64'
+    for measure in measures if df[measure].dtype.kind == 'f'})
+    # dropna = False keeps rows with missing dimension values, since these
+    # rows still need to be counted when those dimensions aren't being
+    # used as comparisons.
+    df_cube = df_measures.groupby(dimensions, observed = True,
+    dropna = False)[measures].agg(['sum', 'count'])
+    df_cube.columns = [f'{measure}_{statistic}' for measure, statistic
+    in df_cube.columns]
+    df_cube = df_cube.reset_index()
+
+    sketches = {}
+    distinct_counts = {}
+    if (len(table_settings['sketched_measures'])
+        + len(table_settings['distinct_measures']) > 0):
+        # Finding the cube row that each of the table's rows belongs to:
+        # (ngroup() numbers the groups in the same order in which they
+        # appear within the cube.)
+        cube_positions = df_measures.groupby(dimensions, observed = True,
+        dropna = False).ngroup().to_numpy()
+    for measure in table_settings['sketched_measures']:
+        values = df[measure].to_numpy(dtype = 'float64', na_value = np.nan)
+        sketch_bins = get_sketch_bins(values)
+        sketches[measure] = {'bins':sketch_bins,
+        'counts':create_quantile_sketches(values, cube_positions,
+        len(df_cube), sketch_bins)}
+    for measure in table_settings['distinct_measures']:
+        distinct_counts[measure] = build_distinct_count_sketches(
+            df[distinct_count_columns[measure]].to_numpy(), cube_positions,
+            len(df_cube))
+    return {'dimensions':dimensions, 'measures':measures, 'df':df_cube,
+    'domains':get_dimension_domains(df_cube, dimensions),
+    'sketches':sketches, 'distinct_counts':distinct_counts}
+
+
+def roll_up_aggregation_cube(aggregation_cube, y_value, comparison_values,
+    pivot_aggfunc, filter_list = None):
+    '''This function uses an aggregation cube (see build_aggregation_cube())
+    to create the same pivot table that pivot_table() would create
+    from the original table. (The arguments have the same meaning as
+    within create_pivot_for_charts().) Comparisons without any matching
+    rows are left out, as are rows with missing comparison values.
+
+    Functions within sketch_aggregate_functions (such as 'median') are
+    calculated by merging the quantile sketches of the matching cube rows.
+    Likewise, measures within distinct_count_columns are calculated by
+    merging the matching cube rows' distinct count sketches.
+
+    Returns None if the request can't be answered from the cube (e.g.
+    because it uses an aggregate function other than those found in
+    cube_aggregate_functions and sketch_aggregate_functions or filters on
+    a column that isn't one of the cube's dimensions).'''
+    if filter_list is None:
+        filter_list = []
+    sketches = aggregation_cube.get('sketches', {}).get(y_value)
+    distinct_counts = aggregation_cube.get('distinct_counts', {}).get(y_value)
+    if y_value in distinct_count_columns:
+        supported_function = distinct_counts is not None
+    elif pivot_aggfunc in sketch_aggregate_functions:
+        supported_function = sketches is not None
+    else:
+        supported_function = ((pivot_aggfunc in cube_aggregate_functions)
+        & (y_value in aggregation_cube['measures']))
+    if ((supported_function == False)
+        | (any(column not in aggregation_cube['dimensions'] for column
+        in comparison_values + [column for column, values in filter_list]))):
+        return None
+
+    df_cube = aggregation_cube['df']
+    filter_list = remove_unrestrictive_filters(filter_list,
+    aggregation_cube['domains'])
+    if len(filter_list) > 0:
+        cube_mask = create_filter_mask(df_cube, filter_list)
+        df_cube = df_cube[cube_mask]
+    # (If the filters exclude every cube row, the steps below will return
+    # an empty pivot table with the same columns as a non-empty one.)
+
+    if y_value in distinct_count_columns:
+        grouped_data = group_by_codes(df_cube, comparison_values, [],
+        return_group_positions = True)
+        if grouped_data is None:
+            return None
+        df_rollup, sums, counts, row_positions = grouped_data
+        cube_sketches = distinct_counts['sketches']
+        if len(filter_list) > 0:
+            cube_sketches = cube_sketches[cube_mask]
+        df_rollup[y_value] = count_distinct_values(distinct_counts['type'],
+        merge_distinct_count_sketches(distinct_counts['type'],
+            cube_sketches, row_positions, len(df_rollup)))
+        return df_rollup[df_rollup[y_value] > 0].reset_index(drop = True)
+
+    if pivot_aggfunc in sketch_aggregate_functions:
+        grouped_data = group_by_codes(df_cube, comparison_values, [],
+        return_group_positions = True)
+        if grouped_data is None:
+            return None
+        df_rollup, sums, counts, row_positions = grouped_data
+        cube_sketches = sketches['counts']
+        if len(filter_list) > 0:
+            cube_sketches = cube_sketches[cube_mask]
+        return pivot_with_sketches(df_rollup, merge_quantile_sketches(
+            cube_sketches, row_positions, len(df_rollup)), sketches['bins'],
+            y_value, pivot_aggfunc)
+
+    sum_column = f'{y_value}_sum'
+    count_column = f'{y_value}_count'
+    grouped_data = group_by_codes(df_cube, comparison_values,
+    [sum_column, count_column])
+    if grouped_data is None:
+        return None
+    df_rollup, sums, counts = grouped_data
+
+    if pivot_aggfunc == 'mean':
+        # Comparisons with no y values would produce a missing mean, so
+        # they are removed (just as pivot_table() would remove them).
+        groups_with_values = sums[count_column] > 0
+        df_rollup = df_rollup[groups_with_values].reset_index(drop = True)
+        df_rollup[y_value] = (sums[sum_column][groups_with_values]
+        / sums[count_column][groups_with_values])
+    else:
+        df_rollup[y_value] = sums[f'{y_value}_{pivot_aggfunc}']
+    return df_rollup
+
+
+# Indexing each table's dimension columns:
+
+# When a request can't be answered from a table's aggregation cube, 
+# create_pivot_for_charts() needs to filter the table's rows. To speed
+# up this step, build_bitmap_index() creates one bitmap for each value
+# within each of the table's dimension columns. (Each bit within a bitmap
+# indicates whether the corresponding row contains that value.) These bits
+# are packed into 64-bit words, so a filter can be applied by OR-ing
+# together the bitmaps of the selected values within each column and then
+# AND-ing together the results for each column--which requires just one
+# operation per 64 rows.
+use_bitmap_indexes = True
+
+
+def pack_bitmap(row_mask, word_count):
+    '''This function packs a Boolean array (with one element per row)
+    into an array of word_count 64-bit words.'''
+    packed_bytes = np.zeros(word_count * 8, dtype = 'uint8')
+    packed_row_mask = np.packbits(row_mask, bitorder = 'little')
+    packed_bytes[:len(packed_row_mask)] = packed_row_mask
+    return packed_bytes.view('uint64')
+
+
+def build_bitmap_index(table_name, df):
+    '''This function builds the bitmap index for a registered table. It
+    returns a dictionary containing the table's row count, the number of
+    64-bit words within each bitmap, and the bitmaps themselves
+    ('bitmaps'), which map each dimension column to a dictionary of
+    {value:bitmap} pairs. (Missing values don't receive bitmaps, so rows
+    with missing values won't match any filter on that column.)
+    The dictionary also includes the domain of each dimension column
+    (see get_dimension_domains()).
+    Returns None if the table doesn't have any dimensions.'''
+    dimensions = registered_tables[table_name]['dimensions']
+    if (use_bitmap_indexes == False) or (len(dimensions) == 0):
+        return None
+    word_count = (len(df) + 63) // 64
+    bitmaps = {}
+    for column in dimensions:
+        if isinstance(df[column].dtype, pd.CategoricalDtype):
+            # Categorical columns already store an integer code for each
+            # value, so these codes can be compared directly.
+            codes = df[column].cat.codes.to_numpy()
+            values = df[column].cat.categories.tolist()
+        else:
+            codes, values = pd.factorize(df[column])
+            values = values.tolist()
+        bitmaps[column] = {value:pack_bitmap(codes == code, word_count)
+        for code, value in enumerate(values)}
+    return {'row_count':len(df), 'word_count':word_count,
+    'bitmaps':bitmaps, 'domains':get_dimension_domains(df, dimensions)}
+
+
+def filter_with_bitmap_index(bitmap_index, filter_list):
+    '''This function returns the positions of the rows that match all
+    of the filters within filter_list (which uses the same format as
+    within create_pivot_for_charts()). Every column within filter_list
+    must be present within the bitmap index.'''
+    matching_words = None
+    for column, values in filter_list:
+        column_bitmaps = bitmap_index['bitmaps'][column]
+        column_words = np.zeros(bitmap_index['word_count'], dtype = 'uint64')
+        for value in values:
+            if value in column_bitmaps:
+                np.bitwise_or(column_words, column_bitmaps[value],
+                out = column_words)
+        if matching_words is None:
+            matching_words = column_words
+        else:
+            np.bitwise_and(matching_words, column_words,
+            out = matching_words)
+    if matching_words is None: # No filters were provided
+        return np.arange(bitmap_index['row_count'])
+    return np.flatnonzero(np.unpackbits(matching_words.view('uint8'),
+    count = bitmap_index['row_count'], bitorder = 'little'))
+
+
+def filter_table(df, filter_list, bitmap_index = None):
+    '''This function returns the rows within df that match all of the
+    filters within filter_list (which uses the same format as within
+    create_pivot_for_charts()).
+
+    bitmap_index: The bitmap index of df (see build_bitmap_index()).
+    If this is provided, it will be used to skip filters that select
+    every value within their column and, when possible, to find the
+    matching rows.'''
+    # Filters that select every value within their column (such as the
+    # filter menus' default selections) don't need to be applied.
+    # The table's bitmap index keeps track of the values found within
+    # each column, so it can be used to identify these filters.
+    if bitmap_index is not None:
+        filter_list = remove_unrestrictive_filters(filter_list,
+        bitmap_index['domains'])
+
+    if len(filter_list) == 0:
+        # No rows need to be filtered out. (A shallow copy is used
+        # so that columns added by the caller won't be added to the
+        # original table.)
+        return df.copy(deep = False)
+    elif ((bitmap_index is not None) and all(column
+        in bitmap_index['bitmaps'] for column, values in filter_list)):
+        # In this case, the table's bitmap index will be used to find
+        # the rows that match the filters.
+        return df.take(filter_with_bitmap_index(bitmap_index, filter_list))
+    else:
+        # Otherwise, all of the filters will be combined into a single
+        # mask (see create_filter_mask()), which is then used to
+        # filter the table in one pass.
+        return df[create_filter_mask(df, filter_list)]
+
+
+
+def retrieve_registered_table(table_name):
+    '''This function retrieves a registered table (using the columns and
+    filters specified for it within registered_tables). It returns
+    the table, the signature of its source (see get_source_signature()),
+    and the number of seconds that the retrieval took.
+
+    The signature is retrieved before the table itself. That way, if the
+    source changes during the retrieval, the next refresh check will
+    notice the change and retrieve the table again.'''
+    start_time = time.perf_counter()
+    source_signature = get_source_signature(table_name)
+    table_settings = registered_tables[table_name]
+    df = retrieve_data_from_table(table_name,
+    columns = table_settings['columns'], filters = table_settings['filters'])
+    return df, source_signature, time.perf_counter() - start_time
+
+
+def get_dependent_tables(table_names):
+    '''This function returns a list containing the tables passed to
+    table_names along with every registered table that depends on them
+    (either directly or indirectly).'''
+    dependent_tables = list(table_names)
+    for table_name in dependent_tables:
+        for other_table, table_settings in registered_tables.items():
+            if ((table_name in table_settings['dependencies'])
+                & (other_table not in dependent_tables)):
+                dependent_tables.append(other_table)
+    return dependent_tables
+
+
+def get_required_tables(table_names, loaded_tables):
+    '''This function returns a list of the tables that must be retrieved
+    in order to prepare the tables passed to table_names: that is, each
+    of these tables (and, recursively, each of their dependencies) that
+    isn't already present within loaded_tables.'''
+    required_tables = []
+
+    def add_table(table_name):
+        if (table_name in loaded_tables) or (table_name in required_tables):
+            return
+        required_tables.append(table_name)
+        for dependency in registered_tables[table_name]['dependencies']:
+            add_table(dependency)
+
+    for table_name in table_names:
+        add_table(table_name)
+    return required_tables
+
+
+def get_shared_table_path(table_name, get_signature):
+    '''This function returns the path at which the prepared version of a
+    table will be published within shared_dataset_folder. The file name
+    includes a hash of the table's settings and of the source signatures
+    of the table and all of its dependencies, so each version of the
+    source data will be published to a different file.
+
+    get_signature: A function that returns the source signature of a
+    given table.'''
+    tables_to_describe = get_required_tables([table_name], {})
+    table_settings = registered_tables[table_name]
+    table_description = json.dumps([table_name, table_settings['columns'],
+    table_settings['filters'], [get_signature(table) for table
+    in tables_to_describe]], default = str, sort_keys = True)
+    return f"{shared_dataset_folder}/{table_name}_\
+{hashlib.sha1(table_description.encode()).hexdigest()[:16]}.arrow"
+
+
+def read_shared_table(shared_table_path):
+    '''This function memory-maps a table published by
+    publish_shared_table() and returns it as a DataFrame.
+    split_blocks = True allows numeric columns and the codes of
+    categorical columns to reference the memory-mapped file directly
+    rather than being copied into the worker's own memory. (As a result,
+    these columns are read-only.)'''
+    return pyarrow.feather.read_table(shared_table_path,
+    memory_map = True).to_pandas(split_blocks = True)
+
+
+def publish_shared_table(table_name, df, shared_table_path):
+    '''This function saves a prepared table to shared_dataset_folder as an
+    uncompressed Arrow IPC (Feather) file so that other worker processes
+    can memory-map it. Outdated versions of the same table are then
+    removed. (On Linux, workers that still have an outdated version
+    memory-mapped can continue to use it until they reload the table.)'''
+    os.makedirs(shared_dataset_folder, exist_ok = True)
+    temporary_path = f'{shared_table_path}.{os.getpid()}.tmp'
+    pyarrow.feather.write_feather(df, temporary_path,
+    compression = 'uncompressed')
+    os.replace(temporary_path, shared_table_path)
+    for file_name in os.listdir(shared_dataset_folder):
+        if ((file_name.endswith('.arrow'))
+            & (file_name.rsplit('_', 1)[0] == table_name)
+            & (f'{shared_dataset_folder}/{file_name}' != shared_table_path)):
+            try:
+                os.remove(f'{shared_dataset_folder}/{file_name}')
+            except OSError:
+                pass # Another worker may have removed it already.
+
+
+def load_registered_tables(table_names = None, tables_to_reload = []):
+    '''This function loads the tables passed to table_names (or
+    all registered tables if table_names is None) into table_cache, then
+    returns a dictionary that maps each table name (along with the name of
+    any other table that was already loaded) to its prepared
+    DataFrame. Tables that are already present within table_cache
+    won't be retrieved again unless they are also listed within
+    tables_to_reload.
+
+    If use_shared_dataset is True, the function will first check whether
+    another worker process has already published an up-to-date copy of
+    each table within shared_dataset_folder. If so, that copy will be
+    memory-mapped rather than retrieved.
+
+    The remaining tables are retrieved concurrently on a thread pool.
+    Most of the time spent retrieving a table is spent waiting on the
+    database (or the disk), so the time needed to load several tables will
+    be close to the time needed to retrieve the slowest table rather than
+    the time needed to retrieve all of them one after another.
+
+    Once all tables have been retrieved, each table's prepare_function
+    (if any) will be applied. These functions run in dependency order
+    so that, for instance, curr_enrollment will be ready by the time
+    its demographic data gets merged into test_results.
+
+    All of the newly loaded tables are then added to table_cache at
+    the same time. Therefore, when tables are reloaded, callbacks will
+    never see a new version of one table alongside an old version of a
+    table that depends on it.'''
+
+    if table_names is None:
+        table_names = list(registered_tables.keys())
+    table_names = list(table_names) + [table_name for table_name
+    in tables_to_reload if table_name not in table_names]
+
+    with table_loading_lock:
+        start_time = time.perf_counter()
+        # Retrieving references to any tables that are already loaded
+        # (and don't need to be reloaded):
+        # (Holding onto these references ensures that these tables will
+        # remain available even if they get evicted in the meantime.
+        # Every loaded table is included, not just those within
+        # table_names, so that the dependencies of these tables won't
+        # get retrieved again if they're already in memory.)
+        with table_cache_lock:
+            loaded_tables = {table_name:entry['df'] for table_name, entry
+            in table_cache.items() if table_name not in tables_to_reload}
+            source_signatures = {table_name:table_cache[table_name][
+            'source_signature'] for table_name in loaded_tables}
+
+        def get_signature(table_name):
+            if table_name not in source_signatures:
+                source_signatures[table_name] = get_source_signature(
+                    table_name)
+            return source_signatures[table_name]
+
+        new_tables = []
+
+        # Memory-mapping any tables that other workers have already
+        # published:
+        if use_shared_dataset == True:
+            for table_name in table_names:
+                if table_name in loaded_tables:
+                    continue
+                shared_table_path = get_shared_table_path(
+                    table_name, get_signature)
+                if os.path.exists(shared_table_path):
+                    try:
+                        loaded_tables[table_name] = make_table_read_only(
+                            read_shared_table(shared_table_path))
+                        new_tables.append(table_name)
+                        print(f"Memory-mapped {table_name} from \
+{shared_table_path}")
+                    except (OSError, pyarrow.ArrowInvalid) as error:
+                        print(f"Unable to read {shared_table_path}:", error)
+
+        tables_to_retrieve = get_required_tables(table_names, loaded_tables)
+        with ThreadPoolExecutor(
+            max_workers = startup_loader_threads) as executor:
+            retrieval_results = dict(zip(tables_to_retrieve, executor.map(
+                retrieve_registered_table, tables_to_retrieve)))
+
+        # Printing out the time needed to retrieve each table:
+        # (This is done here, rather than within the worker threads, so that
+        # the output of different threads won't get jumbled together.)
+        retrieved_tables = {}
+        for table_name, (df, source_signature,
+            seconds) in retrieval_results.items():
+            print(f"Retrieved {table_name} ({len(df)} rows) in \
+{seconds:.3f} seconds")
+            retrieved_tables[table_name] = df
+            source_signatures[table_name] = source_signature
+
+        def prepare_table(table_name):
+            if table_name in loaded_tables:
+                return
+            table_settings = registered_tables[table_name]
+            for dependency in table_settings['dependencies']:
+                prepare_table(dependency)
+            df = retrieved_tables[table_name]
+            if table_settings['prepare_function'] is not None:
+                df = table_settings['prepare_function'](df, loaded_tables)
+            if use_shared_dataset == True:
+                # Publishing the prepared table for other workers, then
+                # replacing it with a memory-mapped copy so that this
+                # worker will also share the published file's memory:
+                shared_table_path = get_shared_table_path(
+                    table_name, get_signature)
+                try:
+                    publish_shared_table(table_name, df, shared_table_path)
+                    df = read_shared_table(shared_table_path)
+                except (OSError, pyarrow.ArrowException) as error:
+                    print(f"Unable to publish {table_name}:", error)
+            loaded_tables[table_name] = make_table_read_only(df)
+            new_tables.append(table_name)
+
+        for table_name in tables_to_retrieve:
+            prepare_table(table_name)
+
+        store_tables({table_name:(loaded_tables[table_name],
+        get_signature(table_name)) for table_name in new_tables})
+
+        if len(new_tables) > 0:
+            print(f"Loaded {len(new_tables)} tables in \
+{time.perf_counter() - start_time:.3f} seconds")
+
+    evict_tables()
+    return loaded_tables
+
+
+# Keeping track of the tables that are currently in memory:
+
+# Rather than loading every table when the app starts, the app loads each
+# table the first time that a page layout or callback requests it (via
+# get_table() or use_table()). Tables that haven't been used for
+# table_idle_timeout_seconds, along with the least recently used tables
+# whenever the tables' combined size exceeds table_memory_budget_bytes, will
+# then be removed from memory by evict_tables(). (If an evicted table is
+# requested again later, it will simply be reloaded.) This way, a worker
+# that only serves the Current Enrollment page won't need to keep the other
+# pages' tables in memory.
+
+tables_to_preload = ['curr_enrollment'] # These tables will be loaded when
+# the app starts. (curr_enrollment is preloaded because it's needed by the
+# app's default page and by the test_results table.)
+
+table_idle_timeout_seconds = 30 * 60
+table_memory_budget_bytes = 512 * 1024 * 1024
+table_maintenance_interval_seconds = 60 # How often the table maintenance
+# thread (see start_table_maintenance_thread()) will check for tables
+# to evict
+
+enable_hot_refresh = True # When this variable is set to True, the table
+# maintenance thread will also check whether the sources of any loaded
+# tables have changed (e.g. because of a nightly data load). If so, it
+# will reload those tables (along with any tables that depend on them)
+# in the background. This allows new data to appear within the
+# dashboards without restarting the app.
+refresh_check_interval_seconds = 5 * 60
+
+# Each entry within table_cache stores a loaded table ('df'), its size
+# in bytes, the last time it was accessed, the number of callbacks that
+# are currently using it, the signature of its source at the time that it
+# was retrieved, a version number, its aggregation cube and bitmap
+# index (see build_aggregation_cube() and build_bitmap_index()), and the
+# domains of its dimension columns (see get_dimension_domains()).
+# (Every newly loaded table receives a new version number, which allows
+# other code to tell when a table has been reloaded.)
+table_cache = {}
+table_version_counter = itertools.count(1)
+table_cache_lock = threading.Lock() # Guards changes to table_cache
+table_loading_lock = threading.RLock() # Ensures that only one thread
+# loads tables at a time (so that a given table won't be retrieved twice
+# if two callbacks request it at the same moment)
+
+
+def store_tables(tables):
+    '''This function adds a set of prepared tables (along with their
+    aggregation cubes and bitmap indexes) to table_cache. tables should be
+    a dictionary that maps table names to (DataFrame, source signature)
+    tuples.
+
+    All of the tables are added at once, so a callback that retrieves
+    more than one table will never see a mix of old and new tables.
+    (Callbacks that are already using an older version of a table will
+    continue to use that version until they finish.)'''
+    new_entries = {}
+    for table_name, (df, source_signature) in tables.items():
+        aggregation_cube = build_aggregation_cube(table_name, df)
+        bitmap_index = build_bitmap_index(table_name, df)
+        dimension_domains = get_dimension_domains(df,
+        registered_tables[table_name]['dimensions'])
+        memory_usage = int(df.memory_usage(deep = True).sum())
+        if aggregation_cube is not None:
+            memory_usage += int(aggregation_cube['df'].memory_usage(
+                deep = True).sum())
+            memory_usage += sum(sketches['counts'].nbytes for sketches
+            in aggregation_cube['sketches'].values())
+            memory_usage += sum(sketches['sketches'].nbytes for sketches
+            in aggregation_cube['distinct_counts'].values())
+        if bitmap_index is not None:
+            memory_usage += sum(bitmap.nbytes for column_bitmaps
+            in bitmap_index['bitmaps'].values()
+            for bitmap in column_bitmaps.values())
+        new_entries[table_name] = {'df':df, 'memory_usage':memory_usage,
+        'last_access':time.monotonic(), 'users':0,
+        'source_signature':source_signature,
+        'version':next(table_version_counter),
+        'aggregation_cube':aggregation_cube, 'bitmap_index':bitmap_index,
+        'dimension_domains':dimension_domains}
+    with table_cache_lock:
+        table_cache.update(new_entries)
+
+
+def get_table_entry(table_name):
+    '''This function returns the table_cache entry for a registered
+    table, loading the table first if it isn't already in memory.'''
+    while True:
+        with table_cache_lock:
+            if table_name in table_cache:
+                table_cache[table_name]['last_access'] = time.monotonic()
+                return table_cache[table_name]
+        # (In the unlikely event that the table gets evicted right after 
+        # being loaded, the loop will simply load it again.)
+        load_registered_tables([table_name])
+
+
+def get_table(table_name):
+    '''This function returns the prepared DataFrame for a registered
+    table, loading it first if it isn't already in memory.
+
+    Note that the DataFrame returned by this function is shared by all of
+    the app's callbacks, so it should not be modified.'''
+    return get_table_entry(table_name)['df']
+
+
+@contextlib.contextmanager
+def use_table_entry(table_name):
+    '''This context manager works like use_table(), but it provides the
+    table's entire table_cache entry (which also includes the table's
+    version, aggregation cube, and bitmap index) rather than just the
+    table itself.'''
+    # The entry itself (rather than the table's name) is used to keep track
+    # of the table's users. That way, if the table gets reloaded while
+    # the callback is running, the callback will continue to use
+    # (and release) the version it started with.
+    entry = get_table_entry(table_name)
+    with table_cache_lock:
+        entry['users'] += 1
+    try:
+        yield entry
+    finally:
+        with table_cache_lock:
+            entry['users'] -= 1
+            entry['last_access'] = time.monotonic()
+
+
+@contextlib.contextmanager
+def use_table(table_name):
+    '''This context manager provides a registered table to the code within
+    a 'with' block. Unlike get_table(), it also marks the table as being
+    in use until the block finishes, which prevents evict_tables() from
+    counting the table as idle while a callback is still working with it.
+
+    Example:
+    with use_table('test_results') as df_test_results:
+        (code that uses df_test_results)'''
+    with use_table_entry(table_name) as entry:
+        yield entry['df']
+
+
+def get_data_source(table_name):
+    '''This function returns the data source that page layouts should
+    pass to create_filters_and_comparisons() and get_filter_options() for
+    a registered table. If aggregating_in_database() returns True, this
+    source will simply be the table's name, which instructs those
+    functions to query the database. Otherwise, the table itself
+    will be returned via get_table().'''
+    if aggregating_in_database():
+        return table_name
+    return get_table(table_name)
+
+
+def evict_tables():
+    '''This function removes tables from table_cache if (1) they haven't
+    been used within the last table_idle_timeout_seconds or (2) the
+    total size of all loaded tables exceeds table_memory_budget_bytes.
+    In the latter case, the least recently used tables will be evicted
+    first until the tables fit within the budget.
+    Tables that are currently in use won't be evicted.'''
+    current_time = time.monotonic()
+    with table_cache_lock:
+        for table_name, entry in list(table_cache.items()):
+            if ((entry['users'] == 0) & (current_time - entry['last_access']
+                > table_idle_timeout_seconds)):
+                print(f"Evicting {table_name} (idle)")
+                del table_cache[table_name]
+
+        total_memory_usage = sum(entry['memory_usage']
+        for entry in table_cache.values())
+        for table_name, entry in sorted(table_cache.items(),
+            key = lambda item: item[1]['last_access']):
+            if total_memory_usage <= table_memory_budget_bytes:
+                break
+            if entry['users'] == 0:
+                print(f"Evicting {table_name} (memory budget exceeded)")
+                total_memory_usage -= entry['memory_usage']
+                del table_cache[table_name]
+
+
+def refresh_changed_tables():
+    '''This function checks whether the sources of any loaded tables
+    have changed since those tables were retrieved. If so, it reloads
+    these tables (along with any loaded tables that depend on them).
+
+    The new versions of these tables are built in the background and then
+    swapped into table_cache all at once by load_registered_tables(), so 
+    callbacks can continue to use the old versions in the meantime.
+    Returns a list of the tables that were reloaded.'''
+    with table_cache_lock:
+        loaded_signatures = {table_name:entry['source_signature']
+        for table_name, entry in table_cache.items()}
+
+    changed_tables = [table_name for table_name, source_signature
+    in loaded_signatures.items()
+    if get_source_signature(table_name) != source_signature]
+    if len(changed_tables) == 0:
+        return []
+
+    # Tables that depend on a changed table (such as test_results, which
+    # includes data from curr_enrollment) need to be rebuilt as well.
+    tables_to_reload = [table_name for table_name
+    in get_dependent_tables(changed_tables)
+    if table_name in loaded_signatures]
+    print("Source data has changed. Reloading:", tables_to_reload)
+    load_registered_tables(tables_to_reload,
+    tables_to_reload = tables_to_reload)
+    # Pivot tables (and group totals) created from the previous versions of
+    # these tables will no longer be requested, so they are removed from
+    # pivot_cache right away rather than once a pivot table for each
+    # table's new version gets stored (see store_pivot()).
+    with table_cache_lock:
+        table_versions = {table_name:table_cache[table_name]['version']
+        for table_name in tables_to_reload if table_name in table_cache}
+    remove_outdated_pivots(table_versions)
+    return tables_to_reload
+
+
+def maintain_tables():
+    '''This function runs on a background thread (see
+    start_table_maintenance_thread()). It periodically evicts idle
+    tables and, if enable_hot_refresh is True, reloads tables whose
+    sources have changed.'''
+    last_refresh_check = time.monotonic()
+    while True:
+        time.sleep(table_maintenance_interval_seconds)
+        try:
+            evict_tables()
+            if (enable_hot_refresh == True) & (time.monotonic() 
+                - last_refresh_check >= refresh_check_interval_seconds):
+                last_refresh_check = time.monotonic()
+                refresh_changed_tables()
+        except Exception as error:
+            # Errors shouldn't stop the thread, so we'll just report them.
+            print("Table maintenance error:", error)
+
+
+table_maintenance_thread = None
+
+def start_table_maintenance_thread():
+    '''This function starts the table maintenance thread (if it isn't
+    already running). It should be called once each worker process has
+    started (e.g. within app.py).'''
+    global table_maintenance_thread
+    if table_maintenance_thread is None:
+        table_maintenance_thread = threading.Thread(target = maintain_tables,
+        daemon = True, name = 'table_maintenance')
+        table_maintenance_thread.start()
+
+
+# Preloading the tables that the app will need right away:
+# (When the database is calculating the pivot tables, the app won't need
+# any tables in memory.)
+if aggregating_in_database() == False:
+    load_registered_tables(tables_to_preload)
+
+
+# The aggregate functions that aggregate_in_database() can pass to the
+# database (keyed by the names that pandas uses for them):
+database_aggregate_functions = {'sum':sqlalchemy.func.sum,
+'mean':sqlalchemy.func.avg, 'count':sqlalchemy.func.count,
+'min':sqlalchemy.func.min, 'max':sqlalchemy.func.max,
+'nunique':lambda column: sqlalchemy.func.count(column.distinct())}
+
+
+def get_database_columns(table_name, columns):
+    '''This function returns (1) the source that a database query for
+    the columns within a registered table should select from and (2) a
+    dictionary that maps each of these column names to a SQLAlchemy
+    column object.
+
+    If a column isn't part of the table's registered columns and the table
+    has a join_table (see register_table()), the column will be retrieved
+    from join_table instead. In this case, the source will be a left join
+    of the two tables on Student_ID, which matches the merge performed by
+    merge_demographics_into_df().'''
+    table_settings = registered_tables[table_name]
+    columns = list(dict.fromkeys(columns)) # Removes duplicate columns
+    if (table_settings['join_table'] is None) or (
+        table_settings['columns'] is None):
+        own_columns = columns
+    else:
+        own_columns = [column for column in columns
+        if column in table_settings['columns']]
+    joined_columns = [column for column in columns
+    if column not in own_columns]
+
+    source_table = sqlalchemy.table(table_name, *[sqlalchemy.column(column)
+    for column in set(own_columns + ['Student_ID'])])
+    query_source = source_table
+    table_columns = {column:source_table.c[column] for column in own_columns}
+    if len(joined_columns) > 0:
+        joined_table = sqlalchemy.table(table_settings['join_table'],
+        *[sqlalchemy.column(column) for column
+        in set(joined_columns + ['Student_ID'])])
+        query_source = source_table.outerjoin(joined_table,
+        source_table.c['Student_ID'] == joined_table.c['Student_ID'])
+        table_columns.update({column:joined_table.c[column]
+        for column in joined_columns})
+    return query_source, table_columns
+
+
+def aggregate_in_database(table_name, y_value, comparison_values,
+    pivot_aggfunc, filter_list = None, engine = None):
+    '''This function calculates a pivot table within the database rather
+    than within pandas. It converts its arguments (which have the same
+    meaning as within create_pivot_for_charts()) into a single
+    parameterized query of the form:
+    SELECT comparison_values, pivot_aggfunc(y_value) FROM table_name
+    WHERE column IN (values) ... GROUP BY comparison_values
+    The result has the same shape as the pivot table that pandas would
+    have created (i.e. one column for each comparison value followed by
+    the y value), but only the aggregated rows need to be transferred.
+    (If y_value is one of the measures within distinct_count_columns,
+    the query will count the distinct values of the column that it
+    refers to instead, regardless of pivot_aggfunc.)
+
+    engine: The SQLAlchemy engine to query. This defaults to
+    elephantsql_engine, but other engines (such as one connected to a local
+    SQLite copy of the database) can be passed in for testing.'''
+
+    if engine is None:
+        engine = elephantsql_engine
+    # Distinct count measures are always aggregated by counting
+    # distinct values (as within create_pivot_for_charts()), even when
+    # this function is called directly:
+    if y_value in distinct_count_columns:
+        pivot_aggfunc = 'nunique'
+    if pivot_aggfunc not in database_aggregate_functions:
+        raise ValueError(f"{pivot_aggfunc} can't be calculated by \
+the database. Supported functions: {list(database_aggregate_functions)}")
+
+    # The table's registered filters are applied alongside the filters
+    # passed to filter_list so that the database will only aggregate
+    # the rows that the in-memory version of the table would contain.
+    filters = (registered_tables[table_name]['filters'] or []) + (
+        filter_list or [])
+    y_column = distinct_count_columns.get(y_value, y_value)
+    query_source, table_columns = get_database_columns(table_name,
+    comparison_values + [y_column] + [column for column, values in filters])
+
+    group_columns = [table_columns[column] for column in comparison_values]
+    aggregated_value = database_aggregate_functions[pivot_aggfunc](
+        table_columns[y_column])
+    query = sqlalchemy.select(*group_columns,
+    aggregated_value.label(y_value)).select_from(query_source)
+    for column, values in filters:
+        query = query.where(table_columns[column].in_(values))
+    # pivot_table() leaves out rows with missing comparison values and
+    # rows whose aggregated value is missing, so the query does too.
+    for column in group_columns:
+        query = query.where(column.isnot(None))
+    if len(group_columns) > 0:
+        query = query.group_by(*group_columns)
+    query = query.having(aggregated_value.isnot(None))
+
+    df_pivot = pd.read_sql(query, con = engine)
+
+    # Converting the comparison columns to the same data types found within
+    # the in-memory tables, then sorting the rows in the same order that
+    # pivot_table() would have used:
+    # (The y value column is left as is, since aggregated values like sums
+    # may not fit within the data types used for student-level values.)
+    df_pivot = apply_table_schema(df_pivot, table_name,
+    columns = comparison_values)
+    if len(comparison_values) > 0:
+        df_pivot = df_pivot.sort_values(comparison_values,
+        ignore_index = True)
+    return df_pivot
+
+
+def get_filter_options(df, column):
+    '''This function returns a list of the unique values within a given
+    column of df (in the order in which they first appear). These values
+    can then be passed to a dcc.Dropdown() component.
+
+    df can also be the name of a registered table (see get_data_source()),
+    in which case the values will be retrieved from the database
+    (in sorted order) via a SELECT DISTINCT query.
+
+    If column appears within ordered_dimensions, the values will instead
+    be returned in the order specified there (see get_dimension_order()).
+
+    Calling tolist() converts categorical and NumPy values into
+    standard Python objects, which Dash can send to the browser.'''
+    if isinstance(df, str):
+        query_source, table_columns = get_database_columns(df, [column])
+        query = sqlalchemy.select(table_columns[column]).distinct(
+            ).select_from(query_source).where(
+            table_columns[column].isnot(None)).order_by(table_columns[column])
+        df = apply_table_schema(pd.read_sql(query, con = elephantsql_engine),
+        df)
+    if column in ordered_dimensions:
+        return get_dimension_order(column,
+        df[column].dropna().unique().tolist())
+    return df[column].dropna().unique().tolist()
+
+
 def create_filters_and_comparisons(df, default_comparison_option = ['School']):
     '''This function creates a set of filters and comparison options that
     can be imported into the layout section of a dashboard page. Building
@@ -190,7 +2169,8 @@ def create_filters_and_comparisons(df, default_comparison_option = ['School']):
     thus simplifying my code.
     
     df refers to the DataFrame from which you would like to retrieve
-    comparison options. This should generally be the same DataFrame
+    comparison options. (This can also be the name of a registered table;
+    see get_data_source().) This should generally be the same DataFrame
     on which visualizations will be based. Otherwise, the user will
     be presented with options that don't match the actual options
     found in the DataFrame.
@@ -206,36 +2186,43 @@ def create_filters_and_comparisons(df, default_comparison_option = ['School']):
     # The Dash documentation on dcc.Dropdown was very helpful also. It's 
     # available at https://dash.plotly.com/dash-core-components/dropdown
 
+    # Each filter's options are retrieved just once, then used as both
+    # the dropdown's options and its initial selection. (When df is the
+    # name of a registered table, each call to get_filter_options() runs
+    # a separate database query.)
+    filter_options = {column:get_filter_options(df, column) for column
+    in ['School', 'Gender', 'Grade', 'Race', 'Ethnicity']}
+
     filters_and_comparisons = html.Div([
         # Generating filter options:
         dbc.Row(
             [dbc.Col('Schools:', lg = 1),
             dbc.Col(
-                dcc.Dropdown(df['School'].unique(), 
-                list(df['School'].unique()), 
+                dcc.Dropdown(filter_options['School'],
+                filter_options['School'], 
                 id='school_filter', multi=True), lg = 4), 
             dbc.Col('Genders:', lg = 1),
             dbc.Col(
-                dcc.Dropdown(df['Gender'].unique(), 
-                list(df['Gender'].unique()), id='gender_filter', 
+                dcc.Dropdown(filter_options['Gender'],
+                filter_options['Gender'], id='gender_filter', 
                 multi=True), lg = 3)
                 ]),
         dbc.Row([
             dbc.Col('Grades:', lg = 1),
             dbc.Col(
-                dcc.Dropdown(df['Grade'].unique(), 
-                list(df['Grade'].unique()), id='grade_filter', 
+                dcc.Dropdown(filter_options['Grade'],
+                filter_options['Grade'], id='grade_filter', 
                 multi=True))]),
         dbc.Row([
             dbc.Col('Races:', lg = 1),
             dbc.Col(
-                dcc.Dropdown(df['Race'].unique(), 
-                list(df['Race'].unique()), id='race_filter', 
+                dcc.Dropdown(filter_options['Race'],
+                filter_options['Race'], id='race_filter', 
                 multi=True), lg = 6),
             dbc.Col('Ethnicities:', lg = 1),
             dbc.Col(
-                dcc.Dropdown(df['Ethnicity'].unique(), 
-                list(df['Ethnicity'].unique()), 
+                dcc.Dropdown(filter_options['Ethnicity'],
+                filter_options['Ethnicity'], 
                 id='ethnicity_filter', 
                 multi=True), lg = 4)            
                 ]),
@@ -286,7 +2273,8 @@ comparison_values, pivot_aggfunc, filter_list = None,
 color_value = None, drop_color_value_from_x_vals = True, 
 secondary_differentiator = None, 
 drop_secondary_differentiator_from_x_vals = True,
-reorder_bars_by = '', reordering_map = {}, debug = False):
+reorder_bars_by = '', aggregation_cube = None,
+bitmap_index = None, debug = False):
     '''This function turns the DataFrame passed to original_data_source
     into a pivot table that can serve as the basis for a Plotly chart. This 
     code plays a crucial role in making the charts truly interactive, as
@@ -298,8 +2286,24 @@ reorder_bars_by = '', reordering_map = {}, debug = False):
     this function to support the creation of multiple graph types.
     
     original_data_source: The source of the data that will be graphed.
+    This can also be the name of a registered table, in which case the
+    pivot table will be calculated by the database.
+    (See aggregate_in_database() and create_pivot_for_table().)
+
+    aggregation_cube: The aggregation cube of the table passed to
+    original_data_source (see build_aggregation_cube()). If this is
+    provided, the pivot table will be created from the cube whenever
+    possible, which is much faster than filtering and pivoting the
+    table itself.
 
-    y_value: The y value to use within the graph.
+    bitmap_index: The bitmap index of the table passed to
+    original_data_source (see build_bitmap_index()).
+    If the pivot table can't be created from aggregation_cube, this index
+    will be used (when provided) to filter the table's rows.
+
+    y_value: The y value to use within the graph. This can also be one of
+    the measures within distinct_count_columns (such as Unique_Students),
+    which will be aggregated by counting distinct values.
 
     comparison_values: A list of values that will be used to pivot the
     DataFrame. These values help determine the level of detail shown in the
@@ -307,7 +2311,10 @@ reorder_bars_by = '', reordering_map = {}, debug = False):
     if no comparison values will be used. 
 
     pivot_aggfunc: The aggregate function ('mean', 'sum', 'count', etc.) 
-    to be passed to the pivot_table() call.
+    to be passed to the pivot_table() call. This can also be one of the
+    functions within sketch_aggregate_functions (such as 'median', 'p90',
+    or 'box'), which are calculated from quantile sketches. (See
+    pivot_with_sketches() for more details.)
 
     filter_list: A list of tuples that govern how the DataFrame will be 
     filtered. The first component of each tuple is a column name; the second
@@ -336,24 +2343,15 @@ reorder_bars_by = '', reordering_map = {}, debug = False):
     the variable stored in secondary_differentiator from the pivot table
     column that will contain different x values.
 
-    reorder_bars_by and reordering_map: Variables that you can
-    use to update the order of the bars in the resulting chart. For instance,
-    suppose you want to order the bars by a 'Grade' column whose values
-    range from K (kindergarten) to 12. If these are stored as strings 
-    (which they often will be due to the inclusion of 'K'),
-    the first 5 bars will be 1, 10, 11, 12, and 2, and the 
-    last bar will be K. (That's because these x values are 
-    being sorted alphabetically). However, by setting
-    reorder_bars_by to 'grade' and reordering_map to {'K':0, '1':1, '2':2, 
-    '3':3, . . . '12':12},
-    you can instruct the function to (1) create a new order for the grade
-    column and then (2) sort the DataFrame based on this new order. This 
-    sort operation will in turn reorder the bars so that 'K' comes first
-    and '12' comes last.
-
-    Note: If you don't need to update the sort order of the values in the 
-    column whose name was passed to reorder_bars_by, simply keep 
-    reordering_map as {}.
+    reorder_bars_by: The name of a column by which the bars in the
+    resulting chart should be ordered. (For instance, if this is set to
+    'Grade' and comparison_values is ['School', 'Grade'], all of the
+    kindergarten bars will appear first, followed by all of the 1st grade
+    bars, and so on.) Pivot tables are already sorted by each of their
+    comparison values in turn, and the values of the columns within
+    ordered_dimensions (such as Grade) are sorted in the order specified
+    there rather than alphabetically. Therefore, if you only need the
+    bars to appear in this order, you can leave reorder_bars_by as ''.
     
     debug: set to True to include additional print statements during
     the function's execution.'''
@@ -365,34 +2363,52 @@ reorder_bars_by = '', reordering_map = {}, debug = False):
     if secondary_differentiator == 'None':
         secondary_differentiator = None
 
+    # Distinct count measures are always aggregated by counting
+    # distinct values:
+    if y_value in distinct_count_columns:
+        pivot_aggfunc = 'nunique'
+
     if debug == True:
         print("Current state of color_value:", color_value, type(color_value))
         print("Current state of secondary_differentiator:",
         secondary_differentiator, type(secondary_differentiator))
         print("Filter list:",filter_list)
 
-    data_source = original_data_source.copy()
-    
     all_data_value = 'All'
 
-    # The following line goes through each tuple in filter_list and
-    # filters the DataFrame based on the values provided there.
-    # filter[0] corresponds to a column in the DataFrame, and filter[1]
-    # contains a list of which values to keep within that column.
-    data_source_filtered = data_source.copy()
-    if filter_list != None:
-        for filter in filter_list:
-           data_source_filtered.query(
-            f"{filter[0]} in {filter[1]}", inplace = True)
+    pre_aggregated_pivot = None
+    if isinstance(original_data_source, str):
+        # In this case, original_data_source is the name of a registered
+        # table (see create_pivot_for_table()), so the database will
+        # perform both the filtering and the aggregation.
+        pre_aggregated_pivot = aggregate_in_database(original_data_source,
+        y_value, comparison_values, pivot_aggfunc, filter_list)
+    elif aggregation_cube is not None:
+        # If possible, the pivot table will be created by rolling up the
+        # table's aggregation cube rather than by scanning the table's rows.
+        pre_aggregated_pivot = roll_up_aggregation_cube(aggregation_cube,
+        y_value, comparison_values, pivot_aggfunc, filter_list)
+
+    if pre_aggregated_pivot is not None:
+        # The result will be used as the pivot table below.
+        data_source_filtered = pre_aggregated_pivot
+    else:
+        if filter_list == None:
+            filter_list = []
+        # (See filter_table() for more details.)
+        data_source_filtered = filter_table(original_data_source,
+        filter_list, bitmap_index)
     if debug == True:
         print("data_source_filtered:",data_source_filtered)
         print("data_source_length:",len(data_source_filtered))
     if len(data_source_filtered) == 0:
         # In this case, the filters have excluded all results from the 
-        # DataFrame. We'll return the empty DataFrame here so that the user
-        # can see that all items have been filtered out.
+        # DataFrame. The empty DataFrame will still pass through the
+        # steps below so that the pivot table that gets returned has the
+        # same columns (e.g. School, Students, and Group) as a non-empty
+        # one would. (The chart functions will then display an empty
+        # chart, and exports will contain the pivot table's header row.)
         print("All items have been filtered out. Returning empty DataFrame.")
-        return data_source_filtered.copy()
     # The color value must be present within the comparison_values
     # table. If it is not, the following line sets color_value to None.
     if color_value not in comparison_values:
@@ -412,16 +2428,49 @@ reorder_bars_by = '', reordering_map = {}, debug = False):
     # variable will be used as the index for the pivot_table() function. 
     # Otherwise, a new column will be 
     # created (with the same value in every cell), and the pivot_table()
-    # function will use this column as its index instead. 
-    if len(comparison_values) == 0:
-        data_source_filtered[all_data_value] = all_data_value 
-        data_source_pivot = data_source_filtered.pivot_table(
-            index = all_data_value, values = y_value, 
-            aggfunc = pivot_aggfunc).reset_index()
+    # function will use this column as its index instead.
+    # observed = True prevents pivot_table() from adding rows for
+    # combinations of categorical values that don't appear in the data.
+    if pre_aggregated_pivot is not None:
+        # The data have already been aggregated.
+        data_source_pivot = data_source_filtered
+        if len(comparison_values) == 0:
+            data_source_pivot.insert(0, all_data_value, all_data_value)
     else:
-        data_source_pivot = data_source_filtered.pivot_table(
-            index = comparison_values, values = y_value, 
-            aggfunc = pivot_aggfunc).reset_index()
+        # Sums, counts, and means will be calculated via
+        # pivot_with_bincount(), which is much faster than pivot_table().
+        # (Distinct counts, medians, percentiles, and box plot statistics
+        # will be calculated via pivot_rows_with_distinct_counts() and
+        # pivot_rows_with_sketches() instead.)
+        if y_value in distinct_count_columns:
+            data_source_pivot = pivot_rows_with_distinct_counts(
+                data_source_filtered, y_value, comparison_values)
+        elif pivot_aggfunc in sketch_aggregate_functions:
+            data_source_pivot = pivot_rows_with_sketches(
+                data_source_filtered, y_value, comparison_values,
+                pivot_aggfunc)
+        else:
+            data_source_pivot = pivot_with_bincount(data_source_filtered,
+            y_value, comparison_values, pivot_aggfunc)
+        if data_source_pivot is not None:
+            if len(comparison_values) == 0:
+                data_source_pivot.insert(0, all_data_value, all_data_value)
+        elif len(comparison_values) == 0:
+            data_source_filtered[all_data_value] = all_data_value
+            data_source_pivot = data_source_filtered.pivot_table(
+                index = all_data_value, values = y_value,
+                aggfunc = pivot_aggfunc, observed = True).reset_index()
+        else:
+            data_source_pivot = data_source_filtered.pivot_table(
+                index = comparison_values, values = y_value,
+                aggfunc = pivot_aggfunc, observed = True).reset_index()
+
+    # Measures such as Score are stored as 32-bit floats in order to save
+    # memory. However, the aggregated values are converted back to 64-bit
+    # floats so that they will round cleanly within charts and tables.
+    if data_source_pivot[y_value].dtype == 'float32':
+        data_source_pivot[y_value] = data_source_pivot[y_value].astype(
+            'float64')
 
     # Next, we need to create x values that reflect the different column
     # values in each row of the pivot table. These x values will then 
@@ -459,48 +2508,32 @@ reorder_bars_by = '', reordering_map = {}, debug = False):
          
         if debug == True:
             print(data_descriptor_values)   
-        data_descriptor = data_source_pivot[
-            data_descriptor_values[0]].copy().astype('str') # This line 
-        # initializes data_descriptor as the first item within 
-        # data_descriptor_values. copy() is needed in order to avoid 
-        # modifying this column when the group column gets chosen.
-
-        # The following for loop iterates through each column name (except
-        # for the initial column, which has already been added
-        # to data_descriptor) in order to add all of the values present in 
-        # data_descriptor_values to data_descriptor.
-        # The use of a for loop allows this code to adapt to different variable
-        # choices and different column counts.
-        for i in range(1, len(data_descriptor_values)):
-            data_descriptor += ' ' + data_source_pivot[
-                data_descriptor_values[i]].astype('str') # This line adds 
-                # the value of a given column to data_descriptor.
+        # Combining the values of each column within data_descriptor_values
+        # into a single label for each row:
+        # (See create_group_labels() for more details. Passing a list of
+        # columns, rather than hard-coding them, allows this code to adapt
+        # to different variable choices and different column counts.)
+        data_descriptor = create_group_labels(data_source_pivot,
+        data_descriptor_values)
 
     data_source_pivot['Group'] = data_descriptor # This group column will be 
-    # used as the x value of the chart.
+    # used as the x value of the chart. (Except when no comparisons were
+    # selected, it will be a categorical column.)
 
     # The following code reorders the rows in the pivot table
     # in order to change the order of the items in the ensuing chart.
-    # See the description of reorder_bars_by and reordering_map
-    # in the function docstring for more information.
-    if (reorder_bars_by != '') & (reorder_bars_by in data_source_pivot.columns):
-        # The above line first checks to ensure that the column passed to
-        # reorder_bars_by is actually in the pivot; otherwise, we'll run 
-        # into an error by trying to sort by a nonexistent column.
-        if reordering_map == {}: # Since nothing has been passed to 
-            # reordering_map, the function will simply sort the DataFrame
-            # by the values in the column referenced by reorder_bars_by.
-            data_source_pivot.sort_values('reorder_bars_by', inplace = True)
-        else: # In this case, the function will first create a separate column
-            # that will store a new order of the values in reorder_bars_by,
-            # then sort the DataFrame by that column instead. 
-            data_source_pivot['column_for_sorting'] = data_source_pivot[
-                reorder_bars_by].map(reordering_map)
-            data_source_pivot.sort_values('column_for_sorting', 
-            inplace = True)
-            data_source_pivot.drop('column_for_sorting', axis = 1, 
-            inplace = True) # This column is no longer needed,
-            # so we can remove it from the DataFrame.
+    # See the description of reorder_bars_by in the function docstring
+    # for more information.
+    # (The pivot table is already sorted by its first comparison value,
+    # so no sorting is needed when reorder_bars_by is that column.
+    # Otherwise, a stable sort is used so that the rows will remain in
+    # the order of the other comparison values within each value of
+    # reorder_bars_by. Categorical columns are sorted by their codes, so
+    # ordered dimensions will be sorted in their specified order.)
+    if ((reorder_bars_by in data_source_pivot.columns)
+        & (reorder_bars_by in comparison_values[1:])):
+        data_source_pivot.sort_values(reorder_bars_by, kind = 'stable',
+        inplace = True)
     
     if debug == True:
         print("Pivot table created for charts/tables:")
@@ -508,11 +2541,721 @@ reorder_bars_by = '', reordering_map = {}, debug = False):
     return data_source_pivot
 
 
+# Caching pivot tables:
+
+# Most of the dashboards' traffic consists of a few hundred popular
+# combinations of filters and comparisons (such as each page's default
+# view). Therefore, create_pivot_for_table() saves each pivot table that it
+# creates within pivot_cache so that later requests for the same pivot
+# table can be answered without recalculating it. Each pivot table is saved
+# under a 'canonical' key that doesn't depend on the order in which filter
+# values were selected (see get_pivot_cache_key()), and it also includes
+# the version of the table from which the pivot table was created, so
+# pivot tables based on outdated data will never be returned.
+# Once the pivot tables' combined size exceeds pivot_cache_budget_bytes,
+# the least recently used pivot tables will be removed.
+pivot_cache_budget_bytes = 64 * 1024 * 1024
+pivot_cache = collections.OrderedDict() # Ordered from least to most
+# recently used
+pivot_cache_lock = threading.Lock()
+pivot_cache_stats = {'hits':0, 'misses':0, 'rollups':0, 'evictions':0,
+'bytes':0}
+
+
+def get_canonical_filters(filter_list, dimension_domains):
+    '''This function converts filter_list into a tuple that doesn't depend
+    on the order in which filters or filter values were selected. Filters
+    that select every value within their column are removed (see
+    remove_unrestrictive_filters()), and the remaining filters and their
+    values are sorted and deduplicated.'''
+    return tuple(sorted((column, tuple(sorted(set(values), key = repr)))
+    for column, values in remove_unrestrictive_filters(
+        filter_list or [], dimension_domains)))
+
+
+def get_pivot_cache_key(table_name, table_version, dimension_domains,
+    y_value, comparison_values, pivot_aggfunc, filter_list,
+    color_value, drop_color_value_from_x_vals, secondary_differentiator,
+    drop_secondary_differentiator_from_x_vals, reorder_bars_by):
+    '''This function converts the arguments of create_pivot_for_table()
+    into a key for pivot_cache. Requests that will produce the same pivot
+    table receive the same key: the filters are made canonical (see
+    get_canonical_filters()), and color and secondary differentiator
+    values that create_pivot_for_charts() would ignore are set to None.'''
+    canonical_filters = get_canonical_filters(filter_list,
+    dimension_domains)
+    if color_value not in comparison_values:
+        color_value = None
+    if secondary_differentiator not in comparison_values:
+        secondary_differentiator = None
+    return (table_name, table_version, y_value, tuple(comparison_values),
+    pivot_aggfunc, canonical_filters, color_value,
+    drop_color_value_from_x_vals, secondary_differentiator,
+    drop_secondary_differentiator_from_x_vals, reorder_bars_by)
+
+
+def store_pivot(pivot_cache_key, data_source_pivot):
+    '''This function adds a pivot table to pivot_cache, then removes the
+    least recently used pivot tables if the cache has exceeded
+    pivot_cache_budget_bytes. Pivot tables that were created from older
+    versions of the same table are removed as well.'''
+    pivot_size = int(data_source_pivot.memory_usage(deep = True).sum())
+    if pivot_size > pivot_cache_budget_bytes:
+        return
+    table_name, table_version = pivot_cache_key[:2]
+    with pivot_cache_lock:
+        outdated_keys = [key for key in pivot_cache if (key[0] == table_name)
+        & (key[1] < table_version)]
+        for key in outdated_keys + [pivot_cache_key]:
+            if key in pivot_cache:
+                pivot_cache_stats['bytes'] -= pivot_cache.pop(key)[1]
+        pivot_cache[pivot_cache_key] = (data_source_pivot, pivot_size)
+        pivot_cache_stats['bytes'] += pivot_size
+        while pivot_cache_stats['bytes'] > pivot_cache_budget_bytes:
+            pivot_cache_stats['bytes'] -= pivot_cache.popitem(
+                last = False)[1][1]
+            pivot_cache_stats['evictions'] += 1
+
+
+def remove_outdated_pivots(table_versions):
+    '''This function removes the pivot tables (and group totals) within
+    pivot_cache that were created from older versions of the tables
+    within table_versions, a dictionary that maps table names to their
+    current versions.'''
+    with pivot_cache_lock:
+        outdated_keys = [key for key in pivot_cache
+        if key[1] < table_versions.get(key[0], key[1])]
+        for key in outdated_keys:
+            pivot_cache_stats['bytes'] -= pivot_cache.pop(key)[1]
+
+
+def get_pivot_cache_stats():
+    '''This function returns a copy of pivot_cache_stats (which contains
+    the number of cache hits, misses, and evictions along with the
+    cache's current size in bytes) that also includes the number of
+    pivot tables currently within the cache.'''
+    with pivot_cache_lock:
+        return {**pivot_cache_stats, 'entries':len(pivot_cache)}
+
+
+# Rolling up cached group totals:
+
+# Users tend to refine a view one step at a time (e.g. by comparing
+# schools, then schools and grades, then just schools again). Therefore,
+# alongside each pivot table, create_pivot_for_table() also saves the
+# sum and count of the y value for each of the pivot table's groups
+# (its 'group totals') within pivot_cache. When a later request uses the
+# same filters but fewer comparisons, its pivot table can be created by
+# rolling up these group totals (in the same way that aggregation cubes
+# are rolled up) rather than by scanning the table again. Sums and counts
+# can be added together directly, and means can be recalculated by
+# dividing the rolled-up sums by the rolled-up counts, so this approach
+# works for every function within cube_aggregate_functions. The time
+# needed to remove a comparison will depend on the number of groups
+# rather than the number of rows.
+use_cached_rollups = True
+
+
+def create_group_totals(df, y_value, comparison_values, filter_list = None,
+    aggregation_cube = None, bitmap_index = None):
+    '''This function filters df (using filter_list), groups the remaining
+    rows by the columns within comparison_values, and then returns a
+    DataFrame with one row for each group. This DataFrame will contain
+    the comparison columns, a [y_value]_sum column, and a [y_value]_count
+    column (the latter of which excludes missing values).
+    Rows with missing comparison values are kept within groups of their
+    own (see group_by_codes()), so the group totals can later be rolled
+    up to any subset of their comparisons without losing any rows.
+    (roll_up_aggregation_cube() will then leave these groups out of the
+    pivot table, just as pivot_table() would.)
+
+    If aggregation_cube is provided (and contains all of the columns that
+    the request needs), the group totals will be calculated by rolling up
+    the cube rather than by scanning df. This argument can also be the
+    output of describe_group_totals(), which allows one set of group totals
+    to be rolled up into another. bitmap_index is used, when provided,
+    to filter df.
+
+    Returns None if y_value isn't numeric or if group_by_codes() can't
+    handle the request.'''
+    if filter_list is None:
+        filter_list = []
+    sum_column = f'{y_value}_sum'
+    count_column = f'{y_value}_count'
+    if ((aggregation_cube is not None)
+        and (y_value in aggregation_cube['measures'])
+        and all(column in aggregation_cube['dimensions'] for column
+        in comparison_values + [column for column, values in filter_list])):
+        df_cube = aggregation_cube['df']
+        filter_list = remove_unrestrictive_filters(filter_list,
+        aggregation_cube['domains'])
+        if len(filter_list) > 0:
+            df_cube = df_cube[create_filter_mask(df_cube, filter_list)]
+        grouped_data = group_by_codes(df_cube, comparison_values,
+        [sum_column, count_column], include_missing_groups = True)
+        if grouped_data is None:
+            return None
+        df_group_totals, sums, counts = grouped_data
+        df_group_totals[sum_column] = sums[sum_column]
+        df_group_totals[count_column] = sums[count_column]
+    else:
+        if df[y_value].dtype.kind not in 'biuf':
+            return None
+        grouped_data = group_by_codes(filter_table(df, filter_list,
+        bitmap_index), comparison_values, [y_value],
+        include_missing_groups = True)
+        if grouped_data is None:
+            return None
+        df_group_totals, sums, counts = grouped_data
+        df_group_totals[sum_column] = sums[y_value]
+        df_group_totals[count_column] = counts[y_value]
+    return df_group_totals
+
+
+def describe_group_totals(df_group_totals, y_value, comparison_values):
+    '''This function wraps a DataFrame created by create_group_totals()
+    within the same dictionary format that build_aggregation_cube() uses,
+    which allows it to be rolled up by roll_up_aggregation_cube() and
+    create_group_totals(). (The group totals have already been filtered,
+    so no domains are included.)'''
+    return {'dimensions':list(comparison_values), 'measures':[y_value],
+    'df':df_group_totals, 'domains':{}}
+
+
+def get_group_totals(table_name, entry, y_value, comparison_values,
+    filter_list):
+    '''This function returns group totals (see create_group_totals()) from
+    which a request's pivot table can be rolled up, wrapped via
+    describe_group_totals(). entry is the table_cache entry of the table
+    named by table_name.
+
+    If pivot_cache contains group totals for the same table version,
+    y value, and filters whose comparisons include all of the requested
+    comparisons, the smallest of these will be returned. (The pivot table
+    will then be rolled up from them directly.) Otherwise, the group totals
+    for the requested comparisons will be calculated from the table's
+    aggregation cube or rows and saved within pivot_cache so that they
+    can be reused later.
+
+    Returns None if the group totals can't be created.'''
+    canonical_filters = get_canonical_filters(filter_list,
+    entry['dimension_domains'])
+    key_prefix = (table_name, entry['version'], y_value, canonical_filters,
+    'group_totals')
+
+    with pivot_cache_lock:
+        source_keys = [key for key in pivot_cache if (key[:5] == key_prefix)
+        and set(comparison_values).issubset(key[5])]
+        if len(source_keys) > 0:
+            source_key = min(source_keys, key = lambda key: len(
+                pivot_cache[key][0]))
+            pivot_cache.move_to_end(source_key)
+            pivot_cache_stats['rollups'] += 1
+            return describe_group_totals(pivot_cache[source_key][0],
+            y_value, source_key[5])
+
+    df_group_totals = create_group_totals(entry['df'], y_value,
+    comparison_values, filter_list, entry['aggregation_cube'],
+    entry['bitmap_index'])
+    if df_group_totals is None:
+        return None
+    store_pivot(key_prefix + (tuple(comparison_values),), df_group_totals)
+    return describe_group_totals(df_group_totals, y_value,
+    comparison_values)
+
+
+def create_pivot_for_table(table_name, y_value, comparison_values,
+pivot_aggfunc, filter_list = None, color_value = None,
+drop_color_value_from_x_vals = True, secondary_differentiator = None,
+drop_secondary_differentiator_from_x_vals = True,
+reorder_bars_by = '', debug = False):
+    '''This function uses create_pivot_for_charts() to create a pivot table
+    from a registered table. (The remaining arguments have the same
+    meaning as within that function.) The table's aggregation cube and
+    bitmap index are passed along automatically.
+
+    If the same pivot table has already been created from the current
+    version of the table, the cached copy within pivot_cache will be
+    returned instead. Since this copy is shared by all callbacks, the
+    pivot table returned by this function should not be modified.
+    Otherwise, the pivot table will be created from the request's group
+    totals (see get_group_totals()) whenever possible, which allows it to
+    be rolled up from the group totals of an earlier request with more
+    comparisons.
+    
+    (Pivot tables that the database creates via aggregate_in_database()
+    aren't cached, since the app can't tell when the database's
+    tables have changed without querying them. The database can't
+    calculate the functions within sketch_aggregate_functions, so those
+    pivot tables are always created in memory.)'''
+
+    if color_value == 'None':
+        color_value = None
+    if secondary_differentiator == 'None':
+        secondary_differentiator = None
+    if y_value in distinct_count_columns:
+        pivot_aggfunc = 'nunique'
+
+    if (aggregating_in_database()
+        and (pivot_aggfunc in database_aggregate_functions)):
+        return create_pivot_for_charts(table_name, y_value,
+        comparison_values, pivot_aggfunc, filter_list = filter_list,
+        color_value = color_value,
+        drop_color_value_from_x_vals = drop_color_value_from_x_vals,
+        secondary_differentiator = secondary_differentiator,
+        drop_secondary_differentiator_from_x_vals = 
+        drop_secondary_differentiator_from_x_vals,
+        reorder_bars_by = reorder_bars_by, debug = debug)
+
+    with use_table_entry(table_name) as entry:
+        pivot_cache_key = get_pivot_cache_key(table_name, entry['version'],
+        entry['dimension_domains'], y_value, comparison_values,
+        pivot_aggfunc, filter_list, color_value,
+        drop_color_value_from_x_vals, secondary_differentiator,
+        drop_secondary_differentiator_from_x_vals, reorder_bars_by)
+        with pivot_cache_lock:
+            if pivot_cache_key in pivot_cache:
+                pivot_cache.move_to_end(pivot_cache_key)
+                pivot_cache_stats['hits'] += 1
+                return pivot_cache[pivot_cache_key][0]
+            pivot_cache_stats['misses'] += 1
+
+        group_totals = None
+        if ((use_cached_rollups == True)
+            and (pivot_aggfunc in cube_aggregate_functions)):
+            group_totals = get_group_totals(table_name, entry, y_value,
+            comparison_values, filter_list)
+
+        if group_totals is not None:
+            # The pivot table will be created by rolling up the group
+            # totals. (These have already been filtered, so the filters
+            # aren't passed along.)
+            data_source_pivot = create_pivot_for_charts(entry['df'],
+            y_value, comparison_values, pivot_aggfunc,
+            color_value = color_value,
+            drop_color_value_from_x_vals = drop_color_value_from_x_vals,
+            secondary_differentiator = secondary_differentiator,
+            drop_secondary_differentiator_from_x_vals = 
+            drop_secondary_differentiator_from_x_vals,
+            reorder_bars_by = reorder_bars_by,
+            aggregation_cube = group_totals, debug = debug)
+        else:
+            data_source_pivot = create_pivot_for_charts(entry['df'],
+            y_value, comparison_values, pivot_aggfunc,
+            filter_list = filter_list, color_value = color_value,
+            drop_color_value_from_x_vals = drop_color_value_from_x_vals,
+            secondary_differentiator = secondary_differentiator,
+            drop_secondary_differentiator_from_x_vals = 
+            drop_secondary_differentiator_from_x_vals,
+            reorder_bars_by = reorder_bars_by,
+            aggregation_cube = entry['aggregation_cube'],
+            bitmap_index = entry['bitmap_index'], debug = debug)
+
+    store_pivot(pivot_cache_key, data_source_pivot)
+    return data_source_pivot
+
+
+def create_pivots_for_table(table_name, view_specs, debug = False):
+    '''This function creates several pivot tables (or 'views') from the
+    same registered table at once. view_specs should be a dictionary that
+    maps a name for each view to a dictionary of the arguments that
+    create_pivot_for_table() should receive for it (other than table_name).
+    For example:
+    {'By School':{'y_value':'Students', 'comparison_values':['School'],
+    'pivot_aggfunc':'sum'}, ...}
+    (create_comparison_view_specs() can be used to create these
+    dictionaries.) The function returns a dictionary that maps each view's
+    name to its pivot table.
+
+    Rather than scanning the table once for each view, the function first
+    groups together the views that share the same y value and filters.
+    For each of these groups, it then calculates the group totals (see
+    get_group_totals()) of the finest grouping that the views need (i.e.
+    the combination of all of their comparisons) in a single pass. Each
+    view's pivot table can then be rolled up from these group totals, much
+    like a GROUPING SETS query within SQL. As a result, creating dozens of
+    views takes about as long as creating one.
+
+    Views that can't be rolled up from group totals (such as those that
+    show medians or distinct counts) are created one at a time.'''
+    if (use_cached_rollups == True) and (aggregating_in_database() == False):
+        with use_table_entry(table_name) as entry:
+            shared_groupings = {}
+            for view_spec in view_specs.values():
+                y_value = view_spec['y_value']
+                if ((y_value in distinct_count_columns)
+                    or (view_spec['pivot_aggfunc']
+                    not in cube_aggregate_functions)):
+                    continue
+                shared_grouping = shared_groupings.setdefault((y_value,
+                get_canonical_filters(view_spec.get('filter_list'),
+                entry['dimension_domains'])), {'comparison_values':[],
+                'filter_list':view_spec.get('filter_list')})
+                for column in view_spec['comparison_values']:
+                    if column not in shared_grouping['comparison_values']:
+                        shared_grouping['comparison_values'].append(column)
+            for (y_value, canonical_filters), shared_grouping in \
+                shared_groupings.items():
+                get_group_totals(table_name, entry, y_value,
+                shared_grouping['comparison_values'],
+                shared_grouping['filter_list'])
+
+    return {view_name:create_pivot_for_table(table_name, debug = debug,
+    **view_spec) for view_name, view_spec in view_specs.items()}
+
+
+def create_comparison_view_specs(comparison_options, max_comparisons = 2,
+    fixed_comparisons = [], **view_settings):
+    '''This function returns view specs (see create_pivots_for_table()) for
+    every combination of up to max_comparisons of the columns within
+    comparison_options (including the combination with no comparisons).
+    Each view's comparison_values list will begin with the columns in
+    fixed_comparisons (such as ['Period'] for the Test Results page).
+    view_settings contains any other create_pivot_for_table() arguments
+    (such as y_value, pivot_aggfunc, and filter_list) that all of the views
+    will share. Each view is named after its comparisons.
+
+    Example:
+    create_comparison_view_specs(enrollment_comparisons,
+    y_value = 'Students', pivot_aggfunc = 'sum')'''
+    view_specs = {}
+    for comparison_count in range(max_comparisons + 1):
+        for comparisons in itertools.combinations(comparison_options,
+            comparison_count):
+            comparison_values = list(fixed_comparisons) + list(comparisons)
+            view_specs[' + '.join(comparison_values) or 'All'] = {
+                **view_settings, 'comparison_values':comparison_values}
+    return view_specs
+
+
+# Compact figure payloads:
+
+# By default, the numeric arrays within the figures and Patches created by
+# the chart functions below (such as each trace's y values) are sent to the
+# browser as JSON lists of decimal numbers. When use_compact_serialization
+# is True, these arrays are instead sent in Plotly's 'typed array' format:
+# the array's raw bytes, encoded in base64, along with its data type
+# (e.g. {'dtype':'f8', 'bdata':'AAAAAAAA8D8='}). plotly.js decodes these
+# arrays directly, and they are much shorter than their decimal
+# equivalents (particularly for floats, which often require 15 or more
+# digits as text). Integer arrays are also stored within the smallest
+# data type that can hold their values. (Plotly figure objects already
+# encode their numpy arrays this way, but figures built as dictionaries, as
+# the chart functions below are, send them as lists unless this setting is
+# enabled.)
+# Each typed array carries around 30 characters of overhead, though, so
+# arrays with fewer than typed_array_min_length values are still sent as
+# lists; for the three-value traces of a line chart with one trace per
+# school and grade, a typed array would be slightly longer than the list
+# it replaced. For charts with many short traces, most of the payload
+# consists of each trace's names and hover text in any case, so the savings
+# are largest for charts whose traces contain many values.
+# Table data isn't affected, since DataTable components require their data
+# to be a list of dictionaries, and it usually makes up most of a callback's
+# output. As a result, the savings are modest: in
+# benchmarks/serialization_benchmark.py, typed arrays reduced the size of
+# each chart by 0% to 16%, but the size of each callback's output by only
+# 0% to 5% (and its gzipped size by -3% to 7%). This setting is therefore
+# left off by default.
+use_compact_serialization = False
+typed_array_min_length = 4
+
+# When use_orjson_serialization is True, Plotly (and thus Dash) will use the
+# orjson library, which is much faster than Python's built-in json library,
+# to encode each callback's output. (This doesn't change the size of the
+# output. In the benchmark mentioned above, it roughly halved the time
+# needed to create and encode the two largest outputs, but didn't help the
+# smaller ones.)
+use_orjson_serialization = False
+
+if use_orjson_serialization == True:
+    try:
+        import orjson
+        pio.json.config.default_engine = 'orjson'
+    except ImportError:
+        print("orjson isn't installed, so callback outputs will be encoded \
+with the json library instead.")
+
+# The integer data types that plotly.js can decode (from smallest to
+# largest):
+typed_array_int_dtypes = ['int8', 'uint8', 'int16', 'uint16', 'int32',
+'uint32']
+
+
+def encode_typed_array(values):
+    '''This function converts an array of numbers into a Plotly typed
+    array (a dictionary containing the array's data type and its bytes in
+    base64 form). Integers are converted to the smallest data type within
+    typed_array_int_dtypes that can hold them (or to 64-bit floats if none
+    of these types are large enough). Arrays that don't contain numbers
+    are returned unchanged.'''
+    values = np.asarray(values)
+    if values.dtype.kind in 'biu':
+        if len(values) == 0:
+            values = values.astype('int8')
+        else:
+            min_value, max_value = values.min(), values.max()
+            values = values.astype(next((dtype for dtype
+            in typed_array_int_dtypes if (np.iinfo(dtype).min <= min_value)
+            & (max_value <= np.iinfo(dtype).max)), 'float64'))
+    elif values.dtype.kind != 'f':
+        return values
+    # plotly.js expects little-endian data:
+    values = values.astype(values.dtype.newbyteorder('<'), copy = False)
+    return {'dtype':values.dtype.str[1:], 'bdata':base64.b64encode(
+        values.tobytes()).decode('ascii')}
+
+
+def get_trace_values(df, column):
+    '''This function returns the values within a column of df in the form
+    in which they should be added to a figure or Patch: as a typed array
+    (see encode_typed_array()) if use_compact_serialization is True and
+    the column has at least typed_array_min_length values, or as a list
+    otherwise.'''
+    if ((use_compact_serialization == False)
+        or (len(df) < typed_array_min_length)):
+        return df[column].tolist()
+    return encode_typed_array(df[column].to_numpy())
+
+
+# Updating charts in place:
+
+# When a user changes a filter, the new chart will often contain the same
+# traces and the same x values as the chart already shown in their browser;
+# only the y values will differ. In this case, rather than building and
+# sending an entire new figure, the chart functions below return a
+# dash.Patch that replaces only each trace's y values (and labels).
+# Plotly Express doesn't need to be called, and the browser receives a
+# much smaller update.
+
+# To find out whether this is possible, each chart function calculates a
+# 'chart structure' (see get_chart_structure()) that describes its
+# traces and settings. This structure is returned alongside the chart so
+# that the dashboard can save it within a dcc.Store component and pass
+# it back to the function (via current_chart_structure) the next time the
+# chart gets updated. If the new structure matches the saved one, a Patch
+# is returned; otherwise, a full figure is created.
+
+def get_chart_traces(data_source_pivot, trace_columns):
+    '''This function splits data_source_pivot into the traces that a
+    Plotly Express chart would create if its color argument (and its
+    pattern_shape or line_dash argument) were set to the columns in
+    trace_columns. It returns a list of (trace key, DataFrame) tuples,
+    where each trace key is a tuple of the trace's values for these
+    columns.
+
+    The traces are listed in the same order that Plotly Express uses:
+    they are sorted by the order in which each column's values first
+    appear within data_source_pivot, and the rows within each trace
+    retain their original order. None values within trace_columns
+    (and duplicate columns) are ignored.'''
+    trace_columns = list(dict.fromkeys(column for column in trace_columns
+    if column is not None))
+    if len(trace_columns) == 0:
+        return [((), data_source_pivot)]
+    value_orders = [{value:i for i, value in enumerate(
+        data_source_pivot[column].unique().tolist())}
+        for column in trace_columns]
+    chart_traces = list(data_source_pivot.groupby(trace_columns,
+    observed = True, sort = False))
+    return sorted(chart_traces, key = lambda chart_trace: [
+        value_order[value] for value_order, value
+        in zip(value_orders, chart_trace[0])])
+
+
+def get_chart_structure(chart_type, chart_traces, chart_settings):
+    '''This function returns a short string that identifies the structure
+    of a chart: its type, its settings (such as its color and pattern
+    variables and its axis labels), and the keys and x values of each of
+    its traces (see get_chart_traces()). Two charts with the same
+    structure differ only in their y values, so one can be converted into
+    the other with a dash.Patch.
+
+    chart_settings: A list of any other arguments that affect the chart's
+    appearance.'''
+    chart_description = json.dumps([chart_type, chart_settings,
+    [[trace_key, df_trace['Group'].tolist()] for trace_key, df_trace
+    in chart_traces]], default = str)
+    return hashlib.sha1(chart_description.encode()).hexdigest()
+
+
+def create_chart_patch(chart_traces, updated_columns):
+    '''This function returns a dash.Patch that replaces the values
+    within each trace of a chart with new values from chart_traces
+    (see get_chart_traces()).
+
+    updated_columns: A dictionary that maps each trace property to update
+    (such as 'y' or 'text') to the column containing its new values.'''
+    patched_chart = Patch()
+    for i, (trace_key, df_trace) in enumerate(chart_traces):
+        for trace_property, column in updated_columns.items():
+            patched_chart['data'][i][trace_property] = get_trace_values(
+                df_trace, column)
+    return patched_chart
+
+
+# Building figures without Plotly Express:
+
+# px.histogram() and px.line() validate their arguments, regroup the pivot
+# table into traces, and then validate every property of every trace as
+# it gets added to a go.Figure. These steps take much longer than the
+# pivot table itself when the pivot table was retrieved from pivot_cache.
+# Therefore, when use_fast_figure_builders is True, the chart functions
+# instead build each figure as a plain dictionary (which Dash can send to
+# the browser as is) from the traces returned by get_chart_traces().
+# These dictionaries contain the same traces, colors, pattern shapes,
+# line dashes, labels, hover text, and layout settings that Plotly Express
+# would have created, so the resulting charts look the same.
+# (The bar charts still use histogram traces with a histfunc of 'sum',
+# just like px.histogram(). Each trace contains only one row per x value,
+# so the browser has nothing to re-aggregate, but keeping the same trace
+# type ensures that the x axis and the bar spacing will also stay the
+# same.)
+# Set use_fast_figure_builders to False to create the figures with
+# Plotly Express instead.
+use_fast_figure_builders = True
+
+# The template that Plotly Express applies to each figure (converted into
+# a dictionary only once):
+figure_template = pio.templates[pio.templates.default].to_plotly_json()
+
+# The default pattern shape and line dash sequences used by Plotly Express:
+pattern_shape_sequence = ['', '/', '\\', 'x', '+', '.']
+line_dash_sequence = ['solid', 'dot', 'dash', 'longdash', 'dashdot',
+'longdashdot']
+
+
+def get_trace_styles(data_source_pivot, column, style_sequence,
+    style_map = None):
+    '''This function assigns a style (such as a color or pattern shape)
+    to each value within a column of data_source_pivot in the same way that
+    Plotly Express would: values found within style_map keep their
+    mapped styles, and the remaining values receive the styles within
+    style_sequence in the order in which the values first appear.
+    (The sequence repeats if there are more values than styles.)'''
+    trace_styles = dict(style_map or {})
+    for value in data_source_pivot[column].unique().tolist():
+        if value not in trace_styles:
+            trace_styles[value] = style_sequence[
+                len(trace_styles) % len(style_sequence)]
+    return trace_styles
+
+
+def create_figure_layout(trace_columns, x_title, y_title, **layout_settings):
+    '''This function creates the layout dictionary of a figure built by
+    create_bar_chart_figure() or create_line_chart_figure(). This layout
+    matches the one that Plotly Express would have created for a chart
+    whose color and pattern_shape (or line_dash) arguments were set to
+    the columns within trace_columns.'''
+    legend = {'tracegroupgap':0}
+    if len(trace_columns) > 0:
+        legend['title'] = {'text':', '.join(trace_columns)}
+    return {'template':figure_template,
+    'xaxis':{'anchor':'y', 'domain':[0.0, 1.0], 'title':{'text':x_title}},
+    'yaxis':{'anchor':'x', 'domain':[0.0, 1.0], 'title':{'text':y_title}},
+    'legend':legend, 'margin':{'t':60}, **layout_settings}
+
+
+def create_trace_settings(trace_key, trace_columns, hover_lines):
+    '''This function returns the name, legend group, and hover template
+    that Plotly Express would assign to the trace whose values for
+    trace_columns are stored within trace_key.
+
+    hover_lines: The hover text lines that describe each point's x and y
+    values (which will be added after the lines that describe the trace's
+    own values).'''
+    trace_name = ', '.join(str(value) for value in trace_key)
+    hover_lines = [f'{column}={value}' for column, value
+    in zip(trace_columns, trace_key)] + hover_lines
+    return {'hovertemplate':'<br>'.join(hover_lines) + '<extra></extra>',
+    'legendgroup':trace_name, 'name':trace_name,
+    'showlegend':trace_name != ''}
+
+
+def create_bar_chart_figure(data_source_pivot, chart_traces, y_value,
+    color_value, secondary_differentiator, barmode, color_discrete_map,
+    color_discrete_sequence, text_auto, x_title, y_title):
+    '''This function creates a bar chart figure (as a dictionary) that
+    matches the figure that px.histogram() would create from
+    data_source_pivot. chart_traces contains the traces returned by
+    get_chart_traces() for color_value and secondary_differentiator; for
+    definitions of the other arguments, see
+    create_interactive_bar_chart_and_table().'''
+    trace_columns = list(dict.fromkeys(column for column in
+    [color_value, secondary_differentiator] if column is not None))
+    colors = get_trace_styles(data_source_pivot, color_value,
+    color_discrete_sequence, color_discrete_map) if color_value is not None \
+    else {}
+    pattern_shapes = get_trace_styles(data_source_pivot,
+    secondary_differentiator, pattern_shape_sequence) \
+    if secondary_differentiator is not None else {}
+    traces = []
+    for trace_key, df_trace in chart_traces:
+        trace_values = dict(zip(trace_columns, trace_key))
+        trace = create_trace_settings(trace_key, trace_columns,
+        ['Group=%{x}', f'sum of {y_value}=%{{y}}'])
+        if barmode == 'group':
+            trace.update({'alignmentgroup':'True',
+            'offsetgroup':trace['name']})
+        trace.update({'bingroup':'x', 'histfunc':'sum',
+        'marker':{'color':colors.get(trace_values.get(color_value),
+        color_discrete_sequence[0]), 'pattern':{'shape':pattern_shapes.get(
+            trace_values.get(secondary_differentiator),
+            pattern_shape_sequence[0])}},
+        'orientation':'v', 'x':df_trace['Group'].tolist(),
+        'xaxis':'x', 'y':get_trace_values(df_trace, y_value), 'yaxis':'y',
+        'type':'histogram'})
+        if text_auto == True:
+            trace['texttemplate'] = '%{value}'
+        traces.append(trace)
+    return {'data':traces, 'layout':create_figure_layout(trace_columns,
+    x_title, y_title, barmode = barmode)}
+
+
+def create_line_chart_figure(data_source_pivot, chart_traces, y_value,
+    color_value, secondary_differentiator, color_discrete_map,
+    color_discrete_sequence, x_title, y_title):
+    '''This function creates a line chart figure (as a dictionary) that
+    matches the figure that px.line() would create from the same pivot
+    table (with the y value column also used as each point's label).
+    See create_bar_chart_figure() for more details.
+
+    px.line() shows markers whenever text labels are added, regardless of
+    its markers argument, so every trace uses a mode of
+    'lines+markers+text'.'''
+    trace_columns = list(dict.fromkeys(column for column in
+    [color_value, secondary_differentiator] if column is not None))
+    colors = get_trace_styles(data_source_pivot, color_value,
+    color_discrete_sequence, color_discrete_map) if color_value is not None \
+    else {}
+    line_dashes = get_trace_styles(data_source_pivot,
+    secondary_differentiator, line_dash_sequence) \
+    if secondary_differentiator is not None else {}
+    traces = []
+    for trace_key, df_trace in chart_traces:
+        trace_values = dict(zip(trace_columns, trace_key))
+        trace = create_trace_settings(trace_key, trace_columns,
+        ['Group=%{x}', f'{y_value}=%{{text}}'])
+        y_values = get_trace_values(df_trace, y_value)
+        trace.update({'line':{'color':colors.get(trace_values.get(
+            color_value), color_discrete_sequence[0]),
+        'dash':line_dashes.get(trace_values.get(secondary_differentiator),
+            line_dash_sequence[0])},
+        'marker':{'symbol':'circle'},
+        'mode':'lines+markers+text',
+        'orientation':'v', 'text':y_values, 'x':df_trace['Group'].tolist(),
+        'xaxis':'x', 'y':y_values, 'yaxis':'y', 'type':'scatter'})
+        traces.append(trace)
+    return {'data':traces, 'layout':create_figure_layout(trace_columns,
+    x_title, y_title)}
+
+
 def create_interactive_bar_chart_and_table(data_source_pivot, y_value,
 comparison_values, color_value = None, color_discrete_map = None, 
 barmode = 'group', color_discrete_sequence = px.colors.qualitative.Light24,
 secondary_differentiator = None, text_auto = True, label_round_precision = None,
-table_round_precision = None, custom_x_label = None, custom_y_label = None):
+table_round_precision = None, custom_x_label = None, custom_y_label = None,
+current_chart_structure = None, include_table_data = True):
     '''This function converts a pivot table (presumably one returned by
     create_pivot_for_charts() into an interactive bar chart and table.
 
@@ -552,6 +3295,20 @@ table_round_precision = None, custom_x_label = None, custom_y_label = None):
     if your y value is 'students', the chart's y axis title may read
     'sum of students.' (The 'sum of' component is added in by Plotly.)
     You can override this by setting custom_y_label to 'Enrollment.'
+
+    current_chart_structure: The chart structure (see
+    get_chart_structure()) of the chart that the user is currently
+    viewing. If the new chart has the same structure, a dash.Patch that
+    only updates the chart's y values will be returned in place of a
+    full figure.
+
+    include_table_data: Set to False to skip the conversion of the pivot
+    table into table data (e.g. because the dashboard's table is paged
+    on the server by create_table_page()). In this case, None will be
+    returned in place of the table's data.
+
+    Returns a tuple containing the chart (or a Patch), the table's data,
+    and the new chart's structure.
     '''
 
     if len(data_source_pivot) == 0:
@@ -576,7 +3333,7 @@ table_round_precision = None, custom_x_label = None, custom_y_label = None):
         if custom_y_label is not None:
             empty_chart.update_layout(yaxis_title = custom_y_label)
 
-        return empty_chart, None
+        return empty_chart, None, None
 
     # Converting 'None' strings to None values:
     if color_value == 'None':
@@ -586,21 +3343,26 @@ table_round_precision = None, custom_x_label = None, custom_y_label = None):
         secondary_differentiator = None
 
 
-    data_source_pivot_for_table = data_source_pivot.copy() # This script 
-    # will apply changes to copies of data_source_pivot so that the original
-    # pivot table is not affected.
+    # This script will apply changes to copies of data_source_pivot so that
+    # the original pivot table (which may be stored within pivot_cache)
+    # is not affected. Thanks to copy-on-write, these shallow copies
+    # share the pivot table's data until one of their columns is replaced,
+    # so only the columns that get rounded will actually be copied.
+    table_data = None
+    if include_table_data:
+        data_source_pivot_for_table = data_source_pivot.copy(deep = False) 
 
-    # Rounding table values if requested:
-    if table_round_precision != None:
-        data_source_pivot_for_table[y_value] = round(
-            data_source_pivot_for_table[y_value], table_round_precision)
+        # Rounding table values if requested:
+        if table_round_precision != None:
+            data_source_pivot_for_table[y_value] = round(
+                data_source_pivot_for_table[y_value], table_round_precision)
 
-    table_data = data_source_pivot_for_table.to_dict('records') 
-    # See https://dash.plotly.com/datatable
-    # This data will get returned at the end of the function so that it can
-    # serve as the basis for a data table within a dashboard.
+        table_data = data_source_pivot_for_table.to_dict('records') 
+        # See https://dash.plotly.com/datatable
+        # This data will get returned at the end of the function so that it
+        # can serve as the basis for a data table within a dashboard.
 
-    data_source_pivot_for_chart = data_source_pivot.copy()
+    data_source_pivot_for_chart = data_source_pivot.copy(deep = False)
 
     # There is no need to perform bar grouping if only one pivot variable 
     # exists, so the following if/else statement sets barmode to 
@@ -627,6 +3389,26 @@ table_round_precision = None, custom_x_label = None, custom_y_label = None):
             data_source_pivot_for_chart[y_value], 
         label_round_precision)
 
+    # Returning a Patch if the user's chart already has the same structure:
+    # (The bars' labels are calculated by Plotly from their y values, so
+    # only the y values need to be updated.)
+    chart_traces = get_chart_traces(data_source_pivot_for_chart,
+    [color_value, secondary_differentiator])
+    chart_structure = get_chart_structure('bar', chart_traces, [y_value,
+    color_value, secondary_differentiator, selected_barmode,
+    color_discrete_map, color_discrete_sequence, text_auto,
+    custom_x_label, custom_y_label])
+    if chart_structure == current_chart_structure:
+        return create_chart_patch(chart_traces, {'y':y_value}), \
+        table_data, chart_structure
+
+    if use_fast_figure_builders == True:
+        return create_bar_chart_figure(data_source_pivot_for_chart,
+        chart_traces, y_value, color_value, secondary_differentiator,
+        selected_barmode, color_discrete_map, color_discrete_sequence,
+        text_auto, custom_x_label or 'Group',
+        custom_y_label or f'sum of {y_value}'), table_data, chart_structure
+
     # Creating the bar chart:
     # px.histogram() is used instead of px.bar() in order to group different
     # components of each bar together. For px.histogram() documentation,
@@ -649,7 +3431,7 @@ table_round_precision = None, custom_x_label = None, custom_y_label = None):
     if custom_y_label is not None:
         output_histogram.update_layout(yaxis_title = custom_y_label)
 
-    return output_histogram, table_data
+    return output_histogram, table_data, chart_structure
 
 
 
@@ -659,7 +3441,8 @@ comparison_values, color_value = None, color_discrete_map = None,
 color_discrete_sequence = px.colors.qualitative.Light24, 
 markers = True, secondary_differentiator = None,
 show_labels = True, label_round_precision = None,
-table_round_precision = None, custom_x_label = None, custom_y_label = None):
+table_round_precision = None, custom_x_label = None, custom_y_label = None,
+current_chart_structure = None, include_table_data = True):
     '''This function converts a pivot table (presumably one returned by
     create_pivot_for_charts() into an interactive line chart and table.
 
@@ -695,6 +3478,12 @@ table_round_precision = None, custom_x_label = None, custom_y_label = None):
 
     custom_x_label and custom_y_label: Custom x and y axis titles that will
     override the automatically generated axis titles.
+
+    current_chart_structure: See create_interactive_bar_chart_and_table().
+    (For line charts, the Patch will update both the y values and the
+    labels of each line.)
+
+    include_table_data: See create_interactive_bar_chart_and_table().
     '''
 
     if len(data_source_pivot) == 0:
@@ -719,7 +3508,7 @@ table_round_precision = None, custom_x_label = None, custom_y_label = None):
         if custom_y_label is not None:
             empty_chart.update_layout(yaxis_title = custom_y_label)
 
-        return empty_chart, None
+        return empty_chart, None, None
 
     # Converting 'None' strings to None values:
     if color_value == 'None':
@@ -739,20 +3528,25 @@ table_round_precision = None, custom_x_label = None, custom_y_label = None):
         secondary_differentiator = None
 
 
-    data_source_pivot_for_table = data_source_pivot.copy() # This script 
-    # will apply changes to copies of data_source_pivot so that the original
-    # pivot table is not affected.
+    # This script will apply changes to copies of data_source_pivot so that
+    # the original pivot table (which may be stored within pivot_cache)
+    # is not affected. Thanks to copy-on-write, these shallow copies
+    # share the pivot table's data until one of their columns is replaced,
+    # so only the columns that get rounded will actually be copied.
+    table_data = None
+    if include_table_data:
+        data_source_pivot_for_table = data_source_pivot.copy(deep = False) 
     
-    # Rounding table values (if requested):
-    if table_round_precision != None:
-        data_source_pivot_for_table[y_value] = round(
-            data_source_pivot_for_table[y_value], table_round_precision)
+        # Rounding table values (if requested):
+        if table_round_precision != None:
+            data_source_pivot_for_table[y_value] = round(
+                data_source_pivot_for_table[y_value], table_round_precision)
 
-    table_data = data_source_pivot_for_table.to_dict('records') 
-    # See https://dash.plotly.com/datatable
+        table_data = data_source_pivot_for_table.to_dict('records') 
+        # See https://dash.plotly.com/datatable
 
 
-    data_source_pivot_for_chart = data_source_pivot.copy()
+    data_source_pivot_for_chart = data_source_pivot.copy(deep = False)
 
 
     # Rounding y values to be shown in labels (if requested):
@@ -767,6 +3561,22 @@ table_round_precision = None, custom_x_label = None, custom_y_label = None):
     else:
         text = None
 
+    chart_traces = get_chart_traces(data_source_pivot_for_chart,
+    [color_value, secondary_differentiator])
+    chart_structure = get_chart_structure('line', chart_traces, [y_value,
+    color_value, secondary_differentiator, color_discrete_map,
+    color_discrete_sequence, markers, custom_x_label, custom_y_label])
+    if chart_structure == current_chart_structure:
+        return create_chart_patch(chart_traces, {'y':y_value,
+        'text':y_value}), table_data, chart_structure
+
+    if use_fast_figure_builders == True:
+        return create_line_chart_figure(data_source_pivot_for_chart,
+        chart_traces, y_value, color_value, secondary_differentiator,
+        color_discrete_map, color_discrete_sequence,
+        custom_x_label or 'Group', custom_y_label or y_value), \
+        table_data, chart_structure
+
     # For Plotly line chart documentation, see:
     # https://plotly.com/python/line-charts/
     output_chart = px.line(data_source_pivot_for_chart, x = 'Group', 
@@ -784,4 +3594,560 @@ table_round_precision = None, custom_x_label = None, custom_y_label = None):
     if custom_y_label is not None:
         output_chart.update_layout(yaxis_title = custom_y_label)
     
-    return output_chart, table_data
\ No newline at end of file
+    return output_chart, table_data, chart_structure
+
+
+def create_interactive_box_plot_and_table(data_source_pivot, y_value,
+comparison_values, color_value = None,
+color_discrete_sequence = px.colors.qualitative.Light24,
+table_round_precision = None, custom_x_label = None, custom_y_label = None,
+current_chart_structure = None, include_table_data = True):
+    '''This function converts a pivot table created with a pivot_aggfunc
+    of 'box' (see pivot_with_sketches()) into an interactive box plot
+    and table. Since the pivot table already contains each group's
+    quartiles and fences, the boxes are drawn from these statistics
+    rather than from the underlying scores.
+
+    For definitions of y_value, comparison_values, and color_value,
+    see create_pivot_for_charts(). For definitions of the remaining
+    arguments, see create_interactive_line_chart_and_table().
+    (When a Patch is returned, it will update each box's quartiles and
+    fences.)'''
+
+    if len(data_source_pivot) == 0:
+        # As within create_interactive_line_chart_and_table(), an empty
+        # chart is returned if there's no data to plot.
+        empty_chart = go.Figure(go.Box(x = [0], q1 = [0], median = [0],
+        q3 = [0], lowerfence = [0], upperfence = [0]))
+        empty_chart.update_layout(xaxis_title = custom_x_label or 'Group',
+        yaxis_title = custom_y_label or y_value)
+        return empty_chart, None, None
+
+    if color_value == 'None':
+        color_value = None
+    if color_value not in comparison_values:
+        color_value = None
+
+    box_plot_columns = get_box_plot_columns(y_value)
+
+    # (See create_interactive_line_chart_and_table() for more details.)
+    table_data = None
+    if include_table_data:
+        data_source_pivot_for_table = data_source_pivot.copy(deep = False)
+        if table_round_precision != None:
+            for column in box_plot_columns.values():
+                data_source_pivot_for_table[column] = round(
+                    data_source_pivot_for_table[column],
+                    table_round_precision)
+        table_data = data_source_pivot_for_table.to_dict('records')
+
+    # One box trace will be added for each color value (or a single trace
+    # will be added if no color value was specified). The traces share
+    # the same x axis, so boxmode = 'group' places them side by side.
+    chart_traces = get_chart_traces(data_source_pivot, [color_value])
+    chart_structure = get_chart_structure('box', chart_traces, [y_value,
+    color_value, color_discrete_sequence, custom_x_label, custom_y_label])
+    if chart_structure == current_chart_structure:
+        return create_chart_patch(chart_traces, {'lowerfence':
+        box_plot_columns['lower_fence'], 'q1':box_plot_columns['q1'],
+        'median':box_plot_columns['median'], 'q3':box_plot_columns['q3'],
+        'upperfence':box_plot_columns['upper_fence']}), \
+        table_data, chart_structure
+
+    output_chart = go.Figure()
+    for i, (trace_key, df_color_group) in enumerate(chart_traces):
+        output_chart.add_trace(go.Box(x = df_color_group['Group'],
+        lowerfence = df_color_group[box_plot_columns['lower_fence']],
+        q1 = df_color_group[box_plot_columns['q1']],
+        median = df_color_group[box_plot_columns['median']],
+        q3 = df_color_group[box_plot_columns['q3']],
+        upperfence = df_color_group[box_plot_columns['upper_fence']],
+        name = str(trace_key[0]) if color_value is not None else y_value,
+        marker_color = color_discrete_sequence[
+            i % len(color_discrete_sequence)]))
+    output_chart.update_layout(boxmode = 'group',
+    showlegend = color_value is not None, legend_title_text = color_value,
+    xaxis_title = custom_x_label or 'Group',
+    yaxis_title = custom_y_label or y_value)
+
+    return output_chart, table_data, chart_structure
+
+
+# Paging, sorting, and filtering tables on the server:
+
+# A pivot table with several comparisons can contain thousands of rows,
+# and sending all of these rows to a DataTable (which would then page,
+# sort, and filter them within the browser) would make each callback's
+# response much larger. Therefore, the dashboards' tables are created by
+# create_paged_table(), which sets the DataTable's page_action,
+# sort_action, and filter_action to 'custom'. Each time the user changes
+# the table's page, sort order, or filters, a callback retrieves the
+# table's pivot table (usually from pivot_cache), then uses
+# create_table_page() to filter and sort it and return only the rows on
+# the current page. The browser will therefore never receive more than
+# table_page_size rows at once, no matter how large the pivot table is.
+table_page_size = 20
+
+# The operators that can appear within a DataTable's filter_query, along
+# with the pandas comparisons that they correspond to:
+# (See https://dash.plotly.com/datatable/callbacks for more information
+# on the filter_query syntax.)
+table_filter_operators = {
+    'ge':lambda column, value: column >= value,
+    'le':lambda column, value: column <= value,
+    'lt':lambda column, value: column < value,
+    'gt':lambda column, value: column > value,
+    'ne':lambda column, value: column != value,
+    'eq':lambda column, value: column == value,
+    'contains':lambda column, value: column.str.contains(value,
+    case = False, regex = False),
+    'datestartswith':lambda column, value: column.str.startswith(value)}
+table_filter_operator_symbols = {'>=':'ge', '<=':'le', '<':'lt', '>':'gt',
+'!=':'ne', '=':'eq'}
+
+
+def create_paged_table(table_id):
+    '''This function creates a DataTable that will be paged, sorted, and
+    filtered on the server. Its data should be provided by a callback
+    that uses the table's page_current, page_size, sort_by, and
+    filter_query properties as inputs and returns the output of
+    create_table_page() to the table's data, page_count, and page_current
+    properties.
+
+    The table's CSV export button will only export the current page.
+    (The links created by create_export_links() can be used to export
+    the entire table.)'''
+    return dash_table.DataTable(id = table_id,
+    page_action = 'custom', page_current = 0, page_size = table_page_size,
+    sort_action = 'custom', sort_mode = 'multi', sort_by = [],
+    filter_action = 'custom', filter_query = '',
+    export_format = 'csv', 
+    # Allows the datatable to be exported to a .csv file. See
+    # https://dash.plotly.com/datatable/reference
+    style_table = {'height':'300px', 'overflowY':'auto'})
+
+
+def parse_table_filter_query(filter_query):
+    '''This function converts a DataTable's filter_query (e.g.
+    '{School} contains HA && {Students} > 50') into a list of
+    (column, operator, value) tuples, where each operator is a key within
+    table_filter_operators. Quoted values are returned as strings without
+    their quotes (allowing them to contain spaces); other values are
+    returned as they were written. Expressions that can't be parsed (such
+    as those with an unknown operator or an unclosed quote) are left
+    out.'''
+    filter_conditions = []
+    for filter_part in (filter_query or '').split(' && '):
+        filter_part = filter_part.strip()
+        if (filter_part.startswith('{') == False) or ('}' not in filter_part):
+            continue
+        column, expression = filter_part[1:].split('}', 1)
+        expression = expression.strip()
+        operator, separator, value = expression.partition(' ')
+        # Removing the 'i' (case-insensitive) or 's' (case-sensitive)
+        # prefix that DataTables may add to an operator:
+        # (All string comparisons are treated as case-insensitive
+        # 'contains' checks or exact matches.)
+        if ((operator not in table_filter_operators)
+            and (operator not in table_filter_operator_symbols)
+            and (operator[:1] in ['i', 's'])):
+            operator = operator[1:]
+        operator = table_filter_operator_symbols.get(operator, operator)
+        if (operator not in table_filter_operators) or (separator == ''):
+            continue
+        value = value.strip()
+        if value[:1] in ['"', "'", '`']:
+            # Values that open a quote without closing it are treated as
+            # malformed.
+            if (len(value) < 2) or (value[-1] != value[0]):
+                continue
+            value = value[1:-1]
+        filter_conditions.append((column, operator, value))
+    return filter_conditions
+
+
+def filter_table_rows(df, filter_query):
+    '''This function returns the rows within df that match a DataTable's
+    filter_query (see parse_table_filter_query()). Numeric columns are
+    compared with the filter's value as a number; all other columns
+    (including categorical ones such as Grade) are compared as strings.
+    Conditions that refer to columns not found within df, or whose value
+    can't be converted into a number for a numeric column, are ignored.'''
+    row_mask = np.ones(len(df), dtype = 'bool')
+    for column, operator, value in parse_table_filter_query(filter_query):
+        if column not in df.columns:
+            continue
+        values = df[column]
+        if (pd.api.types.is_numeric_dtype(values.dtype)
+            and operator not in ['contains', 'datestartswith']):
+            try:
+                value = float(value)
+            except ValueError:
+                continue
+        else:
+            values = values.astype('str')
+        row_mask &= table_filter_operators[operator](values,
+        value).fillna(False).to_numpy(dtype = 'bool')
+    if row_mask.all():
+        return df
+    return df[row_mask]
+
+
+def sort_table_rows(df, sort_by):
+    '''This function sorts df according to a DataTable's sort_by property
+    (a list of {'column_id':column, 'direction':'asc' or 'desc'}
+    dictionaries). A stable sort is used, so rows that share the same
+    sort values will stay in their original order. Columns not found
+    within df are ignored.'''
+    sort_by = [sort_column for sort_column in (sort_by or [])
+    if sort_column['column_id'] in df.columns]
+    if len(sort_by) == 0:
+        return df
+    return df.sort_values([sort_column['column_id']
+    for sort_column in sort_by], ascending = [sort_column['direction']
+    == 'asc' for sort_column in sort_by], kind = 'stable')
+
+
+def create_table_page(data_source_pivot, page_current, page_size,
+    sort_by = None, filter_query = '', table_round_precision = None):
+    '''This function filters and sorts a pivot table according to a
+    DataTable's filter_query and sort_by properties, then returns a tuple
+    containing (1) the rows on the page specified by page_current and
+    page_size (in the format expected by the DataTable's data property),
+    (2) the number of pages that the filtered table contains, and (3) the
+    page that was returned.
+
+    Categorical columns are sorted by their category codes, so ordered
+    dimensions (see ordered_dimensions) will appear in their specified
+    order. If page_current is past the last page (e.g. because a filter
+    was just added), the last page will be returned instead, so the page
+    number that was actually used is returned as a third item. (This can
+    be passed back to the DataTable's page_current property.)
+
+    table_round_precision: The number of decimal places to which float
+    columns should be rounded (or None to skip rounding). Only the rows on
+    the current page get rounded.'''
+    if (data_source_pivot is None) or (len(data_source_pivot) == 0):
+        return [], 1, 0
+    df_page = sort_table_rows(filter_table_rows(data_source_pivot,
+    filter_query), sort_by)
+    page_size = page_size or table_page_size
+    page_count = max(-(-len(df_page) // page_size), 1)
+    page_current = min(page_current or 0, page_count - 1)
+    df_page = df_page.iloc[page_current * page_size:
+    (page_current + 1) * page_size]
+    if table_round_precision is not None:
+        df_page = df_page.round({column:table_round_precision
+        for column in df_page.columns if df_page[column].dtype.kind == 'f'})
+    return df_page.to_dict('records'), page_count, page_current
+
+
+# Streaming table exports:
+
+# The DataTables' built-in CSV export can only export the rows that have
+# already been sent to the browser (which, now that the tables are paged
+# on the server, is just the current page). Therefore, app.py also
+# provides an /export route that can export either an entire pivot table
+# ('pivot') or the student-level rows that match a dashboard's filters
+# ('rows') as a CSV or Parquet file. Each dashboard links to this route
+# via create_export_links(); these links store the dashboard's current
+# filters and comparisons within their URLs (see create_export_url()).
+
+# Rather than creating the entire file and then sending it, the route
+# converts export_chunk_rows rows at a time into CSV or Parquet data
+# and streams each chunk to the browser before creating the next one.
+# (For student-level exports, the only other data kept in memory is the
+# positions of the matching rows.) Since each export occupies one of the
+# gunicorn threads specified within the Dockerfile until its download
+# finishes, no more than export_concurrency_limit exports can run at
+# once; additional requests will receive a 503 response asking them to
+# try again shortly. This keeps the remaining threads available for the
+# dashboards' callbacks.
+export_chunk_rows = 50000
+export_concurrency_limit = 2
+export_slots = threading.BoundedSemaphore(export_concurrency_limit)
+
+export_formats = {'csv':'text/csv',
+'parquet':'application/vnd.apache.parquet'} # (Keyed by the value of the
+# 'format' query parameter)
+export_levels = {'pivot':'Table', 'rows':'Student-level rows'}
+
+# The aggregate functions that pivot table exports can use: (These are the
+# functions that the aggregation cubes, quantile sketches, and database
+# aggregation mode support.)
+export_aggregate_functions = list(dict.fromkeys(cube_aggregate_functions
++ sketch_aggregate_functions + list(database_aggregate_functions)))
+
+# The settings that an export's URL can specify, along with their
+# default values: (All but the last three are passed to
+# create_pivot_for_table() for pivot table exports; sort_by, filter_query,
+# and table_round_precision are then applied to the pivot table in the
+# same way as within create_table_page(). Student-level exports only use
+# table_name and filter_list.)
+export_setting_defaults = {'table_name':None, 'y_value':None,
+'comparison_values':[], 'pivot_aggfunc':'sum', 'filter_list':[],
+'color_value':None, 'secondary_differentiator':None,
+'reorder_bars_by':'', 'sort_by':[], 'filter_query':'',
+'table_round_precision':None}
+
+
+def create_export_url(export_format, export_level, export_settings):
+    '''This function returns the URL of an /export request. export_format
+    and export_level should be keys within export_formats and
+    export_levels, respectively, and export_settings should be a
+    dictionary whose keys are found within export_setting_defaults.
+    These settings are stored as JSON so that filter values (such as
+    Starting_Year values) keep their data types.'''
+    return '/export?' + urllib.parse.urlencode({'format':export_format,
+    'level':export_level, 'spec':json.dumps(export_settings,
+    separators = (',', ':'))})
+
+
+def create_export_links(pivot_settings, sort_by = None, filter_query = '',
+    table_round_precision = None):
+    '''This function returns a row of links that export a dashboard's
+    pivot table and underlying student-level rows in each of the formats
+    within export_formats.
+
+    pivot_settings: A dictionary of the arguments that the dashboard
+    passes to create_pivot_for_table() (other than debug).
+
+    sort_by, filter_query, and table_round_precision: The arguments that
+    the dashboard passes to create_table_page(). (This way, the exported
+    pivot table will match the sort order and filters that the user
+    applied within the DataTable.)'''
+    export_settings = {**pivot_settings, 'sort_by':sort_by or [],
+    'filter_query':filter_query or '',
+    'table_round_precision':table_round_precision}
+    export_links = ['Export: ']
+    for export_level, level_description in export_levels.items():
+        for export_format in export_formats:
+            if len(export_links) > 1:
+                export_links.append(' | ')
+            export_links.append(html.A(
+                f'{level_description} ({export_format.upper()})',
+                href = create_export_url(export_format, export_level,
+                export_settings)))
+    return export_links
+
+
+def get_export_spec(query_args):
+    '''This function converts the query parameters of an /export request
+    (a dictionary or Flask's request.args) into a dictionary containing
+    the export's format, level, and settings. A ValueError will be
+    raised if any of these parameters are invalid.'''
+    export_format = query_args.get('format', 'csv')
+    if export_format not in export_formats:
+        raise ValueError(f"Unknown export format: {export_format}")
+    export_level = query_args.get('level', 'pivot')
+    if export_level not in export_levels:
+        raise ValueError(f"Unknown export level: {export_level}")
+    try:
+        export_settings = json.loads(query_args.get('spec', '{}'))
+    except json.JSONDecodeError as error:
+        raise ValueError(f"The export spec isn't valid JSON: {error}")
+    if isinstance(export_settings, dict) == False:
+        raise ValueError("The export spec must be a JSON object.")
+    unknown_settings = set(export_settings) - set(export_setting_defaults)
+    if len(unknown_settings) > 0:
+        raise ValueError(f"Unknown export settings: {unknown_settings}")
+
+    export_spec = {**export_setting_defaults, **export_settings,
+    'format':export_format, 'level':export_level}
+
+    def check_setting(condition, message):
+        if condition == False:
+            raise ValueError(message)
+
+    def is_list_of(values, value_types):
+        return isinstance(values, list) and all(isinstance(value,
+        value_types) and (isinstance(value, bool) == False)
+        for value in values)
+
+    # Checking the type of each setting: (JSON can represent values of any
+    # type, so settings of the wrong type would otherwise cause errors
+    # partway through the export.)
+    table_name = export_spec['table_name']
+    check_setting(isinstance(table_name, str)
+    and (table_name in registered_tables), f"Unknown table: {table_name}")
+    check_setting(is_list_of(export_spec['comparison_values'], str),
+    "comparison_values must be a list of column names.")
+    check_setting(isinstance(export_spec['filter_list'], list)
+    and all(isinstance(filter_pair, list) and (len(filter_pair) == 2)
+    and isinstance(filter_pair[0], str)
+    and is_list_of(filter_pair[1], (str, int, float))
+    for filter_pair in export_spec['filter_list']), "filter_list must be \
+a list of [column name, list of values] pairs.")
+    check_setting(isinstance(export_spec['sort_by'], list)
+    and all(isinstance(sort_column, dict)
+    and isinstance(sort_column.get('column_id'), str)
+    and (sort_column.get('direction') in ['asc', 'desc'])
+    for sort_column in export_spec['sort_by']), "sort_by must be a list \
+of {'column_id':column name, 'direction':'asc' or 'desc'} objects.")
+    check_setting(isinstance(export_spec['filter_query'], str),
+    "filter_query must be a string.")
+    check_setting((export_spec['table_round_precision'] is None)
+    or is_list_of([export_spec['table_round_precision']], int),
+    "table_round_precision must be an integer or null.")
+    for setting in ['color_value', 'secondary_differentiator']:
+        check_setting((export_spec[setting] is None)
+        or isinstance(export_spec[setting], str),
+        f"{setting} must be a column name or null.")
+    check_setting(isinstance(export_spec['reorder_bars_by'], str),
+    "reorder_bars_by must be a column name or an empty string.")
+    check_setting(export_spec['pivot_aggfunc'] in export_aggregate_functions,
+    f"Unsupported aggregate function: {export_spec['pivot_aggfunc']} \
+(supported functions: {', '.join(export_aggregate_functions)})")
+    export_spec['filter_list'] = [(column, values)
+    for column, values in export_spec['filter_list']]
+
+    # Making sure that the export only refers to the table's dimensions
+    # and measures:
+    dimensions = registered_tables[table_name]['dimensions']
+    measures = (registered_tables[table_name]['measures']
+    + registered_tables[table_name]['distinct_measures'])
+    for column in (export_spec['comparison_values'] + [column
+        for column, values in export_spec['filter_list']]):
+        check_setting(column in dimensions,
+        f"{column} isn't a dimension of {table_name}.")
+    if export_level == 'pivot':
+        check_setting(isinstance(export_spec['y_value'], str)
+        and (export_spec['y_value'] in measures),
+        f"{export_spec['y_value']} isn't a measure of {table_name}.")
+    return export_spec
+
+
+def get_export_row_positions(entry, filter_list):
+    '''This function returns the positions of the rows within a
+    table_cache entry's table that match the filters within filter_list.
+    (This is similar to filter_table(), but the matching rows themselves
+    are left within the table so that they can be exported a chunk
+    at a time.)'''
+    filter_list = remove_unrestrictive_filters(filter_list,
+    entry['dimension_domains'])
+    bitmap_index = entry['bitmap_index']
+    if ((bitmap_index is not None) and all(column
+        in bitmap_index['bitmaps'] for column, values in filter_list)):
+        return filter_with_bitmap_index(bitmap_index, filter_list)
+    return np.flatnonzero(create_filter_mask(entry['df'], filter_list))
+
+
+def generate_csv_chunks(df_chunks, df_empty):
+    '''This generator converts each DataFrame within df_chunks into
+    CSV data (as bytes). The header row is included with the first
+    chunk. (If df_chunks is empty, only the header row of df_empty
+    will be returned.)'''
+    header = True
+    for df_chunk in df_chunks:
+        yield df_chunk.to_csv(index = False, header = header).encode()
+        header = False
+    if header == True:
+        yield df_empty.to_csv(index = False).encode()
+
+
+class ExportStream(io.RawIOBase):
+    '''A write-only file object that holds the bytes written to it until
+    they are retrieved by read_written_bytes(). This allows the Parquet
+    data that pyarrow writes to be streamed a row group at a time.
+    (ParquetWriter uses tell() to record the position of each row group,
+    so tell() returns the total number of bytes written, including those
+    that have already been retrieved.)'''
+    def __init__(self):
+        self.written_chunks = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.written_chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def read_written_bytes(self):
+        written_bytes = b''.join(self.written_chunks)
+        self.written_chunks = []
+        return written_bytes
+
+
+def generate_parquet_chunks(df_chunks, df_empty):
+    '''This generator writes each DataFrame within df_chunks to a
+    Parquet file as a separate row group, yielding the file's bytes
+    after each row group (and after the file's footer) has been
+    written.'''
+    export_stream = ExportStream()
+    parquet_writer = None
+    for df_chunk in itertools.chain(df_chunks, [df_empty]):
+        if parquet_writer is None:
+            chunk_table = pyarrow.Table.from_pandas(df_chunk,
+            preserve_index = False)
+            parquet_writer = pyarrow.parquet.ParquetWriter(export_stream,
+            chunk_table.schema)
+        elif len(df_chunk) == 0:
+            continue # (df_empty is only needed if no chunks were found.)
+        else:
+            chunk_table = pyarrow.Table.from_pandas(df_chunk,
+            schema = parquet_writer.schema, preserve_index = False)
+        parquet_writer.write_table(chunk_table)
+        yield export_stream.read_written_bytes()
+    parquet_writer.close()
+    yield export_stream.read_written_bytes()
+
+
+def generate_export_chunks(export_spec):
+    '''This generator yields the contents of the file requested by an
+    export spec (see get_export_spec()) as a series of bytes objects, each
+    of which contains up to export_chunk_rows rows.
+
+    Student-level exports keep the table marked as in use (see
+    use_table_entry()) until the export finishes, so the table won't get
+    evicted or replaced partway through the download. (If
+    aggregating_in_database() returns True, these exports will load
+    the table into memory first.)'''
+    if export_spec['level'] == 'rows':
+        with use_table_entry(export_spec['table_name']) as entry:
+            df = entry['df']
+            row_positions = get_export_row_positions(entry,
+            export_spec['filter_list'])
+            print(f"Exporting {len(row_positions)} rows from \
+{export_spec['table_name']}")
+            df_chunks = (df.take(row_positions[
+                start_position:start_position + export_chunk_rows])
+            for start_position in range(0, len(row_positions),
+            export_chunk_rows))
+            yield from generate_export_format_chunks(export_spec['format'],
+            df_chunks, df.iloc[:0])
+        return
+
+    # Pivot table exports:
+    data_source_pivot = create_pivot_for_table(
+        **{setting:export_spec[setting] for setting in ['table_name',
+        'y_value', 'comparison_values', 'pivot_aggfunc', 'filter_list',
+        'color_value', 'secondary_differentiator', 'reorder_bars_by']})
+    data_source_pivot = sort_table_rows(filter_table_rows(
+        data_source_pivot, export_spec['filter_query']),
+        export_spec['sort_by'])
+    print(f"Exporting a pivot table with {len(data_source_pivot)} rows")
+    table_round_precision = export_spec['table_round_precision']
+    df_chunks = (data_source_pivot.iloc[
+        start_position:start_position + export_chunk_rows]
+    for start_position in range(0, len(data_source_pivot),
+    export_chunk_rows))
+    if table_round_precision is not None:
+        df_chunks = (df_chunk.round({column:table_round_precision
+        for column in df_chunk.columns if df_chunk[column].dtype.kind == 'f'})
+        for df_chunk in df_chunks)
+    yield from generate_export_format_chunks(export_spec['format'],
+    df_chunks, data_source_pivot.iloc[:0])
+
+
+def generate_export_format_chunks(export_format, df_chunks, df_empty):
+    '''This function passes df_chunks and df_empty to the generator
+    (generate_csv_chunks() or generate_parquet_chunks()) that
+    corresponds to export_format.'''
+    if export_format == 'parquet':
+        return generate_parquet_chunks(df_chunks, df_empty)
+    return generate_csv_chunks(df_chunks, df_empty)
@@ -0,0 +1,76 @@
+# Batch Pivot Benchmark
+
+# This script compares the time needed to create one pivot table with
+# the time needed to create 52 pivot tables (every combination of up to
+# three comparisons, with and without a Period comparison) from the same
+# synthetic table. The 50 pivot tables are created both one at a time
+# (without rolling up cached group totals) and all at once via
+# create_pivots_for_table(). Each approach is timed with and without
+# aggregation cubes.
+
+# To run this script, navigate to the dsd folder and enter:
+# python benchmarks/batch_pivot_benchmark.py
+# (app_functions_and_variables.py will load its tables as usual when it gets
+# imported, so the app's data sources will need to be available.)
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+import app_functions_and_variables as afv
+from pivot_kernel_benchmark import create_synthetic_table
+
+row_count = 4000000
+comparison_options = ['School', 'Grade', 'Gender', 'Race', 'Ethnicity']
+
+# Registering the synthetic table so that it can be stored within
+# table_cache like any other table:
+afv.register_table('benchmark_results', dimensions = ['Period']
++ comparison_options, measures = ['Score', 'Students'])
+df = create_synthetic_table(row_count)
+
+view_specs = {}
+for fixed_comparisons in [[], ['Period']]:
+    for view_name, view_spec in afv.create_comparison_view_specs(
+        comparison_options, max_comparisons = 3,
+        fixed_comparisons = fixed_comparisons, y_value = 'Score',
+        pivot_aggfunc = 'mean',
+        filter_list = [('School', ['DA', 'HA', 'SA'])]).items():
+        view_specs[view_name] = view_spec
+first_view_name = list(view_specs)[0]
+
+
+def time_function(function):
+    '''Returns the number of seconds that function() needed to run
+    (starting from an empty pivot cache).'''
+    afv.pivot_cache.clear()
+    afv.pivot_cache_stats['bytes'] = 0
+    start_time = time.perf_counter()
+    function()
+    return time.perf_counter() - start_time
+
+
+for use_aggregation_cubes in [False, True]:
+    afv.use_aggregation_cubes = use_aggregation_cubes
+    afv.store_tables({'benchmark_results':(df, None)})
+    print(f"\n{row_count:,} rows; aggregation cubes \
+{'enabled' if use_aggregation_cubes else 'disabled'}:")
+
+    afv.use_cached_rollups = False
+    one_view_seconds = time_function(lambda: afv.create_pivot_for_table(
+        'benchmark_results', **view_specs[first_view_name]))
+    individual_seconds = time_function(lambda: [afv.create_pivot_for_table(
+        'benchmark_results', **view_spec) for view_spec
+        in view_specs.values()])
+    afv.use_cached_rollups = True
+    batch_seconds = time_function(lambda: afv.create_pivots_for_table(
+        'benchmark_results', view_specs))
+
+    print(f"1 view: {one_view_seconds * 1000:.1f} ms")
+    print(f"{len(view_specs)} views, one at a time: \
+{individual_seconds * 1000:.1f} ms")
+    print(f"{len(view_specs)} views via create_pivots_for_table(): \
+{batch_seconds * 1000:.1f} ms")
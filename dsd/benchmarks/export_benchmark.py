@@ -0,0 +1,81 @@
+# Export Benchmark
+
+# This script compares two ways of exporting a synthetic student-level
+# table of 2,000,000 rows (see pivot_kernel_benchmark.py) as a CSV file:
+# (1) converting the entire table with to_csv() before sending it and
+# (2) streaming it export_chunk_rows rows at a time with
+# generate_csv_chunks(), as the app's /export route does. (See the
+# 'Streaming table exports' section of app_functions_and_variables.py.)
+# For each approach, it reports the time needed to produce the first bytes
+# of the file, the total time, and the peak amount of memory allocated
+# during the export (as measured by tracemalloc). The Parquet export is
+# timed as well, although its memory usage isn't reported, since
+# tracemalloc can't see the memory that pyarrow allocates.
+
+# To run this script, navigate to the dsd folder and enter:
+# python benchmarks/export_benchmark.py
+# (app_functions_and_variables.py will load its tables as usual when it gets
+# imported, so the app's data sources will need to be available.)
+
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+from app_functions_and_variables import export_chunk_rows, \
+generate_csv_chunks, generate_parquet_chunks
+from pivot_kernel_benchmark import create_synthetic_table
+
+row_count = 2000000
+
+
+def create_df_chunks(df):
+    return (df.iloc[start_position:start_position + export_chunk_rows]
+    for start_position in range(0, len(df), export_chunk_rows))
+
+
+def measure_export(create_export, trace_memory = True):
+    '''Consumes the chunks produced by create_export() (as a web server
+    would when sending them) and returns the time until the first chunk
+    was produced, the total time, the total number of bytes, and the
+    peak amount of memory allocated (in bytes). (tracemalloc slows down
+    the export considerably, so the memory usage is measured within a
+    separate run.)'''
+    start_time = time.perf_counter()
+    first_chunk_seconds = None
+    byte_count = 0
+    for chunk in create_export():
+        if first_chunk_seconds is None:
+            first_chunk_seconds = time.perf_counter() - start_time
+        byte_count += len(chunk)
+    total_seconds = time.perf_counter() - start_time
+    peak_bytes = None
+    if trace_memory:
+        tracemalloc.start()
+        for chunk in create_export():
+            pass
+        peak_bytes = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return first_chunk_seconds, total_seconds, byte_count, peak_bytes
+
+
+df = create_synthetic_table(row_count)
+print(f"{row_count:,} rows ({export_chunk_rows:,} rows per chunk):")
+for description, create_export, trace_memory in [
+    ('Entire table (to_csv())',
+    lambda: [df.to_csv(index = False).encode()], True),
+    ('Streamed CSV (generate_csv_chunks())',
+    lambda: generate_csv_chunks(create_df_chunks(df), df.iloc[:0]), True),
+    ('Streamed Parquet (generate_parquet_chunks())',
+    lambda: generate_parquet_chunks(create_df_chunks(df), df.iloc[:0]),
+    False)]:
+    first_chunk_seconds, total_seconds, byte_count, peak_bytes = \
+    measure_export(create_export, trace_memory)
+    peak_memory = (f"{peak_bytes / 1024 ** 2:,.1f} MB" if peak_bytes
+    is not None else 'not measured')
+    print(f"{description}: first bytes after \
+{first_chunk_seconds * 1000:.1f} ms; total: {total_seconds:.2f} s; \
+{byte_count / 1024 ** 2:,.1f} MB exported; peak memory: {peak_memory}")
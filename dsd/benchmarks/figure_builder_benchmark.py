@@ -0,0 +1,76 @@
+# Figure Builder Benchmark
+
+# This script compares the time needed to create the dashboards' bar and
+# line charts with Plotly Express and with the figure builders that
+# bypass it (see create_bar_chart_figure() and create_line_chart_figure()
+# within app_functions_and_variables.py). Both timings include the
+# conversion of each figure to JSON, since Dash needs to perform this step
+# before sending a figure to the browser.
+
+# The pivot tables are created from a synthetic table of 400,000 rows
+# (see pivot_kernel_benchmark.py). They are created before the timings
+# begin, just as they would be retrieved from pivot_cache within the app.
+
+# To run this script, navigate to the dsd folder and enter:
+# python benchmarks/figure_builder_benchmark.py
+# (app_functions_and_variables.py will load its tables as usual when it gets
+# imported, so the app's data sources will need to be available.)
+
+import os
+import sys
+import time
+import plotly.io as pio
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+import app_functions_and_variables
+from app_functions_and_variables import create_pivot_for_charts, \
+create_interactive_bar_chart_and_table, \
+create_interactive_line_chart_and_table
+from pivot_kernel_benchmark import create_synthetic_table, time_function
+
+row_count = 400000
+
+# The charts to benchmark: (description, chart function, y value,
+# comparison values, aggregate function, color value, secondary
+# differentiator)
+benchmark_cases = [
+    ('Bar chart: Students by School', create_interactive_bar_chart_and_table,
+    'Students', ['School'], 'sum', 'School', None),
+    ('Bar chart: Students by School, Grade, and Gender',
+    create_interactive_bar_chart_and_table, 'Students',
+    ['School', 'Grade', 'Gender'], 'sum', 'School', 'Gender'),
+    ('Bar chart: Students by School, Grade, Race, and Ethnicity',
+    create_interactive_bar_chart_and_table, 'Students',
+    ['School', 'Grade', 'Race', 'Ethnicity'], 'sum', 'Race', 'Ethnicity'),
+    ('Line chart: Mean Score by Period and School',
+    create_interactive_line_chart_and_table, 'Score', ['Period', 'School'],
+    'mean', 'School', None),
+    ('Line chart: Mean Score by Period, School, and Grade',
+    create_interactive_line_chart_and_table, 'Score',
+    ['Period', 'School', 'Grade'], 'mean', 'School', 'Grade')]
+
+
+df = create_synthetic_table(row_count)
+print(f"{row_count:,} rows:")
+for (description, chart_function, y_value, comparison_values,
+    pivot_aggfunc, color_value, secondary_differentiator) in benchmark_cases:
+    data_source_pivot = create_pivot_for_charts(df, y_value,
+    comparison_values, pivot_aggfunc, color_value = color_value,
+    secondary_differentiator = secondary_differentiator)
+
+    def create_chart():
+        chart = chart_function(data_source_pivot, y_value,
+        comparison_values, color_value = color_value,
+        secondary_differentiator = secondary_differentiator,
+        label_round_precision = 1)[0]
+        return pio.json.to_json_plotly(chart)
+
+    app_functions_and_variables.use_fast_figure_builders = False
+    px_seconds = time_function(create_chart)
+    app_functions_and_variables.use_fast_figure_builders = True
+    fast_seconds = time_function(create_chart)
+    print(f"{description} ({len(data_source_pivot)} bars/points): \
+Plotly Express: {px_seconds * 1000:.2f} ms; figure builders: \
+{fast_seconds * 1000:.2f} ms ({px_seconds / fast_seconds:.1f}x faster)")
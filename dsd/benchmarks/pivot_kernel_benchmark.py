@@ -0,0 +1,93 @@
+# Pivot Kernel Benchmark
+
+# This script compares the time that pivot_table() and
+# pivot_with_bincount() need to aggregate synthetic student-level tables
+# of 4,000, 400,000, and 4,000,000 rows. The synthetic tables use the same
+# dimension columns and data types as the app's own tables.
+
+# To run this script, navigate to the dsd folder and enter:
+# python benchmarks/pivot_kernel_benchmark.py
+# (app_functions_and_variables.py will load its tables as usual when it gets
+# imported, so the app's data sources will need to be available.)
+
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+from app_functions_and_variables import pivot_with_bincount
+
+row_counts = [4000, 400000, 4000000]
+repetitions = 5 # The fastest of these repetitions will be reported.
+
+# The comparisons to benchmark: (description, y value, comparison values,
+# aggregate function)
+benchmark_cases = [
+    ('Students by School', 'Students', ['School'], 'sum'),
+    ('Students by School and Grade', 'Students', ['School', 'Grade'], 'sum'),
+    ('Students by all five comparisons', 'Students',
+    ['School', 'Grade', 'Gender', 'Race', 'Ethnicity'], 'sum'),
+    ('Mean Score by Period and Grade', 'Score', ['Period', 'Grade'], 'mean'),
+    ('Mean Score by Period and all five comparisons', 'Score',
+    ['Period', 'School', 'Grade', 'Gender', 'Race', 'Ethnicity'], 'mean')]
+
+
+def create_synthetic_table(row_count, seed = 0):
+    '''This function creates a table with row_count rows whose columns
+    resemble those found within the app's test_results table (after
+    apply_table_schema() has been run).'''
+    rng = np.random.default_rng(seed)
+    dimension_values = {
+        'School':['DA', 'HA', 'SA', 'EA', 'NA', 'WA', 'CA', 'LA'],
+        'Grade':['K'] + [str(grade) for grade in range(1, 13)],
+        'Gender':['F', 'M'],
+        'Race':['African American', 'American Indian', 'Asian',
+        'Pacific Islander', 'White', 'Two or More Races'],
+        'Ethnicity':['Hispanic/Latino', 'Not Hispanic/Latino'],
+        'Period':['Fall', 'Winter', 'Spring']}
+    df = pd.DataFrame({column:pd.Categorical(rng.choice(values, row_count))
+    for column, values in dimension_values.items()})
+    df['Students'] = np.ones(row_count, dtype = 'int8')
+    df['Score'] = rng.normal(300, 50, row_count).astype('float32')
+    return df
+
+
+def time_function(function):
+    '''Returns the fastest time (in seconds) that function() needed
+    to run across the number of repetitions specified above.'''
+    times = []
+    for i in range(repetitions):
+        start_time = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start_time)
+    return min(times)
+
+
+# (The benchmark only runs when this script is run directly, so other
+# benchmarks can import create_synthetic_table() and time_function().)
+if __name__ == '__main__':
+    for row_count in row_counts:
+        df = create_synthetic_table(row_count)
+        print(f"\n{row_count:,} rows:")
+        for description, y_value, comparison_values, pivot_aggfunc \
+            in benchmark_cases:
+            # Making sure that both approaches produce the same results:
+            expected_pivot = df.pivot_table(index = comparison_values,
+            values = y_value, aggfunc = pivot_aggfunc,
+            observed = True).reset_index()
+            pd.testing.assert_frame_equal(expected_pivot, pivot_with_bincount(
+                df, y_value, comparison_values, pivot_aggfunc),
+                check_dtype = False, rtol = 1e-4)
+
+            pivot_table_seconds = time_function(lambda: df.pivot_table(
+                index = comparison_values, values = y_value,
+                aggfunc = pivot_aggfunc, observed = True).reset_index())
+            bincount_seconds = time_function(lambda: pivot_with_bincount(
+                df, y_value, comparison_values, pivot_aggfunc))
+            print(f"{description}: pivot_table(): \
+{pivot_table_seconds * 1000:.2f} ms; pivot_with_bincount(): \
+{bincount_seconds * 1000:.2f} ms ({pivot_table_seconds / bincount_seconds:.1f}x \
+faster)")
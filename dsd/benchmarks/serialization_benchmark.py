@@ -0,0 +1,101 @@
+# Serialization Benchmark
+
+# This script compares the size of the callback outputs (a chart and its
+# table data) that the dashboards send to the browser, along with the time
+# needed to create and encode them, when the charts' numeric arrays are
+# sent as lists (the default) and as typed arrays (with
+# use_compact_serialization set to True, using both the json and orjson
+# engines).
+# (See the 'Compact figure payloads' section of
+# app_functions_and_variables.py.) The outputs are encoded with
+# plotly.io.json.to_json_plotly(), which is what Dash uses to encode
+# callback responses.
+
+# The pivot tables are created from a synthetic table of 400,000 rows
+# (see pivot_kernel_benchmark.py). They are created before the timings
+# begin, just as they would be retrieved from pivot_cache within the app.
+
+# To run this script, navigate to the dsd folder and enter:
+# python benchmarks/serialization_benchmark.py
+# (app_functions_and_variables.py will load its tables as usual when it gets
+# imported, so the app's data sources will need to be available.)
+
+import os
+import sys
+import gzip
+import plotly.io as pio
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+import app_functions_and_variables
+from app_functions_and_variables import create_pivot_for_charts, \
+create_interactive_bar_chart_and_table, \
+create_interactive_line_chart_and_table
+from pivot_kernel_benchmark import create_synthetic_table, time_function
+
+row_count = 400000
+
+# The charts to benchmark: (description, chart function, y value,
+# comparison values, aggregate function, color value, secondary
+# differentiator)
+benchmark_cases = [
+    ('Bar chart: Students by School, Grade, and Gender',
+    create_interactive_bar_chart_and_table, 'Students',
+    ['School', 'Grade', 'Gender'], 'sum', 'School', 'Gender'),
+    ('Bar chart: Students by School, Grade, Race, and Ethnicity',
+    create_interactive_bar_chart_and_table, 'Students',
+    ['School', 'Grade', 'Race', 'Ethnicity'], 'sum', 'Race', 'Ethnicity'),
+    ('Bar chart: Mean Score by all five comparisons',
+    create_interactive_bar_chart_and_table, 'Score',
+    ['School', 'Grade', 'Gender', 'Race', 'Ethnicity'], 'mean', 'School',
+    None),
+    ('Line chart: Mean Score by Period, School, and Grade',
+    create_interactive_line_chart_and_table, 'Score',
+    ['Period', 'School', 'Grade'], 'mean', 'School', 'Grade'),
+    ('Line chart: Mean Score by Period and all five comparisons',
+    create_interactive_line_chart_and_table, 'Score',
+    ['Period', 'School', 'Grade', 'Gender', 'Race', 'Ethnicity'], 'mean',
+    'School', 'Grade')]
+
+
+# The settings to compare: (description, use_compact_serialization, JSON
+# engine)
+serialization_settings = [
+    ('Lists (json)', False, 'json'),
+    ('Typed arrays (json)', True, 'json'),
+    ('Typed arrays (orjson)', True, 'orjson')]
+
+
+df = create_synthetic_table(row_count)
+print(f"{row_count:,} rows:")
+for (description, chart_function, y_value, comparison_values,
+    pivot_aggfunc, color_value, secondary_differentiator) in benchmark_cases:
+    data_source_pivot = create_pivot_for_charts(df, y_value,
+    comparison_values, pivot_aggfunc, color_value = color_value,
+    secondary_differentiator = secondary_differentiator)
+
+    def create_callback_output():
+        chart, table_data, chart_structure = chart_function(
+            data_source_pivot, y_value, comparison_values,
+            color_value = color_value,
+            secondary_differentiator = secondary_differentiator)
+        return pio.json.to_json_plotly([chart, table_data])
+
+    print(f"\n{description} ({len(data_source_pivot)} rows):")
+    for (setting_description, use_compact_serialization,
+        json_engine) in serialization_settings:
+        app_functions_and_variables.use_compact_serialization = \
+        use_compact_serialization
+        pio.json.config.default_engine = json_engine
+        callback_output = create_callback_output()
+        # Measuring the size of the chart on its own:
+        chart_bytes = len(pio.json.to_json_plotly(chart_function(
+            data_source_pivot, y_value, comparison_values,
+            color_value = color_value,
+            secondary_differentiator = secondary_differentiator)[0]))
+        seconds = time_function(create_callback_output)
+        print(f"{setting_description}: {len(callback_output):,} bytes \
+(chart: {chart_bytes:,} bytes; gzipped output: \
+{len(gzip.compress(callback_output.encode())):,} bytes); \
+{seconds * 1000:.2f} ms")
@@ -7,7 +7,7 @@
 # https://dash.plotly.com/urls
 
 import dash
-from dash import Dash, html, dcc, callback, Output, Input, dash_table
+from dash import Dash, html, dcc, callback, Output, Input, State, dash_table
 # For dash_table documentation, visit https://dash.plotly.com/datatable
 import plotly.express as px
 # Many of the following items were once defined within this Python file.
@@ -15,9 +15,10 @@ import plotly.express as px
 # could be more easily accessed by other files, thus simplifying my codebase.
 
 from app_functions_and_variables import offline_mode, read_from_online_db, \
-df_curr_enrollment, create_filters_and_comparisons, \
-create_color_and_pattern_variable_dropdowns, grade_reordering_map, \
-create_pivot_for_charts, create_interactive_bar_chart_and_table
+get_data_source, create_filters_and_comparisons, \
+create_color_and_pattern_variable_dropdowns, \
+create_pivot_for_table, create_interactive_bar_chart_and_table, \
+create_paged_table, create_table_page, create_export_links
 
 import pandas as pd
 import sqlalchemy
@@ -35,18 +36,65 @@ dash.register_page(__name__, path='/')
 
 # Applying layout functions defined within
 # app_functions_and_variables.py helps simplify this section of the code.
-layout = dbc.Container([
-    create_filters_and_comparisons(df_curr_enrollment),
+# The layout is defined as a function so that the current enrollment
+# table will only be retrieved (via get_data_source()) when the page is
+# actually visited. See https://dash.plotly.com/urls for more information
+# on layout functions.
+def layout(**kwargs):
+    return dbc.Container([
+    create_filters_and_comparisons(get_data_source('curr_enrollment')),
     create_color_and_pattern_variable_dropdowns(),
     dcc.Graph(id='enrollment_chart'),
-    dash_table.DataTable(id = "enrollment_table",
-    export_format = 'csv', 
-    # Allows the datatable to be exported to a .csv file. See
-    # See https://dash.plotly.com/datatable/reference
-    style_table = {'height':'300px', 'overflowY':'auto'})
+    # The following component stores the structure of the chart that is
+    # currently being displayed. When a filter change only affects the
+    # chart's y values, this structure allows the callback to send a small
+    # Patch rather than an entirely new chart. (See
+    # get_chart_structure() within app_functions_and_variables.py.)
+    dcc.Store(id='enrollment_chart_structure'),
+    # The table is paged, sorted, and filtered on the server, so the browser
+    # only receives the rows on its current page. (See
+    # create_paged_table() within app_functions_and_variables.py.)
+    create_paged_table('enrollment_table'),
+    # Links that export the entire table (or the student-level rows behind
+    # it) via the /export route defined within app.py:
+    html.Div(id='enrollment_export_links')
 ])
 
-# Adding in code to generate a bar chart and table:
+
+def get_curr_enrollment_pivot_settings(school_filter, grade_filter,
+    gender_filter, race_filter, ethnicity_filter, enrollment_comparisons,
+    color_variable, pattern_variable):
+    '''Returns the arguments that get_curr_enrollment_pivot() passes to
+    create_pivot_for_table(). (These are also stored within the page's
+    export links.)'''
+
+    # Creating a list of filters to be passed to create_pivot_for_chart:
+    filter_list = [('School', school_filter), ('Grade',grade_filter),
+    ('Gender', gender_filter), ('Race', race_filter), 
+    ('Ethnicity', ethnicity_filter)]
+
+    return dict(table_name = 'curr_enrollment', y_value = 'Students', 
+        comparison_values = enrollment_comparisons, pivot_aggfunc= 'sum', 
+        filter_list = filter_list, color_value = color_variable, 
+        secondary_differentiator = pattern_variable, 
+        reorder_bars_by = 'Grade')
+
+
+def get_curr_enrollment_pivot(*filters_and_comparisons):
+    '''Returns the pivot table on which both the chart and the table
+    are based. (This function accepts the same arguments as
+    get_curr_enrollment_pivot_settings().) Since both callbacks below
+    request the same pivot table, the second request will generally be
+    served from pivot_cache.'''
+
+    # create_pivot_for_table() retrieves the current enrollment table and
+    # passes it to create_pivot_for_charts(). (If the same pivot table has
+    # already been created, it will return a cached copy instead.)
+    return create_pivot_for_table(**get_curr_enrollment_pivot_settings(
+        *filters_and_comparisons), debug = True)
+
+
+# Adding in code to generate a bar chart:
 
 # To better understand how callbacks work, see:
 # https://dash.plotly.com/basic-callbacks
@@ -55,7 +103,7 @@ layout = dbc.Container([
 
 @callback(
     Output('enrollment_chart', 'figure'),
-    Output('enrollment_table', 'data'),
+    Output('enrollment_chart_structure', 'data'),
     Input('school_filter', 'value'),
     Input('grade_filter', 'value'),
     Input('gender_filter', 'value'),
@@ -63,12 +111,13 @@ layout = dbc.Container([
     Input('ethnicity_filter', 'value'),
     Input('enrollment_comparisons', 'value'),
     Input('color_variable', 'value'),
-    Input('pattern_variable', 'value')
+    Input('pattern_variable', 'value'),
+    State('enrollment_chart_structure', 'data')
 )
 
 # The following update_graph() function
 # uses the input variables specified in @callback() to
-# generate a chart and table. The first argument (school_filter) 
+# generate a chart. The first argument (school_filter) 
 # corresponds to the first Input callback shown ('school_filter'),
 # the second argument corresponds to the second Input callback, and so on.
 # The callback names and function arguments don't need to match, but keeping
@@ -76,12 +125,8 @@ layout = dbc.Container([
 
 def update_graph(school_filter, grade_filter, 
     gender_filter, race_filter, ethnicity_filter,
-    enrollment_comparisons, color_variable, pattern_variable):
-
-    # Creating a list of filters to be passed to create_pivot_for_chart:
-    filter_list = [('School', school_filter), ('Grade',grade_filter),
-    ('Gender', gender_filter), ('Race', race_filter), 
-    ('Ethnicity', ethnicity_filter)]
+    enrollment_comparisons, color_variable, pattern_variable,
+    chart_structure):
 
     print("Enrollment comparisons:", enrollment_comparisons)
 
@@ -94,20 +139,88 @@ def update_graph(school_filter, grade_filter,
     # These functions are defined within app_functions_and_variables.py,
     # which makes them easier to use within other code files.
 
-    curr_enrollment_pivot = create_pivot_for_charts(
-        original_data_source=df_curr_enrollment, y_value = 'Students', 
-        comparison_values = enrollment_comparisons, pivot_aggfunc= 'sum', 
-        filter_list = filter_list, color_value = color_variable, 
-        secondary_differentiator = pattern_variable, reorder_bars_by = 'Grade', 
-        reordering_map = grade_reordering_map, debug = True)
+    curr_enrollment_pivot = get_curr_enrollment_pivot(school_filter,
+        grade_filter, gender_filter, race_filter, ethnicity_filter,
+        enrollment_comparisons, color_variable, pattern_variable)
 
-    return create_interactive_bar_chart_and_table(
+    chart, table_data, chart_structure = \
+    create_interactive_bar_chart_and_table(
         data_source_pivot = curr_enrollment_pivot, y_value = 'Students', 
         comparison_values = enrollment_comparisons, 
         color_value = color_variable, 
         secondary_differentiator= pattern_variable,
-        custom_y_label = 'Enrollment')
+        custom_y_label = 'Enrollment',
+        current_chart_structure = chart_structure,
+        include_table_data = False)
+
+    # create_interactive_bar_chart_and_table() returns a bar
+    # chart (which corresponds to the 'enrollment_chart' Output),
+    # the table's data (which is skipped here, since the table's rows
+    # are provided by update_table() below), and the chart's structure
+    # (which will be saved within the 'enrollment_chart_structure' Store).
+    return chart, chart_structure
+
+
+# The following callback provides the rows on the table's current page.
+# It runs whenever the filters and comparisons change, and also whenever
+# the user switches pages, sorts a column, or enters a filter within
+# the table itself.
+@callback(
+    Output('enrollment_table', 'data'),
+    Output('enrollment_table', 'page_count'),
+    Output('enrollment_table', 'page_current'),
+    Input('school_filter', 'value'),
+    Input('grade_filter', 'value'),
+    Input('gender_filter', 'value'),
+    Input('race_filter', 'value'),
+    Input('ethnicity_filter', 'value'),
+    Input('enrollment_comparisons', 'value'),
+    Input('color_variable', 'value'),
+    Input('pattern_variable', 'value'),
+    Input('enrollment_table', 'page_current'),
+    Input('enrollment_table', 'page_size'),
+    Input('enrollment_table', 'sort_by'),
+    Input('enrollment_table', 'filter_query')
+)
+
+def update_table(school_filter, grade_filter, gender_filter, race_filter,
+    ethnicity_filter, enrollment_comparisons, color_variable,
+    pattern_variable, page_current, page_size, sort_by, filter_query):
+
+    curr_enrollment_pivot = get_curr_enrollment_pivot(school_filter,
+        grade_filter, gender_filter, race_filter, ethnicity_filter,
+        enrollment_comparisons, color_variable, pattern_variable)
+
+    # create_table_page() returns the rows on the current page, the
+    # number of pages, and the page that was actually returned (which
+    # will differ from page_current if the table has gotten shorter).
+    return create_table_page(curr_enrollment_pivot, page_current,
+        page_size, sort_by, filter_query)
+
+
+# The following callback updates the export links so that they will
+# export the table that the user is currently viewing. (No pivot table
+# is needed here; the /export route will create or retrieve it once a
+# link is clicked.)
+@callback(
+    Output('enrollment_export_links', 'children'),
+    Input('school_filter', 'value'),
+    Input('grade_filter', 'value'),
+    Input('gender_filter', 'value'),
+    Input('race_filter', 'value'),
+    Input('ethnicity_filter', 'value'),
+    Input('enrollment_comparisons', 'value'),
+    Input('color_variable', 'value'),
+    Input('pattern_variable', 'value'),
+    Input('enrollment_table', 'sort_by'),
+    Input('enrollment_table', 'filter_query')
+)
+
+def update_export_links(school_filter, grade_filter, gender_filter,
+    race_filter, ethnicity_filter, enrollment_comparisons, color_variable,
+    pattern_variable, sort_by, filter_query):
 
-        # create_interactive_bar_chart_and_table() returns both a bar
-        # chart (which corresponds to the 'enrollment_chart' Output)
-        # and a table (which corresponds to the 'enrollment_table' Output). 
+    return create_export_links(get_curr_enrollment_pivot_settings(
+        school_filter, grade_filter, gender_filter, race_filter,
+        ethnicity_filter, enrollment_comparisons, color_variable,
+        pattern_variable), sort_by, filter_query)
@@ -7,15 +7,16 @@
 # current_enrollment.py.
 
 import dash
-from dash import html, dcc, callback, Output, Input, dash_table
+from dash import html, dcc, callback, Output, Input, State, dash_table
 import pandas as pd
 import plotly.express as px
 
 from app_functions_and_variables import offline_mode, read_from_online_db, \
-create_filters_and_comparisons, grade_reordering_map, create_pivot_for_charts, \
-create_interactive_bar_chart_and_table, retrieve_data_from_table, \
+create_filters_and_comparisons, create_pivot_for_table, \
+create_interactive_bar_chart_and_table, get_data_source, \
 enrollment_comparisons_plus_none, \
-create_color_and_pattern_variable_dropdowns
+create_color_and_pattern_variable_dropdowns, get_filter_options, \
+create_paged_table, create_table_page, create_export_links
 import pandas as pd
 import sqlalchemy
 import dash_bootstrap_components as dbc
@@ -23,31 +24,29 @@ import dash_bootstrap_components as dbc
 dash.register_page(__name__, path = '/grad_outcomes')
 # See https://dash.plotly.com/urls
 
-df_grad_outcomes = retrieve_data_from_table('grad_outcomes')
-df_grad_outcomes['Grade'] = df_grad_outcomes['Grade'].astype('str') # Since
-# we don't have any K students in the Grade column, this column will
-# default to an integer data type, which can create issues for code that
-# expects grades to be a string. To avoid these issues, we'll simply
-# change the grade to a string.
-
-
-# print(df_grad_outcomes.head)
-
-
-layout = dbc.Container([
+# The grad_outcomes table is loaded by get_data_source() the first time
+# this page is visited.
+# (Since we don't have any K students in the Grade column, this column
+# would default to an integer data type if imported as-is. However,
+# apply_table_schema() converts it to a categorical column of
+# strings so that it will match the Grade values in other tables.)
+def layout(**kwargs):
+    grad_outcomes_source = get_data_source('grad_outcomes')
+    return dbc.Container([
       
     # Adding in a school year filter:
     dbc.Row(
             [dbc.Col('Starting School Year:', lg=2),
             dbc.Col(
-                dcc.Dropdown(df_grad_outcomes['Starting_Year'].unique(), 
-                list(df_grad_outcomes['Starting_Year'].unique()),
+                dcc.Dropdown(
+                get_filter_options(grad_outcomes_source, 'Starting_Year'), 
+                get_filter_options(grad_outcomes_source, 'Starting_Year'),
                 id='starting_year_filter', multi=True))
         ]),
 
     # The other filters we need can be found within
     # create_filters_and_comparisons, so we'll call that function here.
-    create_filters_and_comparisons(df_grad_outcomes, 
+    create_filters_and_comparisons(grad_outcomes_source, 
     default_comparison_option=[]),
 
     # The color and pattern variable menus will be defined below,
@@ -68,14 +67,45 @@ layout = dbc.Container([
         id='pattern_variable', multi=False), lg = 3)])]),
 
         dcc.Graph(id='grad_outcomes_chart'),
-        dash_table.DataTable(id = "grad_outcomes_table",
-    export_format = 'csv', 
-    style_table = {'height':'300px', 'overflowY':'auto'})
+        dcc.Store(id='grad_outcomes_chart_structure'),
+        create_paged_table('grad_outcomes_table'),
+        html.Div(id='grad_outcomes_export_links')
 ])
 
+
+# This get_grad_outcomes_pivot_settings() function is similar to
+# get_curr_enrollment_pivot_settings() within current_enrollment.py but
+# also includes a starting_year_filter argument.
+def get_grad_outcomes_pivot_settings(starting_year_filter, school_filter,
+    grade_filter, gender_filter, race_filter, ethnicity_filter,
+    enrollment_comparisons, color_variable, pattern_variable):
+
+    filter_list = [('Starting_Year', starting_year_filter), 
+    ('School', school_filter), ('Grade',grade_filter),
+    ('Gender', gender_filter), ('Race', race_filter), 
+    ('Ethnicity', ethnicity_filter)]
+
+    # The following code hard-codes Starting_Year and Outcome into
+    # the beginning of the comparison_values list; as a result,
+    # these variables will factor into the graph regardless of the value of
+    # enrollment_comparisons.
+    return dict(table_name = 'grad_outcomes', y_value = 'Students', 
+        comparison_values = [
+        'Starting_Year', 'Outcome'] + enrollment_comparisons, 
+        pivot_aggfunc= 'sum', 
+        filter_list = filter_list, color_value = color_variable, 
+        secondary_differentiator = pattern_variable, 
+        reorder_bars_by = 'Grade')
+
+
+def get_grad_outcomes_pivot(*filters_and_comparisons):
+    return create_pivot_for_table(**get_grad_outcomes_pivot_settings(
+        *filters_and_comparisons), debug = True)
+
+
 @callback(
     Output('grad_outcomes_chart', 'figure'),
-    Output('grad_outcomes_table', 'data'),
+    Output('grad_outcomes_chart_structure', 'data'),
     Input('starting_year_filter', 'value'),
     Input('school_filter', 'value'),
     Input('grade_filter', 'value'),
@@ -84,7 +114,8 @@ layout = dbc.Container([
     Input('ethnicity_filter', 'value'),
     Input('enrollment_comparisons', 'value'),
     Input('color_variable', 'value'),
-    Input('pattern_variable', 'value')
+    Input('pattern_variable', 'value'),
+    State('grad_outcomes_chart_structure', 'data')
 )
 
 # This update_graph() function is similar to that shown in
@@ -92,33 +123,84 @@ layout = dbc.Container([
 # argument.
 def update_graph(starting_year_filter, school_filter, grade_filter, 
     gender_filter, race_filter, ethnicity_filter,
-    enrollment_comparisons, color_variable, pattern_variable):
+    enrollment_comparisons, color_variable, pattern_variable,
+    chart_structure):
 
-    filter_list = [('Starting_Year', starting_year_filter), 
-    ('School', school_filter), ('Grade',grade_filter),
-    ('Gender', gender_filter), ('Race', race_filter), 
-    ('Ethnicity', ethnicity_filter)]
-    
     print("Enrollment comparisons:", enrollment_comparisons)
 
-    # The following functions hard-code Starting_Year and Outcome into
-    # the beginning of the comparison_values list; as a result,
-    # these variables will factor into the graph regardless of the value of
-    # enrollment_comparisons.
-
-    grad_outcomes_pivot = create_pivot_for_charts(
-        original_data_source=df_grad_outcomes, y_value = 'Students', 
-        comparison_values = [
-        'Starting_Year', 'Outcome'] + enrollment_comparisons, 
-        pivot_aggfunc= 'sum', 
-        filter_list = filter_list, color_value = color_variable, 
-        secondary_differentiator = pattern_variable, reorder_bars_by = 'Grade', 
-        reordering_map = grade_reordering_map, debug = True)
+    grad_outcomes_pivot = get_grad_outcomes_pivot(starting_year_filter,
+        school_filter, grade_filter, gender_filter, race_filter,
+        ethnicity_filter, enrollment_comparisons, color_variable,
+        pattern_variable)
 
-    return create_interactive_bar_chart_and_table(
+    # As in get_grad_outcomes_pivot(), Starting_Year and Outcome are
+    # added to the beginning of the comparison_values list.
+    chart, table_data, chart_structure = \
+    create_interactive_bar_chart_and_table(
         data_source_pivot = grad_outcomes_pivot, y_value = 'Students', 
         comparison_values = [
         'Starting_Year', 'Outcome'] + enrollment_comparisons, 
         color_value = color_variable, 
         secondary_differentiator= pattern_variable,
-        barmode = 'group', custom_y_label = 'Graduates')
+        barmode = 'group', custom_y_label = 'Graduates',
+        current_chart_structure = chart_structure,
+        include_table_data = False)
+    return chart, chart_structure
+
+
+@callback(
+    Output('grad_outcomes_table', 'data'),
+    Output('grad_outcomes_table', 'page_count'),
+    Output('grad_outcomes_table', 'page_current'),
+    Input('starting_year_filter', 'value'),
+    Input('school_filter', 'value'),
+    Input('grade_filter', 'value'),
+    Input('gender_filter', 'value'),
+    Input('race_filter', 'value'),
+    Input('ethnicity_filter', 'value'),
+    Input('enrollment_comparisons', 'value'),
+    Input('color_variable', 'value'),
+    Input('pattern_variable', 'value'),
+    Input('grad_outcomes_table', 'page_current'),
+    Input('grad_outcomes_table', 'page_size'),
+    Input('grad_outcomes_table', 'sort_by'),
+    Input('grad_outcomes_table', 'filter_query')
+)
+
+def update_table(starting_year_filter, school_filter, grade_filter,
+    gender_filter, race_filter, ethnicity_filter, enrollment_comparisons,
+    color_variable, pattern_variable, page_current, page_size, sort_by,
+    filter_query):
+
+    grad_outcomes_pivot = get_grad_outcomes_pivot(starting_year_filter,
+        school_filter, grade_filter, gender_filter, race_filter,
+        ethnicity_filter, enrollment_comparisons, color_variable,
+        pattern_variable)
+
+    return create_table_page(grad_outcomes_pivot, page_current,
+        page_size, sort_by, filter_query)
+
+
+@callback(
+    Output('grad_outcomes_export_links', 'children'),
+    Input('starting_year_filter', 'value'),
+    Input('school_filter', 'value'),
+    Input('grade_filter', 'value'),
+    Input('gender_filter', 'value'),
+    Input('race_filter', 'value'),
+    Input('ethnicity_filter', 'value'),
+    Input('enrollment_comparisons', 'value'),
+    Input('color_variable', 'value'),
+    Input('pattern_variable', 'value'),
+    Input('grad_outcomes_table', 'sort_by'),
+    Input('grad_outcomes_table', 'filter_query')
+)
+
+def update_export_links(starting_year_filter, school_filter, grade_filter,
+    gender_filter, race_filter, ethnicity_filter, enrollment_comparisons,
+    color_variable, pattern_variable, sort_by, filter_query):
+
+    return create_export_links(get_grad_outcomes_pivot_settings(
+        starting_year_filter, school_filter, grade_filter, gender_filter,
+        race_filter, ethnicity_filter, enrollment_comparisons,
+        color_variable, pattern_variable), sort_by, filter_query)
@@ -7,13 +7,14 @@
 # current_enrollment.py.
 
 import dash
-from dash import Dash, html, dcc, callback, Output, Input, dash_table
+from dash import Dash, html, dcc, callback, Output, Input, State, dash_table
 import plotly.express as px
 
 from app_functions_and_variables import offline_mode, read_from_online_db, \
-df_curr_enrollment, create_filters_and_comparisons, grade_reordering_map, \
-create_pivot_for_charts, create_interactive_line_chart_and_table, \
-retrieve_data_from_table, merge_demographics_into_df
+get_data_source, create_filters_and_comparisons, \
+create_pivot_for_table, create_interactive_line_chart_and_table, \
+create_interactive_box_plot_and_table, create_paged_table, \
+create_table_page, create_export_links
 
 import pandas as pd
 import sqlalchemy
@@ -21,46 +22,51 @@ import dash_bootstrap_components as dbc
 
 dash.register_page(__name__, path = '/test_results')
 
-
-df_test_results = retrieve_data_from_table('test_results')
-
-# df_test_results doesn't have all of the demographic 
-# values on which we want users to be able to filter,
-# so we'll use merge_demographics_into_df() to add in those
-# extra values.
-df_test_results = merge_demographics_into_df(df_test_results)
-
-layout = dbc.Container([
-    create_filters_and_comparisons(df_test_results),
+# The statistics that users can choose to display for each group of
+# scores (keyed by the pivot_aggfunc that calculates them):
+# (Medians, percentiles, and box plots are calculated from quantile
+# sketches; see pivot_with_sketches() within
+# app_functions_and_variables.py.)
+score_statistics = {'mean':'Mean', 'median':'Median',
+'p10':'10th Percentile', 'p25':'25th Percentile',
+'p75':'75th Percentile', 'p90':'90th Percentile', 'box':'Box Plot'}
+
+
+# The test_results table is loaded (and merged with the demographic values 
+# on which we want users to be able to filter) by get_data_source() the
+# first time this page is visited. See the registration of the test_results
+# table within app_functions_and_variables.py for more details.
+def layout(**kwargs):
+    test_results_source = get_data_source('test_results')
+    return dbc.Container([
+    create_filters_and_comparisons(test_results_source),
+    dbc.Row([dbc.Col('Statistic:', lg = 2),
+    dbc.Col(dcc.Dropdown([{'label':label, 'value':statistic} for
+    statistic, label in score_statistics.items()], 'mean',
+    id = 'score_statistic', multi = False, clearable = False), lg = 3)]),
     dbc.Row([dbc.Col('(Only the first two comparison options will be used \
 within the line chart.)')]), # The line chart, unlike the bar charts in
 # current_enrollment.py and grad_outcomes.py, is limited to two comparison
 # options, so this message advises users not to select more than two
 # comparisons.
         dcc.Graph(id='test_results_chart'),
-        dash_table.DataTable(id = "test_results_table",
-    export_format = 'csv', 
-    style_table = {'height':'300px', 'overflowY':'auto'})
+        dcc.Store(id='test_results_chart_structure'),
+        create_paged_table('test_results_table'),
+        html.Div(id='test_results_export_links')
 ])
 
-@callback(
-    Output('test_results_chart', 'figure'),
-    Output('test_results_table', 'data'),
-    Input('school_filter', 'value'),
-    Input('grade_filter', 'value'),
-    Input('gender_filter', 'value'),
-    Input('race_filter', 'value'),
-    Input('ethnicity_filter', 'value'),
-    Input('enrollment_comparisons', 'value'),
-)
 
-def update_graph(school_filter, grade_filter, 
-    gender_filter, race_filter, ethnicity_filter,
-    enrollment_comparisons):
+def get_test_results_pivot_settings(school_filter, grade_filter,
+    gender_filter, race_filter, ethnicity_filter, enrollment_comparisons,
+    score_statistic):
+    '''Returns the arguments that the page passes to
+    create_pivot_for_table(). The chart callback also uses the
+    comparison values, color value, and secondary differentiator
+    (i.e. the line dash variable) within these arguments. (See
+    get_curr_enrollment_pivot_settings() within current_enrollment.py.)'''
     filter_list = [('School', school_filter), ('Grade', grade_filter),
     ('Gender', gender_filter), ('Race', race_filter), 
     ('Ethnicity', ethnicity_filter)]
-    print("Enrollment comparisons:", enrollment_comparisons)
 
     # For this line chart (and likely others also), it's ideal to 
     # have the code select the color and line dash variables based on the 
@@ -68,8 +74,6 @@ def update_graph(school_filter, grade_filter,
     # between the enrollment comparisons and the color/pattern variables
     # can result in faulty line graph output.
 
-    print("Enrollment comparisons:",enrollment_comparisons)
-
     if len(enrollment_comparisons) == 0:
         color_variable = None
         line_dash_variable = None
@@ -84,23 +88,128 @@ def update_graph(school_filter, grade_filter,
         # Additional enrollment values will be discarded:
         enrollment_comparisons = enrollment_comparisons[0:2].copy()
 
+    # Box plots only have one trace per color value (rather than using
+    # line dashes), so the second comparison is instead kept within each
+    # box's Group label. (Otherwise, the boxes for each value of the
+    # second comparison would share the same x value and be drawn on top
+    # of one another.)
+    if score_statistic == 'box':
+        line_dash_variable = None
+
     # Note that the 'Period' option is added to enrollment_comparisons
-    # within both function calls so that the line chart can visualize
-    # changes between periods.
+    # so that the line chart can visualize changes between periods.
+    comparison_values = ['Period']+enrollment_comparisons
 
-    test_results_pivot = create_pivot_for_charts(
-        original_data_source=df_test_results, y_value = 'Score', 
-        comparison_values = ['Period']+enrollment_comparisons, 
-        pivot_aggfunc= 'mean', filter_list = filter_list, 
+    return dict(table_name = 'test_results', y_value = 'Score', 
+        comparison_values = comparison_values, 
+        pivot_aggfunc= score_statistic, filter_list = filter_list, 
         color_value = color_variable, 
         secondary_differentiator = line_dash_variable, 
-        reorder_bars_by = 'Grade', reordering_map = grade_reordering_map, 
-        debug = True)
+        reorder_bars_by = 'Grade')
+
+
+@callback(
+    Output('test_results_chart', 'figure'),
+    Output('test_results_chart_structure', 'data'),
+    Input('school_filter', 'value'),
+    Input('grade_filter', 'value'),
+    Input('gender_filter', 'value'),
+    Input('race_filter', 'value'),
+    Input('ethnicity_filter', 'value'),
+    Input('enrollment_comparisons', 'value'),
+    Input('score_statistic', 'value'),
+    State('test_results_chart_structure', 'data')
+)
 
-    return create_interactive_line_chart_and_table(
+def update_graph(school_filter, grade_filter, 
+    gender_filter, race_filter, ethnicity_filter,
+    enrollment_comparisons, score_statistic, chart_structure):
+    print("Enrollment comparisons:", enrollment_comparisons)
+
+    pivot_settings = get_test_results_pivot_settings(school_filter,
+        grade_filter, gender_filter, race_filter, ethnicity_filter,
+        enrollment_comparisons, score_statistic)
+    test_results_pivot = create_pivot_for_table(**pivot_settings,
+        debug = True)
+    comparison_values = pivot_settings['comparison_values']
+    color_variable = pivot_settings['color_value']
+    line_dash_variable = pivot_settings['secondary_differentiator']
+
+    # Box plots show the distribution of each group's scores, so they
+    # use a separate charting function:
+    if score_statistic == 'box':
+        chart, table_data, chart_structure = \
+        create_interactive_box_plot_and_table(
+            data_source_pivot = test_results_pivot, y_value = 'Score',
+            comparison_values = comparison_values,
+            color_value = color_variable,
+            current_chart_structure = chart_structure,
+            include_table_data = False)
+        return chart, chart_structure
+
+    chart, table_data, chart_structure = \
+    create_interactive_line_chart_and_table(
         data_source_pivot = test_results_pivot, y_value = 'Score', 
-        comparison_values = ['Period']+enrollment_comparisons, 
+        comparison_values = comparison_values, 
         color_value = color_variable, 
         secondary_differentiator= line_dash_variable,
         label_round_precision=1,
-        table_round_precision=1)
+        custom_y_label = None if score_statistic == 'mean'
+        else f'{score_statistics[score_statistic]} Score',
+        current_chart_structure = chart_structure,
+        include_table_data = False)
+    return chart, chart_structure
+
+
+@callback(
+    Output('test_results_table', 'data'),
+    Output('test_results_table', 'page_count'),
+    Output('test_results_table', 'page_current'),
+    Input('school_filter', 'value'),
+    Input('grade_filter', 'value'),
+    Input('gender_filter', 'value'),
+    Input('race_filter', 'value'),
+    Input('ethnicity_filter', 'value'),
+    Input('enrollment_comparisons', 'value'),
+    Input('score_statistic', 'value'),
+    Input('test_results_table', 'page_current'),
+    Input('test_results_table', 'page_size'),
+    Input('test_results_table', 'sort_by'),
+    Input('test_results_table', 'filter_query')
+)
+
+def update_table(school_filter, grade_filter, gender_filter, race_filter,
+    ethnicity_filter, enrollment_comparisons, score_statistic,
+    page_current, page_size, sort_by, filter_query):
+
+    test_results_pivot = create_pivot_for_table(
+        **get_test_results_pivot_settings(school_filter, grade_filter,
+        gender_filter, race_filter, ethnicity_filter,
+        enrollment_comparisons, score_statistic), debug = True)
+
+    # Scores are rounded to one decimal place within the table.
+    return create_table_page(test_results_pivot, page_current,
+        page_size, sort_by, filter_query, table_round_precision = 1)
+
+
+@callback(
+    Output('test_results_export_links', 'children'),
+    Input('school_filter', 'value'),
+    Input('grade_filter', 'value'),
+    Input('gender_filter', 'value'),
+    Input('race_filter', 'value'),
+    Input('ethnicity_filter', 'value'),
+    Input('enrollment_comparisons', 'value'),
+    Input('score_statistic', 'value'),
+    Input('test_results_table', 'sort_by'),
+    Input('test_results_table', 'filter_query')
+)
+
+def update_export_links(school_filter, grade_filter, gender_filter,
+    race_filter, ethnicity_filter, enrollment_comparisons, score_statistic,
+    sort_by, filter_query):
+
+    return create_export_links(get_test_results_pivot_settings(
+        school_filter, grade_filter, gender_filter, race_filter,
+        ethnicity_filter, enrollment_comparisons, score_statistic),
+        sort_by, filter_query, table_round_precision = 1)
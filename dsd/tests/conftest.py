@@ -0,0 +1,63 @@
+# Shared setup for the dsd test suite
+
+# The app reads its tables from the local .csv files within the repository's
+# root folder, and it only does so when offline_mode is True (i.e. when
+# platform.node() matches the network name checked within
+# app_functions_and_variables.py). Therefore, this file points
+# platform.node() to that name and switches to the dsd folder (which the
+# app's relative file paths are based on) before any test imports the app.
+
+# To run these tests, navigate to the dsd folder and enter:
+# python -m pytest tests
+
+import os
+import sys
+import shutil
+import platform
+
+import pytest
+
+dsd_folder = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.chdir(dsd_folder)
+sys.path.insert(0, dsd_folder)
+platform.node = lambda: 'DESKTOP-83K77J1'
+
+import app_functions_and_variables as afv
+
+
+@pytest.fixture
+def clean_caches():
+    '''Empties table_cache and pivot_cache before (and after) a test so
+    that the test's tables and pivot tables are loaded from scratch.'''
+    def clear_caches():
+        with afv.table_cache_lock:
+            afv.table_cache.clear()
+        with afv.pivot_cache_lock:
+            afv.pivot_cache.clear()
+            afv.pivot_cache_stats['bytes'] = 0
+    clear_caches()
+    yield
+    clear_caches()
+
+
+@pytest.fixture
+def source_folder(clean_caches, tmp_path, monkeypatch):
+    '''Copies the registered tables' .csv files into a temporary folder
+    and runs the test from a subfolder of it (just as the app runs from
+    the dsd folder), so that the test can modify these files without
+    changing the repository's own copies.'''
+    for table_name in afv.registered_tables:
+        shutil.copy(os.path.join(os.path.dirname(dsd_folder),
+        f'{table_name}.csv'), tmp_path)
+    os.mkdir(tmp_path / 'dsd')
+    monkeypatch.chdir(tmp_path / 'dsd')
+    monkeypatch.setattr(afv, 'snapshot_folder', 'table_snapshots')
+    return tmp_path
+
+
+def touch_source(source_folder, table_name):
+    '''Moves a source file's modification time forward by one second.'''
+    source_path = source_folder / f'{table_name}.csv'
+    file_stats = os.stat(source_path)
+    os.utime(source_path, ns = (file_stats.st_atime_ns,
+    file_stats.st_mtime_ns + 10 ** 9))
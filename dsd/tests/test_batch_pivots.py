@@ -0,0 +1,75 @@
+# Tests for create_pivots_for_table(), which creates several pivot tables
+# (or 'views') from the same table at once
+
+import pandas as pd
+import pytest
+
+import app_functions_and_variables as afv
+
+
+# (table name, view settings shared by every view, comparison options)
+batch_requests = [
+    ('curr_enrollment', dict(y_value = 'Students', pivot_aggfunc = 'sum'),
+    ['School', 'Grade', 'Gender', 'Race']),
+    ('test_results', dict(y_value = 'Score', pivot_aggfunc = 'mean',
+    filter_list = [('School', ['CA', 'DA']), ('Gender', ['Female'])],
+    fixed_comparisons = ['Period']), ['School', 'Grade', 'Race']),
+    # Views that can't be rolled up from group totals:
+    ('test_results', dict(y_value = 'Score', pivot_aggfunc = 'median'),
+    ['School', 'Gender']),
+    ('test_results', dict(y_value = 'Unique_Students',
+    pivot_aggfunc = 'nunique'), ['Grade', 'Gender'])]
+
+
+@pytest.mark.parametrize('use_aggregation_cubes', [True, False])
+@pytest.mark.parametrize('table_name, view_settings, comparison_options',
+batch_requests)
+def test_batch_views_match_single_views(clean_caches, monkeypatch,
+    use_aggregation_cubes, table_name, view_settings, comparison_options):
+    '''Each view should match the pivot table that create_pivot_for_table()
+    creates for the same view spec when nothing has been cached.'''
+    monkeypatch.setattr(afv, 'use_aggregation_cubes', use_aggregation_cubes)
+    view_specs = afv.create_comparison_view_specs(comparison_options,
+    **view_settings)
+    views = afv.create_pivots_for_table(table_name, view_specs)
+    assert list(views) == list(view_specs)
+
+    afv.pivot_cache.clear()
+    afv.pivot_cache_stats['bytes'] = 0
+    monkeypatch.setattr(afv, 'use_cached_rollups', False)
+    for view_name, view_spec in view_specs.items():
+        pd.testing.assert_frame_equal(
+            views[view_name].reset_index(drop = True),
+            afv.create_pivot_for_table(table_name, **view_spec).reset_index(
+                drop = True), check_dtype = False, check_categorical = False,
+            rtol = 1e-6)
+
+
+def test_batch_views_share_one_scan(clean_caches, monkeypatch):
+    '''Views that share a y value and filters should be rolled up from a
+    single set of group totals.'''
+    monkeypatch.setattr(afv, 'use_aggregation_cubes', False)
+    create_group_totals = afv.create_group_totals
+    group_totals_calls = []
+    def record_group_totals(df, *args, **kwargs):
+        if df is not None:
+            group_totals_calls.append(args)
+        return create_group_totals(df, *args, **kwargs)
+    monkeypatch.setattr(afv, 'create_group_totals', record_group_totals)
+
+    view_specs = afv.create_comparison_view_specs(['School', 'Grade',
+    'Gender', 'Race'], max_comparisons = 3, y_value = 'Students',
+    pivot_aggfunc = 'sum')
+    afv.create_pivots_for_table('curr_enrollment', view_specs)
+    assert len(group_totals_calls) == 1
+
+
+def test_comparison_view_specs():
+    view_specs = afv.create_comparison_view_specs(['School', 'Grade',
+    'Gender'], fixed_comparisons = ['Period'], y_value = 'Score',
+    pivot_aggfunc = 'mean')
+    assert list(view_specs) == ['Period', 'Period + School', 'Period + Grade',
+    'Period + Gender', 'Period + School + Grade', 'Period + School + Gender',
+    'Period + Grade + Gender']
+    assert view_specs['Period + School'] == {'y_value':'Score',
+    'pivot_aggfunc':'mean', 'comparison_values':['Period', 'School']}
@@ -0,0 +1,115 @@
+# Tests for the dash.Patch updates that the chart helpers return when the
+# user's chart already has the same structure as the new chart
+
+import base64
+
+import numpy as np
+import pytest
+from dash import Patch
+
+import app_functions_and_variables as afv
+
+
+def to_lists(value):
+    '''Converts the arrays, tuples, and base64-encoded typed arrays within
+    a figure dictionary into lists so that figures and patched figures can
+    be compared directly.'''
+    if isinstance(value, dict) and set(value) == {'dtype', 'bdata'}:
+        return np.frombuffer(base64.b64decode(value['bdata']),
+        dtype = value['dtype']).tolist()
+    if isinstance(value, dict):
+        return {key:to_lists(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return [to_lists(item) for item in value]
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def get_figure(chart):
+    '''Returns a chart's figure dictionary. (Bar and line charts are
+    already built as dictionaries; see use_fast_figure_builders.)'''
+    return to_lists(chart if isinstance(chart, dict) else chart.to_dict())
+
+
+def apply_patch(figure, patch):
+    '''Applies the Assign operations within a dash.Patch to a figure
+    dictionary, as Dash would within the browser.'''
+    for operation in patch.to_plotly_json()['operations']:
+        assert operation['operation'] == 'Assign'
+        target = figure
+        for location in operation['location'][:-1]:
+            target = target[location]
+        target[operation['location'][-1]] = to_lists(
+            operation['params']['value'])
+    return figure
+
+
+# (table name, pivot settings, chart helper, chart settings, the two filter
+# lists that the chart will be updated with)
+chart_requests = [
+    ('curr_enrollment', dict(y_value = 'Students', comparison_values = [
+        'School', 'Grade', 'Gender'], pivot_aggfunc = 'sum',
+        color_value = 'School', secondary_differentiator = 'Gender'),
+    afv.create_interactive_bar_chart_and_table, dict(
+        secondary_differentiator = 'Gender', custom_y_label = 'Enrollment'),
+    [[('Race', ['White'])], [('Race', ['Asian'])]]),
+    ('test_results', dict(y_value = 'Score', comparison_values = [
+        'Period', 'School', 'Gender'], pivot_aggfunc = 'mean',
+        color_value = 'School', secondary_differentiator = 'Gender'),
+    afv.create_interactive_line_chart_and_table, dict(
+        secondary_differentiator = 'Gender', label_round_precision = 1),
+    [[('Race', ['White'])], [('Race', ['Asian'])]]),
+    ('test_results', dict(y_value = 'Score', comparison_values = [
+        'Period', 'School'], pivot_aggfunc = 'box', color_value = 'School'),
+    afv.create_interactive_box_plot_and_table, {},
+    [[('Gender', ['Female'])], [('Gender', ['Male'])]])]
+
+
+def create_chart(table_name, pivot_settings, chart_function, chart_settings,
+    filter_list, current_chart_structure = None):
+    data_source_pivot = afv.create_pivot_for_table(table_name,
+    filter_list = filter_list, **pivot_settings)
+    return chart_function(data_source_pivot, pivot_settings['y_value'],
+    pivot_settings['comparison_values'],
+    color_value = pivot_settings['color_value'],
+    current_chart_structure = current_chart_structure, **chart_settings)
+
+
+@pytest.mark.parametrize('use_compact_serialization', [False, True])
+@pytest.mark.parametrize('table_name, pivot_settings, chart_function, \
+chart_settings, filter_lists', chart_requests)
+def test_patched_chart_matches_full_chart(clean_caches, monkeypatch,
+    table_name, pivot_settings, chart_function, chart_settings, filter_lists,
+    use_compact_serialization):
+    monkeypatch.setattr(afv, 'use_compact_serialization',
+    use_compact_serialization)
+    chart_arguments = (table_name, pivot_settings, chart_function,
+    chart_settings)
+    first_chart, first_table_data, first_structure = create_chart(
+        *chart_arguments, filter_lists[0])
+    full_chart, full_table_data, full_structure = create_chart(
+        *chart_arguments, filter_lists[1])
+    patch, table_data, chart_structure = create_chart(*chart_arguments,
+    filter_lists[1], current_chart_structure = first_structure)
+    assert chart_structure == full_structure == first_structure
+    assert isinstance(patch, Patch)
+    assert table_data == full_table_data
+    first_figure = get_figure(first_chart)
+    full_figure = get_figure(full_chart)
+    assert first_figure != full_figure
+    assert apply_patch(first_figure, patch) == full_figure
+
+
+@pytest.mark.parametrize('table_name, pivot_settings, chart_function, \
+chart_settings, filter_lists', chart_requests)
+def test_changed_structure_returns_full_chart(clean_caches, table_name,
+    pivot_settings, chart_function, chart_settings, filter_lists):
+    first_structure = create_chart(table_name, pivot_settings,
+    chart_function, chart_settings, filter_lists[0])[2]
+    # Filtering out one of the schools removes some of the chart's x values:
+    chart, table_data, chart_structure = create_chart(table_name,
+    pivot_settings, chart_function, chart_settings, filter_lists[0]
+    + [('School', ['CA', 'DA'])], current_chart_structure = first_structure)
+    assert chart_structure != first_structure
+    assert not isinstance(chart, Patch)
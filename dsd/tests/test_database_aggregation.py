@@ -0,0 +1,143 @@
+# Tests for the database aggregation mode (see aggregate_in_database()),
+# which are run against a local SQLite copy of the app's tables
+
+import os
+
+import pandas as pd
+import pytest
+import sqlalchemy
+
+import app_functions_and_variables as afv
+from conftest import dsd_folder
+
+# (table name, y value, comparison values, aggregate function, filters)
+aggregation_requests = [
+    ('curr_enrollment', 'Students', ['School', 'Grade'], 'sum', []),
+    ('curr_enrollment', 'Students', ['Gender'], 'count',
+    [('School', ['DA', 'HA'])]),
+    ('grad_outcomes', 'Students', ['Starting_Year', 'Outcome'], 'sum',
+    [('Grade', ['12'])]),
+    ('test_results', 'Score', ['Period', 'School'], 'mean', []),
+    # (test_results retrieves Gender and Race from curr_enrollment, so
+    # these requests require a join.)
+    ('test_results', 'Score', ['School', 'Gender'], 'mean',
+    [('Race', ['White', 'Asian'])]),
+    ('test_results', 'Score', ['Race'], 'max', [('Gender', ['Female'])]),
+    # Unique_Students counts distinct Student_IDs whichever aggregate
+    # function is requested. (Each student has one row per testing period
+    # within test_results.)
+    ('curr_enrollment', 'Unique_Students', ['School', 'Ethnicity'], 'sum',
+    []),
+    ('test_results', 'Unique_Students', ['Period', 'School'], 'mean', []),
+    ('test_results', 'Unique_Students', ['Grade', 'Gender'], 'nunique',
+    [('Race', ['White', 'Asian'])])]
+
+
+@pytest.fixture(scope = 'module')
+def database_engine():
+    '''Returns an engine connected to an in-memory SQLite database that
+    contains a copy of each registered table's .csv file.'''
+    engine = sqlalchemy.create_engine('sqlite://',
+    poolclass = sqlalchemy.pool.StaticPool,
+    connect_args = {'check_same_thread':False})
+    for table_name in afv.registered_tables:
+        pd.read_csv(os.path.join(os.path.dirname(dsd_folder),
+        f'{table_name}.csv')).to_sql(table_name, engine, index = False)
+    return engine
+
+
+@pytest.fixture
+def database_mode(database_engine, clean_caches, monkeypatch):
+    '''Switches the app to database aggregation against database_engine.'''
+    monkeypatch.setattr(afv, 'read_from_online_db', True)
+    monkeypatch.setattr(afv, 'use_database_aggregation', True)
+    monkeypatch.setattr(afv, 'elephantsql_engine', database_engine,
+    raising = False)
+    return database_engine
+
+
+def create_in_memory_pivot(table_name, y_value, comparison_values,
+    pivot_aggfunc, filter_list):
+    return afv.create_pivot_for_charts(afv.get_table(table_name), y_value,
+    comparison_values, pivot_aggfunc, filter_list = filter_list)
+
+
+def standardize_pivot(df, y_value, comparison_values):
+    '''Returns the comparison and y value columns of a pivot table, sorted
+    by their comparison values (which are converted to strings).'''
+    df = df[comparison_values + [y_value]].astype(
+        {column:str for column in comparison_values})
+    return df.sort_values(comparison_values).reset_index(drop = True)
+
+
+@pytest.mark.parametrize('table_name, y_value, comparison_values, \
+pivot_aggfunc, filter_list', aggregation_requests)
+def test_database_pivot_matches_in_memory_pivot(database_engine,
+    table_name, y_value, comparison_values, pivot_aggfunc, filter_list):
+    df_database = afv.aggregate_in_database(table_name, y_value,
+    comparison_values, pivot_aggfunc, filter_list = filter_list,
+    engine = database_engine)
+    assert list(df_database.columns) == comparison_values + [y_value]
+    assert len(df_database) > 0
+    pd.testing.assert_frame_equal(
+        standardize_pivot(df_database, y_value, comparison_values),
+        standardize_pivot(create_in_memory_pivot(table_name, y_value,
+        comparison_values, pivot_aggfunc, filter_list), y_value,
+        comparison_values), check_dtype = False, rtol = 1e-6)
+
+
+@pytest.mark.parametrize('table_name, y_value, comparison_values, \
+pivot_aggfunc, filter_list', aggregation_requests)
+def test_charts_use_the_database_in_database_mode(database_mode,
+    table_name, y_value, comparison_values, pivot_aggfunc, filter_list):
+    assert afv.aggregating_in_database()
+    df_database = afv.create_pivot_for_table(table_name, y_value,
+    comparison_values, pivot_aggfunc, filter_list = filter_list,
+    color_value = comparison_values[0])
+    # (Pivot tables from the database aren't cached.)
+    assert len(afv.pivot_cache) == 0
+    df_in_memory = afv.create_pivot_for_charts(afv.get_table(table_name),
+    y_value, comparison_values, pivot_aggfunc, filter_list = filter_list,
+    color_value = comparison_values[0])
+    assert list(df_database.columns) == list(df_in_memory.columns)
+    pd.testing.assert_frame_equal(
+        standardize_pivot(df_database, y_value, comparison_values),
+        standardize_pivot(df_in_memory, y_value, comparison_values),
+        check_dtype = False, rtol = 1e-6)
+
+
+def test_filter_options_come_from_the_database(database_mode):
+    for table_name in ['test_results', 'grad_outcomes']:
+        for column in ['School', 'Grade', 'Gender']:
+            assert sorted(afv.get_filter_options(table_name, column)) == \
+            sorted(afv.get_filter_options(afv.get_table(table_name),
+            column))
+
+
+def test_unsupported_functions_are_rejected(database_engine):
+    with pytest.raises(ValueError):
+        afv.aggregate_in_database('test_results', 'Score', ['School'],
+        'median', engine = database_engine)
+
+
+def test_filter_options_are_queried_once_per_dropdown(database_mode,
+    monkeypatch):
+    get_filter_options = afv.get_filter_options
+    queried_columns = []
+    def record_filter_options(df, column):
+        queried_columns.append(column)
+        return get_filter_options(df, column)
+    monkeypatch.setattr(afv, 'get_filter_options', record_filter_options)
+    filters_and_comparisons = afv.create_filters_and_comparisons(
+        'test_results')
+    assert sorted(queried_columns) == sorted(set(queried_columns))
+    dropdowns = {component.id:component for component
+    in filters_and_comparisons._traverse()
+    if getattr(component, 'id', None) in ['school_filter', 'gender_filter',
+    'grade_filter', 'race_filter', 'ethnicity_filter']}
+    assert len(dropdowns) == len(queried_columns) == 5
+    for column in queried_columns:
+        dropdown = dropdowns[f'{column.lower()}_filter']
+        # Every option starts out selected:
+        assert dropdown.value == dropdown.options == get_filter_options(
+            'test_results', column)
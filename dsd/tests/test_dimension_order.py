@@ -0,0 +1,64 @@
+# Tests for the ordered dimensions (such as Grade and Period) that are
+# stored as ordered categoricals so that charts and menus show their
+# values in a logical order
+
+import pandas as pd
+import pytest
+
+import app_functions_and_variables as afv
+
+
+@pytest.mark.parametrize('table_name, column', [('curr_enrollment', 'Grade'),
+('test_results', 'Grade'), ('test_results', 'Period'),
+('grad_outcomes', 'Outcome')])
+def test_ordered_dimensions_are_ordered_categoricals(clean_caches,
+    table_name, column):
+    dtype = afv.get_table(table_name)[column].dtype
+    assert isinstance(dtype, pd.CategoricalDtype)
+    assert dtype.ordered == True
+    assert list(dtype.categories) == [value for value
+    in afv.ordered_dimensions[column] if value in dtype.categories]
+
+
+def test_filter_options_follow_the_dimension_order(clean_caches):
+    df = afv.get_table('test_results')
+    grade_options = afv.get_filter_options(df, 'Grade')
+    assert grade_options == sorted(grade_options,
+    key = afv.ordered_dimensions['Grade'].index)
+    assert afv.get_filter_options(df, 'Period') == [value for value
+    in afv.ordered_dimensions['Period'] if value in set(df['Period'])]
+    starting_years = afv.get_filter_options(afv.get_table('grad_outcomes'),
+    'Starting_Year')
+    assert starting_years == sorted(starting_years)
+
+
+def test_pivots_follow_the_dimension_order(clean_caches):
+    data_source_pivot = afv.create_pivot_for_table('test_results', 'Score',
+    ['Grade', 'Period'], 'mean')
+    expected_order = sorted(zip(data_source_pivot['Grade'],
+    data_source_pivot['Period']), key = lambda values: (
+        afv.ordered_dimensions['Grade'].index(values[0]),
+        afv.ordered_dimensions['Period'].index(values[1])))
+    assert list(zip(data_source_pivot['Grade'],
+    data_source_pivot['Period'])) == expected_order
+
+
+@pytest.mark.parametrize('table_name, y_value, comparison_values, \
+pivot_aggfunc', [('curr_enrollment', 'Students', ['School', 'Grade'], 'sum'),
+('test_results', 'Score', ['Period', 'School', 'Grade'], 'mean'),
+('test_results', 'Score', ['Grade', 'School'], 'median')])
+def test_bars_are_reordered_by_grade(clean_caches, table_name, y_value,
+    comparison_values, pivot_aggfunc):
+    '''reorder_bars_by sorts the bars by Grade while keeping the original
+    order of the bars within each grade.'''
+    data_source_pivot = afv.create_pivot_for_table(table_name, y_value,
+    comparison_values, pivot_aggfunc, color_value = comparison_values[-1])
+    reordered_pivot = afv.create_pivot_for_table(table_name, y_value,
+    comparison_values, pivot_aggfunc, color_value = comparison_values[-1],
+    reorder_bars_by = 'Grade')
+    grade_order = afv.ordered_dimensions['Grade']
+    expected_rows = sorted(data_source_pivot[comparison_values].astype(
+        str).itertuples(index = False), key = lambda row: grade_order.index(
+            row.Grade))
+    assert list(reordered_pivot[comparison_values].astype(str).itertuples(
+        index = False)) == expected_rows
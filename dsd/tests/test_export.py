@@ -0,0 +1,137 @@
+# Tests for the /export route within app.py (see the 'Streaming table
+# exports' section of app_functions_and_variables.py)
+
+import io
+import json
+import urllib.parse
+
+import pandas as pd
+import pytest
+
+import app
+import app_functions_and_variables as afv
+
+
+pivot_settings = {'table_name':'curr_enrollment', 'y_value':'Students',
+'comparison_values':['School'], 'pivot_aggfunc':'sum',
+'filter_list':[['Gender', ['Female']]], 'color_value':'School',
+'reorder_bars_by':'Grade'}
+
+
+@pytest.fixture
+def client():
+    test_client = app.server.test_client()
+    test_client.post('/login', data = {'username':'test',
+    'password':'test'})
+    return test_client
+
+
+def request_export(client, export_format = 'csv', export_level = 'pivot',
+    **settings):
+    response = client.get(afv.create_export_url(export_format,
+    export_level, {**pivot_settings, **settings}))
+    content = response.get_data()
+    response.close()
+    return response, content
+
+
+def read_export(content, export_format):
+    if export_format == 'parquet':
+        return pd.read_parquet(io.BytesIO(content))
+    return pd.read_csv(io.BytesIO(content))
+
+
+def test_export_requires_login():
+    response = app.server.test_client().get(afv.create_export_url('csv',
+    'pivot', pivot_settings))
+    assert response.status_code == 302
+    assert '/login' in response.headers['Location']
+
+
+@pytest.mark.parametrize('export_format', ['csv', 'parquet'])
+def test_pivot_export_matches_pivot_table(client, export_format):
+    response, content = request_export(client, export_format,
+    sort_by = [{'column_id':'Students', 'direction':'desc'}])
+    assert response.status_code == 200
+    assert response.headers['Content-Disposition'].endswith(
+        f'curr_enrollment_pivot.{export_format}')
+    df_export = read_export(content, export_format)
+    expected_pivot = afv.create_pivot_for_table(
+        **{**pivot_settings, 'filter_list':[('Gender', ['Female'])]})
+    assert list(df_export.columns) == list(expected_pivot.columns)
+    assert df_export['Students'].tolist() == sorted(
+        expected_pivot['Students'].tolist(), reverse = True)
+
+
+@pytest.mark.parametrize('export_format', ['csv', 'parquet'])
+def test_row_export_streams_matching_rows(client, monkeypatch,
+    export_format):
+    monkeypatch.setattr(afv, 'export_chunk_rows', 500)
+    response, content = request_export(client, export_format, 'rows',
+    filter_list = [['School', ['DA', 'HA']]])
+    assert response.status_code == 200
+    df_export = read_export(content, export_format)
+    df = afv.get_table('curr_enrollment')
+    assert len(df_export) == df['School'].isin(['DA', 'HA']).sum()
+    assert list(df_export.columns) == list(df.columns)
+    assert df_export['Student_ID'].tolist() == df.loc[
+        df['School'].isin(['DA', 'HA']), 'Student_ID'].tolist()
+
+
+def test_empty_pivot_export_has_pivot_header(client):
+    response, content = request_export(client,
+    filter_list = [['School', []]])
+    assert response.status_code == 200
+    assert content.decode().strip() == 'School,Students,Group'
+
+
+def create_spec(**settings):
+    return json.dumps({**pivot_settings, **settings})
+
+
+@pytest.mark.parametrize('query_args', [
+    {'format':'xlsx'},
+    {'level':'students'},
+    {'spec':'{'},
+    {'spec':'[]'},
+    {'spec':create_spec(unknown_setting = 1)},
+    {'spec':create_spec(table_name = 'other_table')},
+    {'spec':create_spec(table_name = ['curr_enrollment'])},
+    {'spec':create_spec(pivot_aggfunc = 'bogus')},
+    {'spec':create_spec(comparison_values = 'School')},
+    {'spec':create_spec(comparison_values = ['Last_Name'])},
+    {'spec':create_spec(filter_list = [['School', 'DA']])},
+    {'spec':create_spec(filter_list = [['School']])},
+    {'spec':create_spec(filter_list = 'School')},
+    {'spec':create_spec(sort_by = [{'column_id':'School',
+    'direction':'up'}])},
+    {'spec':create_spec(sort_by = 'School')},
+    {'spec':create_spec(filter_query = 5)},
+    {'spec':create_spec(table_round_precision = '1')},
+    {'spec':create_spec(table_round_precision = True)},
+    {'spec':create_spec(y_value = 'Score')}])
+def test_invalid_export_specs_are_rejected(client, query_args):
+    response = client.get('/export?' + urllib.parse.urlencode(query_args))
+    assert response.status_code == 400
+    assert afv.export_slots._value == afv.export_concurrency_limit
+
+
+def test_exports_beyond_the_concurrency_limit_are_refused(client):
+    for i in range(afv.export_concurrency_limit):
+        afv.export_slots.acquire()
+    try:
+        response, content = request_export(client)
+        assert response.status_code == 503
+        assert 'Retry-After' in response.headers
+    finally:
+        for i in range(afv.export_concurrency_limit):
+            afv.export_slots.release()
+
+
+def test_closing_an_export_releases_its_slot_and_table(client):
+    response = client.get(afv.create_export_url('csv', 'rows',
+    pivot_settings))
+    next(iter(response.response))
+    response.close()
+    assert afv.export_slots._value == afv.export_concurrency_limit
+    assert afv.get_table_entry('curr_enrollment')['users'] == 0
@@ -0,0 +1,83 @@
+# Tests for the figure builders that create the dashboards' bar and line
+# charts without Plotly Express (see use_fast_figure_builders)
+
+import base64
+import json
+
+import numpy as np
+import plotly.io as pio
+import pytest
+
+import app_functions_and_variables as afv
+
+
+def decode_typed_arrays(value):
+    '''Converts the base64-encoded typed arrays within a serialized figure
+    back into lists, since Plotly Express encodes NumPy arrays this way
+    while the figure builders may use lists.'''
+    if isinstance(value, dict) and set(value) == {'dtype', 'bdata'}:
+        return np.frombuffer(base64.b64decode(value['bdata']),
+        dtype = value['dtype']).tolist()
+    if isinstance(value, dict):
+        return {key:decode_typed_arrays(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [decode_typed_arrays(item) for item in value]
+    return value
+
+
+def to_json(chart):
+    '''Serializes a chart in the same way that Dash would before sending
+    it to the browser.'''
+    return decode_typed_arrays(json.loads(pio.to_json(chart,
+    validate = False)))
+
+
+# (chart function, table name, pivot settings, other chart settings)
+chart_requests = [
+    (afv.create_interactive_bar_chart_and_table, 'curr_enrollment',
+    dict(y_value = 'Students', comparison_values = ['School'],
+    pivot_aggfunc = 'sum', color_value = 'School'), {}),
+    (afv.create_interactive_bar_chart_and_table, 'curr_enrollment',
+    dict(y_value = 'Students', comparison_values = ['School', 'Grade',
+    'Gender'], pivot_aggfunc = 'sum', color_value = 'Grade',
+    secondary_differentiator = 'Gender', reorder_bars_by = 'Grade'),
+    dict(custom_y_label = 'Enrollment')),
+    (afv.create_interactive_bar_chart_and_table, 'grad_outcomes',
+    dict(y_value = 'Students', comparison_values = ['Starting_Year',
+    'Outcome'], pivot_aggfunc = 'sum', color_value = 'Outcome'),
+    dict(barmode = 'stack', color_discrete_map = {
+        '4 Year College':'#1f77b4', 'Employment':'#2ca02c'},
+    label_round_precision = 0, custom_x_label = 'Cohort')),
+    (afv.create_interactive_bar_chart_and_table, 'test_results',
+    dict(y_value = 'Score', comparison_values = ['School'],
+    pivot_aggfunc = 'mean', color_value = 'None'), dict(text_auto = False)),
+    (afv.create_interactive_line_chart_and_table, 'test_results',
+    dict(y_value = 'Score', comparison_values = ['Period', 'School',
+    'Gender'], pivot_aggfunc = 'mean', color_value = 'School',
+    secondary_differentiator = 'Gender'), dict(label_round_precision = 1)),
+    (afv.create_interactive_line_chart_and_table, 'test_results',
+    dict(y_value = 'Score', comparison_values = ['Period', 'Grade'],
+    pivot_aggfunc = 'median', color_value = 'Grade',
+    reorder_bars_by = 'Grade'), dict(show_labels = False,
+    markers = False, custom_y_label = 'Median Score'))]
+
+
+@pytest.mark.parametrize('chart_function, table_name, pivot_settings, \
+chart_settings', chart_requests)
+def test_figure_builders_match_plotly_express(clean_caches, monkeypatch,
+    chart_function, table_name, pivot_settings, chart_settings):
+    data_source_pivot = afv.create_pivot_for_table(table_name,
+    **pivot_settings)
+    def create_chart():
+        return chart_function(data_source_pivot, pivot_settings['y_value'],
+        pivot_settings['comparison_values'],
+        color_value = pivot_settings['color_value'],
+        secondary_differentiator = pivot_settings.get(
+            'secondary_differentiator'), **chart_settings)
+    fast_chart, fast_table_data, fast_structure = create_chart()
+    assert isinstance(fast_chart, dict)
+    monkeypatch.setattr(afv, 'use_fast_figure_builders', False)
+    px_chart, px_table_data, px_structure = create_chart()
+    assert to_json(fast_chart) == to_json(px_chart)
+    assert fast_table_data == px_table_data
+    assert fast_structure == px_structure
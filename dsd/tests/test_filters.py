@@ -0,0 +1,82 @@
+# Tests for the row filters that the dashboards apply before pivoting
+# (see filter_with_bitmap_index(), create_filter_mask(), and
+# remove_unrestrictive_filters())
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import app_functions_and_variables as afv
+
+
+# (table name, filter list)
+filter_requests = [
+    ('curr_enrollment', []),
+    ('curr_enrollment', [('School', ['DA', 'HA'])]),
+    ('curr_enrollment', [('School', ['DA']), ('Grade', ['K', '12']),
+    ('Gender', ['Female'])]),
+    ('curr_enrollment', [('Race', [])]),
+    ('curr_enrollment', [('Race', ['Not a race'])]),
+    ('test_results', [('Period', ['Fall', 'Spring']),
+    ('Ethnicity', ['Hispanic'])]),
+    ('grad_outcomes', [('Starting_Year', [2018, 2020]),
+    ('Outcome', ['4 Year College'])])]
+
+
+def get_matching_rows(df, filter_list):
+    '''Returns the positions of the rows that match filter_list, as
+    found with pandas' isin().'''
+    row_mask = np.ones(len(df), dtype = 'bool')
+    for column, values in filter_list:
+        row_mask &= df[column].isin(values).to_numpy()
+    return np.flatnonzero(row_mask)
+
+
+@pytest.mark.parametrize('table_name, filter_list', filter_requests)
+def test_bitmap_index_matches_isin(clean_caches, table_name, filter_list):
+    np.testing.assert_array_equal(afv.filter_with_bitmap_index(
+        afv.get_table_entry(table_name)['bitmap_index'], filter_list),
+    get_matching_rows(afv.get_table(table_name), filter_list))
+
+
+@pytest.mark.parametrize('table_name, filter_list', filter_requests[1:3])
+def test_pivots_match_with_and_without_bitmap_index(clean_caches,
+    table_name, filter_list):
+    entry = afv.get_table_entry(table_name)
+    df = entry['df']
+    pivot_settings = dict(y_value = 'Students',
+    comparison_values = ['School', 'Grade'], pivot_aggfunc = 'sum',
+    filter_list = filter_list, color_value = 'School')
+    pd.testing.assert_frame_equal(afv.create_pivot_for_charts(df,
+    bitmap_index = entry['bitmap_index'], **pivot_settings),
+    afv.create_pivot_for_charts(df, **pivot_settings))
+
+
+@pytest.mark.parametrize('table_name, filter_list', filter_requests)
+def test_filter_mask_matches_isin(clean_caches, table_name, filter_list):
+    df = afv.get_table(table_name)
+    np.testing.assert_array_equal(np.flatnonzero(afv.create_filter_mask(df,
+    filter_list)), get_matching_rows(df, filter_list))
+
+
+def test_filters_that_select_every_value_are_removed():
+    df = pd.DataFrame({'School':['DA', 'HA', 'DA'],
+    'Grade':['K', None, '1'], 'Gender':['Female', 'Male', 'Male']})
+    dimension_domains = afv.get_dimension_domains(df,
+    ['School', 'Grade', 'Gender'])
+    assert afv.remove_unrestrictive_filters([('School', ['HA', 'DA', 'SA']),
+    ('Grade', ['K', '1']), ('Gender', ['Male']), ('Race', ['White'])],
+    dimension_domains) == [('Grade', ['K', '1']), ('Gender', ['Male']),
+    ('Race', ['White'])]
+
+
+def test_selecting_every_value_matches_not_filtering(clean_caches):
+    df = afv.get_table('curr_enrollment')
+    filter_list = [(column, afv.get_filter_options(df, column))
+    for column in afv.enrollment_comparisons]
+    pivot_settings = dict(y_value = 'Students',
+    comparison_values = ['School', 'Gender'], pivot_aggfunc = 'sum',
+    color_value = 'School')
+    pd.testing.assert_frame_equal(afv.create_pivot_for_charts(df,
+    filter_list = filter_list, **pivot_settings),
+    afv.create_pivot_for_charts(df, **pivot_settings))
@@ -0,0 +1,54 @@
+# Tests for the chart group labels that create_group_labels() builds from
+# each column's category codes
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import app_functions_and_variables as afv
+
+
+def join_labels(df, label_columns):
+    '''Builds each row's label by converting every value to a string.'''
+    return [' '.join(str(value) for value in row) for row
+    in df[label_columns].itertuples(index = False)]
+
+
+@pytest.mark.parametrize('label_columns', [['School'], ['School', 'Grade'],
+['Period', 'School', 'Gender', 'Race']])
+def test_labels_match_joined_values(clean_caches, label_columns):
+    df = afv.get_table('test_results')
+    labels = afv.create_group_labels(df, label_columns)
+    assert isinstance(labels, pd.Categorical)
+    assert list(labels) == join_labels(df, label_columns)
+
+
+def test_labels_handle_numbers_and_missing_values():
+    df = pd.DataFrame({'Starting_Year':[2019, 2018, 2019],
+    'Outcome':pd.Categorical(['Employment', None, 'Trade School'])})
+    assert list(afv.create_group_labels(df, ['Starting_Year'])) == [
+        '2019', '2018', '2019']
+    # Rows with missing values keep the labels that joining the columns'
+    # astype('str') values would produce.
+    expected = df['Starting_Year'].astype('str') + ' ' + df[
+        'Outcome'].astype('str')
+    labels = afv.create_group_labels(df, ['Starting_Year', 'Outcome'])
+    assert pd.Series(labels).astype('str').equals(expected.astype('str'))
+
+
+def test_labels_handle_many_combinations(monkeypatch):
+    '''Once the number of possible combinations exceeds
+    bincount_max_groups, the combinations found so far are renumbered.'''
+    monkeypatch.setattr(afv, 'bincount_max_groups', 10)
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({column:pd.Categorical(rng.choice(list('abcdef'), 200))
+    for column in ['A', 'B', 'C']})
+    assert list(afv.create_group_labels(df, ['A', 'B', 'C'])) == \
+    join_labels(df, ['A', 'B', 'C'])
+
+
+def test_pivot_group_column_uses_the_labels(clean_caches):
+    data_source_pivot = afv.create_pivot_for_table('curr_enrollment',
+    'Students', ['School', 'Grade', 'Gender'], 'sum', color_value = 'School')
+    assert list(data_source_pivot['Group']) == join_labels(data_source_pivot,
+    ['Grade', 'Gender'])
@@ -0,0 +1,27 @@
+# Tests for the charts that the dashboard pages create from their settings
+
+import pytest
+
+import app
+import app_functions_and_variables as afv
+from pages import test_results
+
+
+@pytest.mark.parametrize('enrollment_comparisons', [[], ['School'],
+['School', 'Gender'], ['Grade', 'Race', 'Gender']])
+def test_box_plots_have_one_box_per_trace_and_group(clean_caches,
+    enrollment_comparisons):
+    '''Each (trace, x value) pair within a box plot should have exactly one
+    box, so that no boxes are drawn on top of one another.'''
+    df = afv.get_table('test_results')
+    # (Each filter starts with every option selected, as on the page.)
+    filter_values = [afv.get_filter_options(df, column) for column
+    in ['School', 'Grade', 'Gender', 'Race', 'Ethnicity']]
+    pivot_settings = test_results.get_test_results_pivot_settings(
+        *filter_values, enrollment_comparisons, 'box')
+    data_source_pivot = afv.create_pivot_for_table(**pivot_settings)
+    chart = afv.create_interactive_box_plot_and_table(data_source_pivot,
+    'Score', pivot_settings['comparison_values'],
+    color_value = pivot_settings['color_value'])[0]
+    box_keys = [(trace.name, x) for trace in chart.data for x in trace.x]
+    assert len(box_keys) == len(set(box_keys)) == len(data_source_pivot)
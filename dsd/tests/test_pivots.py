@@ -0,0 +1,258 @@
+# Tests for the pivot tables that create_pivot_for_charts() and
+# create_pivot_for_table() return through each of their code paths
+# (aggregation cube roll-ups, cached group totals, row scans, and
+# pivot_cache)
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import app_functions_and_variables as afv
+
+
+# (table name, y value, comparison values, aggregate function)
+pivot_requests = [
+    ('curr_enrollment', 'Students', ['School'], 'sum'),
+    ('curr_enrollment', 'Students', ['School', 'Grade', 'Gender'], 'sum'),
+    ('test_results', 'Score', ['Period', 'School'], 'mean'),
+    ('test_results', 'Score', ['School', 'Gender'], 'count'),
+    ('test_results', 'Score', ['Period', 'Grade', 'Race'], 'median'),
+    ('test_results', 'Score', ['Grade'], 'p90'),
+    ('grad_outcomes', 'Students', ['Starting_Year', 'Outcome', 'School'],
+    'sum'),
+    ('curr_enrollment', 'Unique_Students', ['School', 'Ethnicity'],
+    'nunique'),
+    # (Each student has one row per testing period within test_results.)
+    ('test_results', 'Unique_Students', ['Grade', 'Gender'], 'nunique')]
+
+# The filters to apply to each request within the parity tests below
+filter_lists = [[], [('School', ['CA', 'DA']), ('Gender', ['Female'])]]
+
+
+@pytest.fixture(params = ['cube', 'rows'])
+def pivot_path(request, clean_caches):
+    '''Returns the code path that create_pivot() should use.'''
+    return request.param
+
+
+def create_pivot(pivot_path, table_name, y_value, comparison_values,
+    pivot_aggfunc, **settings):
+    '''Creates a pivot table from a registered table, rolling it up from
+    the table's aggregation cube if pivot_path is 'cube'.'''
+    aggregation_cube = (afv.get_table_entry(table_name)['aggregation_cube']
+    if pivot_path == 'cube' else None)
+    return afv.create_pivot_for_charts(afv.get_table(table_name), y_value,
+    comparison_values, pivot_aggfunc, aggregation_cube = aggregation_cube,
+    **settings)
+
+
+def create_expected_pivot(table_name, y_value, comparison_values,
+    pivot_aggfunc, filter_list):
+    '''Creates the pivot table that a request should return by filtering
+    the table's rows and passing them to pandas' pivot_table(). Distinct
+    count measures count the distinct values of their underlying column,
+    and quantile functions use pandas' quantile() method.'''
+    df = afv.get_table(table_name)
+    for column, values in filter_list:
+        df = df[df[column].isin(values)]
+    values_column = afv.distinct_count_columns.get(y_value, y_value)
+    if y_value in afv.distinct_count_columns:
+        pivot_aggfunc = 'nunique'
+    elif pivot_aggfunc in afv.quantile_aggregate_functions:
+        quantile = afv.quantile_aggregate_functions[pivot_aggfunc]
+        pivot_aggfunc = lambda values: values.quantile(quantile)
+    return df.pivot_table(index = comparison_values, values = values_column,
+    aggfunc = pivot_aggfunc, observed = True).reset_index().rename(
+        columns = {values_column:y_value})
+
+
+def assert_pivots_match(data_source_pivot, expected_pivot, y_value,
+    comparison_values):
+    '''Compares the comparison and y value columns of two pivot tables,
+    regardless of their row order and of the data types used to store
+    each column.'''
+    def standardize_pivot(df):
+        df = df[comparison_values + [y_value]].astype(
+            {column:str for column in comparison_values})
+        return df.sort_values(comparison_values).reset_index(drop = True)
+    pd.testing.assert_frame_equal(standardize_pivot(data_source_pivot),
+    standardize_pivot(expected_pivot), check_dtype = False, rtol = 1e-6)
+
+
+@pytest.mark.parametrize('filter_list', filter_lists)
+@pytest.mark.parametrize('table_name, y_value, comparison_values, \
+pivot_aggfunc', pivot_requests)
+def test_pivot_matches_pivot_table(pivot_path, table_name, y_value,
+    comparison_values, pivot_aggfunc, filter_list):
+    data_source_pivot = create_pivot(pivot_path, table_name, y_value,
+    comparison_values, pivot_aggfunc, filter_list = filter_list)
+    assert_pivots_match(data_source_pivot, create_expected_pivot(table_name,
+    y_value, comparison_values, pivot_aggfunc, filter_list), y_value,
+    comparison_values)
+
+
+@pytest.mark.parametrize('table_name, y_value, comparison_values, \
+pivot_aggfunc', pivot_requests)
+def test_cube_pivot_matches_row_pivot(clean_caches, table_name, y_value,
+    comparison_values, pivot_aggfunc):
+    '''Roll-ups should also match row scans in their chart columns (such
+    as Group) and in their row order.'''
+    settings = dict(filter_list = filter_lists[-1],
+    color_value = comparison_values[-1])
+    pd.testing.assert_frame_equal(create_pivot('cube', table_name, y_value,
+    comparison_values, pivot_aggfunc, **settings).reset_index(drop = True),
+    create_pivot('rows', table_name, y_value, comparison_values,
+    pivot_aggfunc, **settings).reset_index(drop = True),
+    check_dtype = False, check_categorical = False, rtol = 1e-6)
+
+
+def test_tables_are_loaded_with_their_cubes(clean_caches):
+    aggregation_cube = afv.get_table_entry('test_results')['aggregation_cube']
+    assert aggregation_cube is not None
+    # The cube is much smaller than the table it summarizes:
+    assert len(aggregation_cube['df']) < len(afv.get_table('test_results'))
+
+
+@pytest.mark.parametrize('table_name, y_value, comparison_values, \
+pivot_aggfunc', pivot_requests)
+def test_cached_pivot_matches_pivot_table(clean_caches, table_name,
+    y_value, comparison_values, pivot_aggfunc):
+    filter_list = filter_lists[-1]
+    data_source_pivot = afv.create_pivot_for_table(table_name, y_value,
+    comparison_values, pivot_aggfunc, filter_list = filter_list)
+    hit_count = afv.pivot_cache_stats['hits']
+    cached_pivot = afv.create_pivot_for_table(table_name, y_value,
+    comparison_values, pivot_aggfunc,
+    filter_list = list(reversed(filter_list)))
+    assert afv.pivot_cache_stats['hits'] == hit_count + 1
+    assert cached_pivot is data_source_pivot
+    assert_pivots_match(cached_pivot, create_expected_pivot(table_name,
+    y_value, comparison_values, pivot_aggfunc, filter_list), y_value,
+    comparison_values)
+
+
+@pytest.fixture
+def df_rows():
+    '''Returns a small table with an unused category, a missing group
+    value, missing y values, and a group whose y values are all missing.'''
+    return pd.DataFrame({
+        'School':pd.Categorical(['DA', 'HA', 'DA', 'HA', None, 'DA', 'HA'],
+        categories = ['CA', 'DA', 'HA']),
+        'Starting_Year':[2019, 2018, 2019, 2020, 2018, 2018, 2020],
+        'Score':[50.0, np.nan, 70.0, 80.0, 90.0, 40.0, np.nan],
+        'Students':[1, 1, 1, 1, 1, 1, 1]})
+
+
+@pytest.mark.parametrize('y_value', ['Score', 'Students'])
+@pytest.mark.parametrize('pivot_aggfunc', ['sum', 'count', 'mean'])
+@pytest.mark.parametrize('index_columns', [['School'], ['Starting_Year'],
+['Starting_Year', 'School'], []])
+def test_bincount_matches_pivot_table(df_rows, y_value, pivot_aggfunc,
+    index_columns):
+    df_pivot = afv.pivot_with_bincount(df_rows, y_value, index_columns,
+    pivot_aggfunc)
+    if len(index_columns) == 0:
+        expected_value = df_rows[y_value].agg(pivot_aggfunc)
+        assert df_pivot[y_value].tolist() == [expected_value]
+        return
+    pd.testing.assert_frame_equal(df_pivot, df_rows.pivot_table(
+        index = index_columns, values = y_value, aggfunc = pivot_aggfunc,
+        observed = True).reset_index(), check_dtype = False)
+
+
+def test_pivots_fall_back_to_pivot_table(df_rows, monkeypatch):
+    monkeypatch.setattr(afv, 'bincount_max_groups', 2)
+    assert afv.pivot_with_bincount(df_rows, 'Score',
+    ['Starting_Year', 'School'], 'sum') is None
+    assert afv.pivot_with_bincount(df_rows, 'Score', ['School'],
+    'median') is None
+    pd.testing.assert_frame_equal(afv.create_pivot_for_charts(df_rows,
+    'Score', ['Starting_Year', 'School'], 'mean')[
+        ['Starting_Year', 'School', 'Score']],
+    df_rows.pivot_table(index = ['Starting_Year', 'School'],
+    values = 'Score', aggfunc = 'mean', observed = True).reset_index(),
+    check_dtype = False, check_categorical = False)
+
+
+@pytest.mark.parametrize('filter_list', filter_lists)
+@pytest.mark.parametrize('table_name, y_value, comparison_values, \
+pivot_aggfunc', pivot_requests)
+def test_rolled_up_pivot_matches_pivot_table(clean_caches, monkeypatch,
+    table_name, y_value, comparison_values, pivot_aggfunc, filter_list):
+    monkeypatch.setattr(afv, 'use_cached_rollups', True)
+    # Creating a pivot table with one more comparison first, so that
+    # the requested one can be rolled up from its group totals:
+    extra_comparison = next(column for column in ['Gender', 'Race']
+    if column not in comparison_values)
+    afv.create_pivot_for_table(table_name, y_value,
+    comparison_values + [extra_comparison], pivot_aggfunc,
+    filter_list = filter_list)
+    rollup_count = afv.pivot_cache_stats['rollups']
+    data_source_pivot = afv.create_pivot_for_table(table_name, y_value,
+    comparison_values, pivot_aggfunc, filter_list = filter_list)
+    # (Only the functions within cube_aggregate_functions can be rolled up
+    # from group totals.)
+    if pivot_aggfunc in afv.cube_aggregate_functions:
+        assert afv.pivot_cache_stats['rollups'] == rollup_count + 1
+    assert_pivots_match(data_source_pivot, create_expected_pivot(table_name,
+    y_value, comparison_values, pivot_aggfunc, filter_list), y_value,
+    comparison_values)
+
+
+def test_group_totals_keep_rows_with_missing_values(clean_caches,
+    monkeypatch):
+    '''Group totals keep rows with missing comparison values within groups
+    of their own, so they can be rolled up over those comparisons without
+    losing any rows.'''
+    monkeypatch.setattr(afv, 'use_cached_rollups', True)
+    monkeypatch.setattr(afv, 'use_aggregation_cubes', False)
+    df = afv.get_table('test_results').copy()
+    df.loc[df.index[::7], 'Race'] = None
+    afv.store_tables({'test_results':(df, None)})
+    afv.create_pivot_for_table('test_results', 'Score', ['School', 'Race'],
+    'mean')
+    rollup_count = afv.pivot_cache_stats['rollups']
+    data_source_pivot = afv.create_pivot_for_table('test_results', 'Score',
+    ['School'], 'mean')
+    assert afv.pivot_cache_stats['rollups'] == rollup_count + 1
+    assert_pivots_match(data_source_pivot, df.pivot_table(index = 'School',
+    values = 'Score', aggfunc = 'mean', observed = True).reset_index(),
+    'Score', ['School'])
+
+
+def test_box_plot_pivot_matches_quantiles(clean_caches):
+    settings = dict(filter_list = filter_lists[-1], color_value = 'School')
+    data_source_pivot = create_pivot('cube', 'test_results', 'Score',
+    ['Period', 'School'], 'box', **settings)
+    pd.testing.assert_frame_equal(data_source_pivot.reset_index(drop = True),
+    create_pivot('rows', 'test_results', 'Score', ['Period', 'School'],
+    'box', **settings).reset_index(drop = True), check_dtype = False,
+    check_categorical = False)
+    for column, pivot_aggfunc in [('Score_Q1', 'p25'), ('Score', 'median'),
+        ('Score_Q3', 'p75')]:
+        quantile_pivot = data_source_pivot[['Period', 'School', column]]
+        assert_pivots_match(quantile_pivot.rename(columns = {
+            column:'Score'}), create_expected_pivot('test_results', 'Score',
+        ['Period', 'School'], pivot_aggfunc, filter_lists[-1]), 'Score',
+        ['Period', 'School'])
+
+
+@pytest.mark.parametrize('use_aggregation_cubes, use_cached_rollups', [
+    (True, False), (True, True), (False, False)])
+@pytest.mark.parametrize('table_name, y_value, comparison_values, \
+pivot_aggfunc', pivot_requests + [('test_results', 'Score',
+['Period', 'School'], 'box')])
+def test_empty_pivot_has_pivot_columns(clean_caches, monkeypatch,
+    use_aggregation_cubes, use_cached_rollups, table_name, y_value,
+    comparison_values, pivot_aggfunc):
+    monkeypatch.setattr(afv, 'use_aggregation_cubes', use_aggregation_cubes)
+    monkeypatch.setattr(afv, 'use_cached_rollups', use_cached_rollups)
+    pivot_settings = dict(table_name = table_name, y_value = y_value,
+    comparison_values = comparison_values, pivot_aggfunc = pivot_aggfunc,
+    color_value = comparison_values[-1], reorder_bars_by = 'Grade')
+    data_source_pivot = afv.create_pivot_for_table(**pivot_settings)
+    empty_pivot = afv.create_pivot_for_table(**pivot_settings,
+    filter_list = [('School', [])])
+    assert len(data_source_pivot) > 0
+    assert len(empty_pivot) == 0
+    assert list(empty_pivot.columns) == list(data_source_pivot.columns)
@@ -0,0 +1,47 @@
+# Tests for the read-only tables that table_cache shares between callbacks
+# (see make_table_read_only())
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import app_functions_and_variables as afv
+
+table_names = ['curr_enrollment', 'test_results', 'grad_outcomes']
+
+
+@pytest.mark.parametrize('table_name', table_names)
+def test_cached_tables_are_read_only(clean_caches, table_name):
+    df = afv.get_table(table_name)
+    for column in df.columns:
+        values = df[column].array
+        if isinstance(df[column].dtype, pd.CategoricalDtype):
+            assert not values.codes.flags.writeable, column
+        elif isinstance(values, pd.arrays.NumpyExtensionArray):
+            assert not values.to_numpy().flags.writeable, column
+    with pytest.raises(ValueError):
+        df['Student_ID'].to_numpy()[0] = 0
+
+
+def test_read_only_tables_share_their_data():
+    df = pd.DataFrame({'School':pd.Categorical(['DA', 'HA', 'DA']),
+    'Students':np.array([1, 2, 3], dtype = 'int8')})
+    df_read_only = afv.make_table_read_only(df)
+    pd.testing.assert_frame_equal(df_read_only, df)
+    assert np.shares_memory(df_read_only['Students'].to_numpy(),
+    df['Students'].to_numpy())
+    # Copies of the table can still be modified:
+    df_copy = df_read_only[df_read_only['School'] == 'DA']
+    df_copy['Students'] = df_copy['Students'] * 2
+    assert df_read_only['Students'].tolist() == [1, 2, 3]
+
+
+def test_pivots_and_charts_leave_cached_tables_unchanged(clean_caches):
+    df = afv.get_table('test_results')
+    df_before = df.copy()
+    data_source_pivot = afv.create_pivot_for_table('test_results', 'Score',
+    ['School', 'Grade'], 'mean', filter_list = [('Gender', ['Female'])],
+    color_value = 'School')
+    afv.create_interactive_bar_chart_and_table(data_source_pivot, 'Score',
+    ['School', 'Grade'], color_value = 'School')
+    pd.testing.assert_frame_equal(afv.get_table('test_results'), df_before)
@@ -0,0 +1,88 @@
+# Tests for the Plotly typed arrays that encode_typed_array() creates when
+# use_compact_serialization is True
+
+import base64
+import json
+
+import numpy as np
+import pandas as pd
+import plotly.io as pio
+import pytest
+
+import app_functions_and_variables as afv
+
+
+def decode_typed_array(typed_array):
+    '''Decodes a typed array in the same way that plotly.js would.'''
+    return np.frombuffer(base64.b64decode(typed_array['bdata']),
+    dtype = '<' + typed_array['dtype'])
+
+
+@pytest.mark.parametrize('values, expected_dtype', [
+    (np.array([0.5, -1.25, 1e300, np.nan]), 'f8'),
+    (np.array([1.5, 2.5], dtype = 'float32'), 'f4'),
+    (np.array([1.5, 2.5], dtype = '>f8'), 'f8'),
+    (np.array([0, 100, -100]), 'i1'),
+    (np.array([0, 255]), 'u1'),
+    (np.array([-1, 1000]), 'i2'),
+    (np.array([0, 60000]), 'u2'),
+    (np.array([-1, 100000]), 'i4'),
+    (np.array([0, 3000000000]), 'u4'),
+    # (plotly.js can't decode 64-bit integers.)
+    (np.array([-1, 2 ** 40]), 'f8'),
+    (np.array([True, False]), 'i1'),
+    (np.array([], dtype = 'int64'), 'i1')])
+def test_typed_arrays_round_trip(values, expected_dtype):
+    typed_array = afv.encode_typed_array(values)
+    assert typed_array['dtype'] == expected_dtype
+    np.testing.assert_array_equal(decode_typed_array(typed_array),
+    values.astype('float64'))
+    # The encoded array must also survive JSON serialization:
+    assert json.loads(json.dumps(typed_array)) == typed_array
+
+
+def test_non_numeric_arrays_are_unchanged():
+    values = np.array(['DA', 'HA'], dtype = object)
+    assert afv.encode_typed_array(values) is values
+
+
+@pytest.mark.parametrize('use_compact_serialization', [False, True])
+def test_trace_values(use_compact_serialization, monkeypatch):
+    '''With use_compact_serialization enabled, columns with at least
+    typed_array_min_length values are sent as typed arrays. All other
+    columns are sent as lists.'''
+    monkeypatch.setattr(afv, 'use_compact_serialization',
+    use_compact_serialization)
+    df = pd.DataFrame({'Score':[50.5, 60.25, 70.0, 80.75],
+    'Students':[3, 400, 5, 6]})
+    for column in df.columns:
+        trace_values = afv.get_trace_values(df, column)
+        if use_compact_serialization == True:
+            assert decode_typed_array(trace_values).tolist() == df[
+                column].tolist()
+        else:
+            assert trace_values == df[column].tolist()
+        assert afv.get_trace_values(df.iloc[:afv.typed_array_min_length - 1],
+        column) == df[column].iloc[:afv.typed_array_min_length - 1].tolist()
+
+
+def test_typed_arrays_are_opt_in():
+    assert afv.use_compact_serialization == False
+
+
+def test_compact_charts_match_default_charts(clean_caches, monkeypatch):
+    '''Charts should show the same values with either setting; only their
+    encoding differs.'''
+    data_source_pivot = afv.create_pivot_for_table('curr_enrollment',
+    'Students', ['School', 'Grade'], 'sum', color_value = 'School')
+    def get_chart_values():
+        chart = afv.create_interactive_bar_chart_and_table(
+            data_source_pivot, 'Students', ['School', 'Grade'],
+            color_value = 'School')[0]
+        figure = json.loads(pio.to_json(chart, validate = False))
+        return [[trace['x'], decode_typed_array(trace['y']).tolist()
+        if isinstance(trace['y'], dict) else trace['y']]
+        for trace in figure['data']]
+    default_values = get_chart_values()
+    monkeypatch.setattr(afv, 'use_compact_serialization', True)
+    assert get_chart_values() == default_values
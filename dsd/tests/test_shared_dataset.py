@@ -0,0 +1,66 @@
+# Tests for the shared dataset, through which worker processes memory-map
+# the tables that another worker has already prepared (see
+# publish_shared_table() and read_shared_table())
+
+import os
+
+import pandas as pd
+import pytest
+
+import app_functions_and_variables as afv
+from conftest import touch_source
+
+
+@pytest.fixture
+def shared_dataset_folder(source_folder, tmp_path, monkeypatch):
+    monkeypatch.setattr(afv, 'use_shared_dataset', True)
+    monkeypatch.setattr(afv, 'shared_dataset_folder',
+    str(tmp_path / 'shared_tables'))
+    return tmp_path / 'shared_tables'
+
+
+def get_published_files(shared_dataset_folder):
+    return sorted(os.listdir(shared_dataset_folder))
+
+
+def test_published_tables_match_private_copies(shared_dataset_folder,
+    monkeypatch):
+    loaded_tables = afv.load_registered_tables()
+    assert len(get_published_files(shared_dataset_folder)) == len(
+        afv.registered_tables)
+    with afv.table_cache_lock:
+        afv.table_cache.clear()
+    monkeypatch.setattr(afv, 'use_shared_dataset', False)
+    private_tables = afv.load_registered_tables()
+    for table_name, df in loaded_tables.items():
+        pd.testing.assert_frame_equal(df, private_tables[table_name])
+    # Numeric columns reference the memory-mapped file directly:
+    assert not loaded_tables['curr_enrollment'][
+        'Student_ID'].to_numpy().flags.writeable
+
+
+def test_other_workers_map_published_tables(shared_dataset_folder,
+    monkeypatch):
+    afv.load_registered_tables()
+    # Simulating a second worker, which shouldn't need to retrieve or
+    # prepare any of the tables:
+    with afv.table_cache_lock:
+        afv.table_cache.clear()
+    def fail_retrieval(table_name, *args, **kwargs):
+        raise AssertionError(f"{table_name} was retrieved")
+    monkeypatch.setattr(afv, 'retrieve_data_from_table', fail_retrieval)
+    loaded_tables = afv.load_registered_tables()
+    assert set(loaded_tables) == set(afv.registered_tables)
+
+
+def test_changed_sources_are_published_to_new_files(shared_dataset_folder,
+    source_folder):
+    afv.load_registered_tables()
+    published_files = get_published_files(shared_dataset_folder)
+    touch_source(source_folder, 'grad_outcomes')
+    afv.load_registered_tables(tables_to_reload = ['grad_outcomes'])
+    new_files = get_published_files(shared_dataset_folder)
+    assert len(new_files) == len(published_files)
+    changed_files = set(new_files) - set(published_files)
+    assert len(changed_files) == 1
+    assert changed_files.pop().startswith('grad_outcomes_')
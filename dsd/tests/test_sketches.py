@@ -0,0 +1,123 @@
+# Tests for the accuracy of the quantile sketches behind the percentile and
+# box plot views, and of the distinct count sketches behind Unique_Students
+
+# The app's own Score column only contains whole numbers, so its sketches
+# are exact (and test_pivots.py already compares them against pandas).
+# These tests use synthetic floats instead, whose quantiles should be off
+# by no more than half of one sketch bin's width. Similarly, the app's
+# tables contain few enough Student_IDs for their distinct counts to use
+# exact bitsets, so the HyperLogLog sketches are tested with synthetic IDs.
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import app_functions_and_variables as afv
+
+row_count = 20000
+group_count = 40
+
+
+@pytest.fixture
+def df_scores():
+    '''Returns a synthetic table of skewed float scores (with a few missing
+    values) for each combination of School and Grade.'''
+    rng = np.random.default_rng(0)
+    scores = rng.gamma(2.0, 15.0, row_count)
+    scores[rng.random(row_count) < 0.01] = np.nan
+    return pd.DataFrame({
+        'School':pd.Categorical(rng.choice(['CA', 'DA', 'HA', 'SA'],
+        row_count)),
+        'Grade':pd.Categorical(rng.choice(['K', '1', '2', '3'], row_count)),
+        'Score':scores})
+
+
+def get_tolerance(values):
+    '''Returns half of the width of the (approximate) sketch bins that
+    values will be stored within.'''
+    sketch_bins = afv.get_sketch_bins(values)
+    assert sketch_bins['exact'] == False
+    return sketch_bins['width'] / 2 + 1e-9
+
+
+@pytest.mark.parametrize('pivot_aggfunc',
+list(afv.quantile_aggregate_functions))
+def test_quantile_pivot_matches_pandas_quantile(df_scores, pivot_aggfunc):
+    comparison_values = ['School', 'Grade']
+    quantile = afv.quantile_aggregate_functions[pivot_aggfunc]
+    data_source_pivot = afv.create_pivot_for_charts(df_scores, 'Score',
+    comparison_values, pivot_aggfunc).set_index(comparison_values)
+    expected_quantiles = df_scores.groupby(comparison_values,
+    observed = True)['Score'].quantile(quantile)
+    assert len(data_source_pivot) == len(expected_quantiles)
+    errors = (data_source_pivot['Score'] - expected_quantiles).abs()
+    assert errors.max() <= get_tolerance(df_scores['Score'].to_numpy())
+
+
+def test_box_plot_pivot_matches_pandas_quantile(df_scores):
+    data_source_pivot = afv.create_pivot_for_charts(df_scores, 'Score',
+    ['School'], 'box').set_index('School')
+    tolerance = get_tolerance(df_scores['Score'].to_numpy())
+    score_groups = df_scores.groupby('School', observed = True)['Score']
+    for column, quantile in [('Score_Q1', 0.25), ('Score', 0.5),
+        ('Score_Q3', 0.75)]:
+        errors = (data_source_pivot[column]
+        - score_groups.quantile(quantile)).abs()
+        assert errors.max() <= tolerance
+    assert (data_source_pivot['Score_Lower_Fence']
+    >= score_groups.min() - tolerance).all()
+    assert (data_source_pivot['Score_Upper_Fence']
+    <= score_groups.max() + tolerance).all()
+
+
+def test_merged_quantile_sketches_match_quantiles(df_scores):
+    '''Merging the sketches of several groups should produce the same
+    quantiles (within the sketches' tolerance) as the combined values, as
+    happens when a pivot table is answered from an aggregation cube.'''
+    rng = np.random.default_rng(1)
+    values = df_scores['Score'].to_numpy()
+    row_positions = rng.integers(0, group_count, row_count)
+    sketch_bins = afv.get_sketch_bins(values)
+    sketches = afv.create_quantile_sketches(values, row_positions,
+    group_count, sketch_bins)
+    # Merging the groups into four, based on their positions' remainders:
+    merged_sketches = afv.merge_quantile_sketches(sketches,
+    np.arange(group_count) % 4, 4)
+    merged_positions = row_positions % 4
+    for quantile in afv.quantile_aggregate_functions.values():
+        expected_quantiles = [np.nanquantile(values[merged_positions
+        == position], quantile) for position in range(4)]
+        errors = np.abs(afv.calculate_sketch_quantiles(merged_sketches,
+        sketch_bins, quantile) - expected_quantiles)
+        assert errors.max() <= get_tolerance(values)
+
+
+def test_merged_distinct_count_sketches_match_nunique():
+    '''Distinct counts from merged HyperLogLog sketches should fall within
+    three standard errors of pandas' nunique().'''
+    rng = np.random.default_rng(2)
+    student_ids = pd.Series(rng.integers(0, 200000, row_count * 10))
+    row_positions = rng.integers(0, group_count, len(student_ids))
+    distinct_count_sketches = afv.build_distinct_count_sketches(student_ids,
+    row_positions, group_count)
+    assert distinct_count_sketches['type'] == 'hyperloglog'
+    merged_sketches = afv.merge_distinct_count_sketches('hyperloglog',
+    distinct_count_sketches['sketches'], np.arange(group_count) % 4, 4)
+    expected_counts = student_ids.groupby(row_positions % 4).nunique()
+    relative_errors = np.abs(afv.count_distinct_values('hyperloglog',
+    merged_sketches) / expected_counts.to_numpy() - 1)
+    assert relative_errors.max() <= 3 * 1.04 / np.sqrt(
+        2 ** afv.hyperloglog_precision)
+
+
+def test_distinct_count_bitsets_match_nunique():
+    rng = np.random.default_rng(3)
+    student_ids = pd.Series(rng.integers(0, 5000, row_count))
+    row_positions = rng.integers(-1, group_count, row_count)
+    distinct_count_sketches = afv.build_distinct_count_sketches(student_ids,
+    row_positions, group_count)
+    assert distinct_count_sketches['type'] == 'bitset'
+    expected_counts = student_ids[row_positions >= 0].groupby(
+        row_positions[row_positions >= 0]).nunique()
+    assert afv.count_distinct_values('bitset',
+    distinct_count_sketches['sketches']).tolist() == expected_counts.tolist()
@@ -0,0 +1,90 @@
+# Tests for the snapshot cache within retrieve_data_from_table() (see
+# get_source_signature())
+
+# Each test copies curr_enrollment.csv into a temporary folder and runs from
+# a subfolder of it (just as the app runs from the dsd folder), so that the
+# repository's own .csv files and snapshots are never modified.
+
+import os
+import shutil
+
+import pandas as pd
+import pytest
+import sqlalchemy
+
+import app_functions_and_variables as afv
+from conftest import dsd_folder
+
+
+@pytest.fixture
+def source_reads(tmp_path, monkeypatch):
+    '''Sets up the temporary folder described above and returns a list
+    that will receive the name of each table that gets read from its
+    source (rather than from a snapshot).'''
+    shutil.copy(os.path.join(os.path.dirname(dsd_folder),
+    'curr_enrollment.csv'), tmp_path)
+    os.mkdir(tmp_path / 'dsd')
+    monkeypatch.chdir(tmp_path / 'dsd')
+    monkeypatch.setattr(afv, 'use_snapshot_cache', True)
+    source_reads = []
+    retrieve_data_from_source = afv.retrieve_data_from_source
+    def record_source_read(table_name, *args, **kwargs):
+        source_reads.append(table_name)
+        return retrieve_data_from_source(table_name, *args, **kwargs)
+    monkeypatch.setattr(afv, 'retrieve_data_from_source',
+    record_source_read)
+    return source_reads
+
+
+def test_snapshot_is_reused_while_the_source_is_unchanged(source_reads):
+    df_source = afv.retrieve_data_from_table('curr_enrollment')
+    assert source_reads == ['curr_enrollment']
+    assert os.path.exists(os.path.join(afv.snapshot_folder,
+    'curr_enrollment.parquet'))
+    df_snapshot = afv.retrieve_data_from_table('curr_enrollment')
+    assert source_reads == ['curr_enrollment']
+    pd.testing.assert_frame_equal(df_snapshot, df_source)
+
+
+def test_snapshot_is_rebuilt_after_the_csv_is_modified(source_reads):
+    afv.retrieve_data_from_table('curr_enrollment')
+    file_stats = os.stat('../curr_enrollment.csv')
+    os.utime('../curr_enrollment.csv', ns = (file_stats.st_atime_ns,
+    file_stats.st_mtime_ns + 10 ** 9))
+    afv.retrieve_data_from_table('curr_enrollment')
+    assert source_reads == ['curr_enrollment'] * 2
+    # The new snapshot matches the source again:
+    afv.retrieve_data_from_table('curr_enrollment')
+    assert source_reads == ['curr_enrollment'] * 2
+
+
+def test_snapshot_is_rebuilt_after_rows_are_added(source_reads):
+    df_source = afv.retrieve_data_from_table('curr_enrollment')
+    df_source.iloc[:1].assign(Student_ID = df_source['Student_ID'].max()
+    + 1).to_csv('../curr_enrollment.csv', mode = 'a', header = False,
+    index = False)
+    df_updated = afv.retrieve_data_from_table('curr_enrollment')
+    assert source_reads == ['curr_enrollment'] * 2
+    assert len(df_updated) == len(df_source) + 1
+
+
+def test_database_snapshot_is_rebuilt_after_its_row_count_changes(
+    source_reads, tmp_path, monkeypatch):
+    '''Database tables are compared by their row counts and maximum keys,
+    so a local SQLite database stands in for the online one here.'''
+    engine = sqlalchemy.create_engine(f"sqlite:///{tmp_path / 'school.db'}")
+    df_source = pd.read_csv('../curr_enrollment.csv')
+    df_source.to_sql('curr_enrollment', engine, index = False)
+    monkeypatch.setattr(afv, 'read_from_online_db', True)
+    monkeypatch.setattr(afv, 'elephantsql_engine', engine, raising = False)
+    afv.retrieve_data_from_table('curr_enrollment')
+    afv.retrieve_data_from_table('curr_enrollment')
+    assert source_reads == ['curr_enrollment']
+    # Removing a row (which leaves the maximum key unchanged):
+    with engine.begin() as connection:
+        connection.execute(sqlalchemy.text("delete from curr_enrollment \
+where Student_ID = :student_id"),
+        {'student_id':int(df_source['Student_ID'].min())})
+    df_updated = afv.retrieve_data_from_table('curr_enrollment')
+    assert source_reads == ['curr_enrollment'] * 2
+    assert len(df_updated) == len(df_source) - 1
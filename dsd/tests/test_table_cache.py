@@ -0,0 +1,209 @@
+# Tests for table_cache, which loads the registered tables on demand,
+# evicts them once they are no longer needed, and reloads them when their
+# sources change, and for the version numbers that pivot_cache relies on
+# (see the 'Keeping track of the tables that are currently in memory' and
+# 'Caching pivot tables' sections of app_functions_and_variables.py)
+
+import os
+import time
+
+import app_functions_and_variables as afv
+from conftest import touch_source
+
+
+def get_table_versions():
+    with afv.table_cache_lock:
+        return {table_name:entry['version']
+        for table_name, entry in afv.table_cache.items()}
+
+
+def test_tables_are_loaded_on_demand(clean_caches, monkeypatch):
+    retrieved_tables = []
+    retrieve_data_from_table = afv.retrieve_data_from_table
+    def record_retrieval(table_name, *args, **kwargs):
+        retrieved_tables.append(table_name)
+        return retrieve_data_from_table(table_name, *args, **kwargs)
+    monkeypatch.setattr(afv, 'retrieve_data_from_table', record_retrieval)
+    assert 'grad_outcomes' not in afv.table_cache
+    df = afv.get_table('grad_outcomes')
+    assert 'grad_outcomes' in afv.table_cache
+    assert afv.get_table('grad_outcomes') is df
+    assert retrieved_tables == ['grad_outcomes']
+
+
+def test_idle_tables_are_evicted(clean_caches):
+    afv.get_table('curr_enrollment')
+    afv.get_table('grad_outcomes')
+    afv.table_cache['grad_outcomes']['last_access'] = time.monotonic(
+        ) - afv.table_idle_timeout_seconds - 1
+    afv.evict_tables()
+    assert set(afv.table_cache) == {'curr_enrollment'}
+
+
+def test_tables_in_use_are_not_evicted(clean_caches):
+    with afv.use_table('grad_outcomes') as df:
+        afv.table_cache['grad_outcomes']['last_access'] = time.monotonic(
+            ) - afv.table_idle_timeout_seconds - 1
+        afv.evict_tables()
+        assert afv.table_cache['grad_outcomes']['df'] is df
+    assert afv.table_cache['grad_outcomes']['users'] == 0
+
+
+def test_least_recently_used_tables_are_evicted_first(clean_caches,
+    monkeypatch):
+    afv.get_table('grad_outcomes')
+    afv.get_table('curr_enrollment')
+    afv.get_table('grad_outcomes')
+    # Leaving enough room for one of the two tables:
+    monkeypatch.setattr(afv, 'table_memory_budget_bytes', max(
+        entry['memory_usage'] for entry in afv.table_cache.values()))
+    afv.evict_tables()
+    assert set(afv.table_cache) == {'grad_outcomes'}
+
+
+def test_loading_a_dependent_table_keeps_its_dependencies(clean_caches):
+    afv.get_table('curr_enrollment')
+    versions = get_table_versions()
+    afv.get_table('test_results') # (test_results depends on
+    # curr_enrollment.)
+    new_versions = get_table_versions()
+    assert new_versions['curr_enrollment'] == versions['curr_enrollment']
+    assert 'test_results' in new_versions
+
+
+def test_reloading_a_table_keeps_its_dependencies(clean_caches):
+    afv.get_table('test_results')
+    versions = get_table_versions()
+    afv.load_registered_tables(['test_results'],
+    tables_to_reload = ['test_results'])
+    new_versions = get_table_versions()
+    assert new_versions['curr_enrollment'] == versions['curr_enrollment']
+    assert new_versions['test_results'] > versions['test_results']
+
+
+def test_reloading_a_dependency_reloads_every_listed_table(clean_caches):
+    afv.get_table('test_results')
+    versions = get_table_versions()
+    tables_to_reload = afv.get_dependent_tables(['curr_enrollment'])
+    assert set(tables_to_reload) >= {'curr_enrollment', 'test_results'}
+    tables_to_reload = [table_name for table_name in tables_to_reload
+    if table_name in versions]
+    afv.load_registered_tables(tables_to_reload,
+    tables_to_reload = tables_to_reload)
+    new_versions = get_table_versions()
+    for table_name in tables_to_reload:
+        assert new_versions[table_name] > versions[table_name]
+
+
+def test_unchanged_tables_are_not_refreshed(source_folder):
+    afv.load_registered_tables()
+    versions = get_table_versions()
+    assert afv.refresh_changed_tables() == []
+    assert get_table_versions() == versions
+
+
+def test_refresh_reloads_only_the_changed_table(source_folder):
+    afv.load_registered_tables()
+    versions = get_table_versions()
+    tables = {table_name:afv.get_table(table_name)
+    for table_name in versions}
+    touch_source(source_folder, 'grad_outcomes')
+    assert afv.refresh_changed_tables() == ['grad_outcomes']
+    new_versions = get_table_versions()
+    assert new_versions['grad_outcomes'] > versions['grad_outcomes']
+    for table_name in ['curr_enrollment', 'test_results']:
+        assert new_versions[table_name] == versions[table_name]
+        assert afv.get_table(table_name) is tables[table_name]
+    assert afv.get_table('grad_outcomes').equals(tables['grad_outcomes'])
+
+
+def test_refresh_reloads_the_dependents_of_a_changed_table(source_folder):
+    afv.load_registered_tables()
+    versions = get_table_versions()
+    touch_source(source_folder, 'curr_enrollment')
+    assert sorted(afv.refresh_changed_tables()) == ['curr_enrollment',
+    'test_results']
+    new_versions = get_table_versions()
+    assert new_versions['grad_outcomes'] == versions['grad_outcomes']
+    for table_name in ['curr_enrollment', 'test_results']:
+        assert new_versions[table_name] > versions[table_name]
+
+
+def create_enrollment_pivot(**settings):
+    return afv.create_pivot_for_table('curr_enrollment', 'Students',
+    ['School'], 'sum', **settings)
+
+
+def get_cached_pivot_keys(table_name):
+    with afv.pivot_cache_lock:
+        return [key for key in afv.pivot_cache if key[0] == table_name]
+
+
+def test_refresh_removes_the_changed_tables_pivots(source_folder):
+    afv.load_registered_tables()
+    versions = get_table_versions()
+    tables = {table_name:afv.get_table(table_name)
+    for table_name in versions}
+    enrollment_pivot = create_enrollment_pivot()
+    afv.create_pivot_for_table('grad_outcomes', 'Students',
+    ['Starting_Year', 'Outcome'], 'sum')
+    enrollment_keys = get_cached_pivot_keys('curr_enrollment')
+    assert len(get_cached_pivot_keys('grad_outcomes')) > 0
+
+    touch_source(source_folder, 'grad_outcomes')
+    assert afv.refresh_changed_tables() == ['grad_outcomes']
+    new_versions = get_table_versions()
+    assert new_versions['grad_outcomes'] > versions['grad_outcomes']
+    # The changed table's pivot tables are removed without waiting for a
+    # new pivot table to be stored:
+    assert get_cached_pivot_keys('grad_outcomes') == []
+    assert afv.pivot_cache_stats['bytes'] == sum(pivot_size
+    for data_source_pivot, pivot_size in afv.pivot_cache.values())
+    # The other tables, and their pivot tables, are left alone:
+    for table_name in ['curr_enrollment', 'test_results']:
+        assert new_versions[table_name] == versions[table_name]
+        assert afv.get_table(table_name) is tables[table_name]
+    assert get_cached_pivot_keys('curr_enrollment') == enrollment_keys
+    assert create_enrollment_pivot() is enrollment_pivot
+
+
+def test_pivot_cache_is_reused_until_its_table_is_reloaded(clean_caches):
+    first_pivot = create_enrollment_pivot()
+    assert create_enrollment_pivot() is first_pivot
+    afv.load_registered_tables(['curr_enrollment'],
+    tables_to_reload = ['curr_enrollment'])
+    reloaded_pivot = create_enrollment_pivot()
+    assert reloaded_pivot is not first_pivot
+    assert reloaded_pivot.equals(first_pivot)
+    # Pivot tables from the old version are removed once a pivot table
+    # from the new version is stored:
+    version = get_table_versions()['curr_enrollment']
+    with afv.pivot_cache_lock:
+        assert all(key[1] == version for key in afv.pivot_cache
+        if key[0] == 'curr_enrollment')
+
+
+def test_pivot_cache_key_ignores_filter_order(clean_caches):
+    entry = afv.get_table_entry('curr_enrollment')
+    def get_key(filter_list):
+        return afv.get_pivot_cache_key('curr_enrollment', entry['version'],
+        entry['dimension_domains'], 'Students', ['School'], 'sum',
+        filter_list, None, True, None, True, '')
+    assert (get_key([('School', ['DA', 'HA']), ('Gender', ['Female'])])
+    == get_key([('Gender', ['Female']), ('School', ['HA', 'DA', 'HA'])]))
+    # Filters that select every value are left out of the key:
+    assert get_key([('School', ['DA']), ('Gender', ['Female', 'Male'])]) \
+    == get_key([('School', ['DA'])])
+
+
+def test_pivot_cache_stays_within_its_budget(clean_caches, monkeypatch):
+    first_pivot = create_enrollment_pivot()
+    pivot_size = afv.pivot_cache_stats['bytes']
+    monkeypatch.setattr(afv, 'pivot_cache_budget_bytes', pivot_size * 2)
+    evictions = afv.pivot_cache_stats['evictions']
+    for schools in [['CA'], ['DA'], ['HA']]:
+        create_enrollment_pivot(filter_list = [('School', schools)])
+    assert afv.pivot_cache_stats['bytes'] <= pivot_size * 2
+    assert afv.pivot_cache_stats['evictions'] > evictions
+    # The least recently used pivot table was evicted first:
+    assert create_enrollment_pivot() is not first_pivot
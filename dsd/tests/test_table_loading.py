@@ -0,0 +1,47 @@
+# Tests for load_registered_tables(), which retrieves the registered tables
+# concurrently and then prepares them in dependency order
+
+import threading
+
+import pytest
+
+import app_functions_and_variables as afv
+
+
+def test_tables_are_retrieved_concurrently(clean_caches, monkeypatch):
+    '''Each retrieval waits until all of the tables' retrievals have
+    started, which would time out if they ran one after another.'''
+    table_names = list(afv.registered_tables)
+    retrieval_barrier = threading.Barrier(len(table_names), timeout = 10)
+    retrieve_data_from_table = afv.retrieve_data_from_table
+    def wait_for_other_retrievals(table_name, *args, **kwargs):
+        retrieval_barrier.wait()
+        return retrieve_data_from_table(table_name, *args, **kwargs)
+    monkeypatch.setattr(afv, 'retrieve_data_from_table',
+    wait_for_other_retrievals)
+    assert len(table_names) <= afv.startup_loader_threads
+    loaded_tables = afv.load_registered_tables(table_names)
+    assert set(table_names) <= set(loaded_tables)
+
+
+def test_dependencies_are_loaded_and_prepared_first(clean_caches):
+    loaded_tables = afv.load_registered_tables(['test_results'])
+    assert 'curr_enrollment' in loaded_tables
+    df_test_results = loaded_tables['test_results']
+    df_curr_enrollment = loaded_tables['curr_enrollment']
+    # The demographic values from curr_enrollment have been merged in:
+    for column in ['Gender', 'Race', 'Ethnicity']:
+        student_values = df_curr_enrollment.set_index('Student_ID')[
+            column]
+        assert df_test_results[column].astype('object').tolist() == \
+        student_values.loc[df_test_results['Student_ID']].astype(
+            'object').tolist()
+
+
+@pytest.mark.parametrize('table_name', ['curr_enrollment', 'grad_outcomes'])
+def test_loaded_tables_match_their_sources(clean_caches, table_name):
+    table_settings = afv.registered_tables[table_name]
+    df = afv.load_registered_tables([table_name])[table_name]
+    assert df.equals(afv.retrieve_data_from_table(table_name,
+    columns = table_settings['columns'],
+    filters = table_settings['filters']))
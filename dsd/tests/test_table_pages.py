@@ -0,0 +1,137 @@
+# Tests for the server-side paging, sorting, and filtering of the
+# dashboards' tables (see create_table_page())
+
+import pandas as pd
+import pytest
+
+import app_functions_and_variables as afv
+
+
+@pytest.fixture
+def df_pivot():
+    '''Returns a small pivot table with a categorical column, an ordered
+    categorical column, a text column with spaces, and numeric columns.'''
+    return pd.DataFrame({
+        'School':pd.Categorical(['HA', 'DA', 'CA', 'DA', 'HA', 'CA', 'SA']),
+        'Grade':pd.Categorical(['K', '10', '9', '9', 'K', '10', '12'],
+        categories = afv.ordered_dimensions['Grade'], ordered = True),
+        'Outcome':['Trade School', '4 Year College', 'Employment',
+        'Trade School', '2 Year College', '4 Year College', 'Other/Unknown'],
+        'Students':[12, 40, 7, 25, 40, 3, 18],
+        'Score':[61.25, 70.5, 55.0, 82.75, 90.0, 48.5, 66.0]})
+
+
+def get_page(df_pivot, page_current = 0, page_size = 20, **settings):
+    return afv.create_table_page(df_pivot, page_current, page_size,
+    **settings)
+
+
+def test_pages_split_the_table(df_pivot):
+    records, page_count, page_current = get_page(df_pivot, 1, 3)
+    assert (page_count, page_current) == (3, 1)
+    assert records == df_pivot.iloc[3:6].to_dict('records')
+    records, page_count, page_current = get_page(df_pivot, 2, 3)
+    assert (len(records), page_current) == (1, 2)
+
+
+@pytest.mark.parametrize('filter_query, expected_page_count', [
+    ('{Students} > 10', 2), ('{School} = ZZ', 1)])
+def test_pages_are_clamped_when_the_table_shrinks(df_pivot, filter_query,
+    expected_page_count):
+    '''If a filter leaves fewer pages than the page being viewed, the last
+    remaining page is returned instead.'''
+    records, page_count, page_current = get_page(df_pivot, 2, 3,
+    filter_query = filter_query)
+    assert page_count == expected_page_count
+    assert page_current == expected_page_count - 1
+    df_filtered = afv.filter_table_rows(df_pivot, filter_query)
+    assert records == df_filtered.iloc[page_current * 3:
+    (page_current + 1) * 3].to_dict('records')
+
+
+def test_empty_tables_have_one_page():
+    assert afv.create_table_page(None, 3, 20) == ([], 1, 0)
+    assert afv.create_table_page(pd.DataFrame({'School':[]}), 3, 20) == (
+        [], 1, 0)
+
+
+def test_tables_are_sorted_by_several_columns(df_pivot):
+    sort_by = [{'column_id':'Students', 'direction':'desc'},
+    {'column_id':'Grade', 'direction':'asc'},
+    {'column_id':'Missing_Column', 'direction':'asc'}]
+    records = get_page(df_pivot, sort_by = sort_by)[0]
+    grade_order = afv.ordered_dimensions['Grade']
+    assert [(record['Students'], record['Grade']) for record in records] \
+    == sorted(zip(df_pivot['Students'], df_pivot['Grade']),
+    key = lambda row: (-row[0], grade_order.index(row[1])))
+
+
+def test_sorts_are_stable(df_pivot):
+    '''Rows with the same sort value keep their original order.'''
+    records = get_page(df_pivot, sort_by = [{'column_id':'School',
+    'direction':'desc'}])[0]
+    assert [(record['School'], record['Grade']) for record in records] == [
+        ('SA', '12'), ('HA', 'K'), ('HA', 'K'), ('DA', '10'), ('DA', '9'),
+        ('CA', '9'), ('CA', '10')]
+
+
+# (filter_query, a function that returns the rows the query should keep)
+filter_queries = [
+    ('{Students} ge 25', lambda df: df['Students'] >= 25),
+    ('{Students} >= 25', lambda df: df['Students'] >= 25),
+    ('{Students} le 12', lambda df: df['Students'] <= 12),
+    ('{Students} <= 12', lambda df: df['Students'] <= 12),
+    ('{Score} lt 61.25', lambda df: df['Score'] < 61.25),
+    ('{Score} < 61.25', lambda df: df['Score'] < 61.25),
+    ('{Score} gt 66', lambda df: df['Score'] > 66),
+    ('{Score} > 66', lambda df: df['Score'] > 66),
+    ('{School} ne DA', lambda df: df['School'] != 'DA'),
+    ('{School} != DA', lambda df: df['School'] != 'DA'),
+    ('{Students} eq 40', lambda df: df['Students'] == 40),
+    ('{Students} = 40', lambda df: df['Students'] == 40),
+    ('{Grade} = 9', lambda df: df['Grade'] == '9'),
+    ('{School} s= HA', lambda df: df['School'] == 'HA'),
+    ('{Outcome} contains college', lambda df: df['Outcome'].str.contains(
+        'College')),
+    ('{Outcome} icontains COLLEGE', lambda df: df['Outcome'].str.contains(
+        'College')),
+    ('{Outcome} datestartswith Trade', lambda df: df['Outcome'].str.startswith(
+        'Trade')),
+    ('{Students} > 10 && {School} contains A && {Score} < 80',
+    lambda df: (df['Students'] > 10) & (df['Score'] < 80))]
+
+
+@pytest.mark.parametrize('filter_query, expected_rows', filter_queries)
+def test_filter_operators(df_pivot, filter_query, expected_rows):
+    pd.testing.assert_frame_equal(afv.filter_table_rows(df_pivot,
+    filter_query), df_pivot[expected_rows(df_pivot)])
+
+
+@pytest.mark.parametrize('filter_query', ['{Outcome} = "Trade School"',
+"{Outcome} eq 'Trade School'", '{Outcome} contains "Trade Sch"',
+'{Outcome} = `Trade School`'])
+def test_quoted_values_can_contain_spaces(df_pivot, filter_query):
+    pd.testing.assert_frame_equal(afv.filter_table_rows(df_pivot,
+    filter_query), df_pivot[df_pivot['Outcome'] == 'Trade School'])
+
+
+@pytest.mark.parametrize('filter_query', ['', None, 'Students > 10',
+'{Students', '{Students} >', '{Students} between 5', '{Students} > abc',
+'{Missing_Column} = 5', '{Outcome} = "Trade', '&&', '{} = 5'])
+def test_malformed_queries_are_ignored(df_pivot, filter_query):
+    assert afv.filter_table_rows(df_pivot, filter_query) is df_pivot
+    records, page_count, page_current = get_page(df_pivot,
+    filter_query = filter_query)
+    assert records == df_pivot.to_dict('records')
+
+
+def test_malformed_conditions_leave_the_others_applied(df_pivot):
+    pd.testing.assert_frame_equal(afv.filter_table_rows(df_pivot,
+    '{Students} > abc && {School} = DA && {Missing_Column} = 5'),
+    df_pivot[df_pivot['School'] == 'DA'])
+
+
+def test_only_the_current_page_is_rounded(df_pivot):
+    records = get_page(df_pivot, 0, 2, table_round_precision = 0)[0]
+    assert [record['Score'] for record in records] == [61.0, 70.0]
+    assert df_pivot['Score'].iloc[0] == 61.25
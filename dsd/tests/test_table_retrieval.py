@@ -0,0 +1,69 @@
+# Tests for the column and row selection that retrieve_data_from_table()
+# pushes down to each table's source (see filter_rows())
+
+import os
+
+import pandas as pd
+import pytest
+import sqlalchemy
+
+import app_functions_and_variables as afv
+from conftest import dsd_folder
+
+columns = ['Student_ID', 'School', 'Grade', 'Gender']
+filters = [('School', ['DA', 'HA']), ('Grade', ['K', '3', 12])]
+
+
+@pytest.fixture(params = ['csv', 'sql'])
+def source(request, tmp_path, monkeypatch):
+    '''Reads tables from the local .csv files or (via the online database
+    code path) from a local SQLite copy of curr_enrollment.'''
+    if request.param == 'sql':
+        engine = sqlalchemy.create_engine(
+            f"sqlite:///{tmp_path / 'school.db'}")
+        read_csv('curr_enrollment').to_sql('curr_enrollment', engine,
+        index = False)
+        monkeypatch.setattr(afv, 'read_from_online_db', True)
+        monkeypatch.setattr(afv, 'elephantsql_engine', engine,
+        raising = False)
+    monkeypatch.setattr(afv, 'snapshot_folder',
+    str(tmp_path / 'table_snapshots'))
+    return request.param
+
+
+def read_csv(table_name):
+    return pd.read_csv(os.path.join(os.path.dirname(dsd_folder),
+    f'{table_name}.csv'))
+
+
+def create_expected_table():
+    '''Applies columns and filters to the entire table with pandas.'''
+    df = afv.apply_table_schema(read_csv('curr_enrollment'),
+    'curr_enrollment')
+    df = df[df['School'].isin(['DA', 'HA']) & df['Grade'].isin(
+        ['K', '3', '12'])]
+    return df[columns].reset_index(drop = True)
+
+
+@pytest.mark.parametrize('use_snapshot', [False, True])
+def test_retrieval_applies_columns_and_filters(source, use_snapshot):
+    df = afv.retrieve_data_from_table('curr_enrollment', columns = columns,
+    filters = filters, use_snapshot = use_snapshot)
+    df_expected = create_expected_table()
+    assert sorted(df.columns) == sorted(columns)
+    df = df[columns].sort_values('Student_ID').reset_index(drop = True)
+    pd.testing.assert_frame_equal(df, df_expected.sort_values(
+        'Student_ID').reset_index(drop = True), check_categorical = False)
+
+
+def test_each_request_gets_its_own_snapshot(source):
+    df_all_rows = afv.retrieve_data_from_table('curr_enrollment',
+    use_snapshot = True)
+    df_filtered = afv.retrieve_data_from_table('curr_enrollment',
+    columns = columns, filters = filters, use_snapshot = True)
+    # Reading both tables again from their snapshots:
+    assert len(afv.retrieve_data_from_table('curr_enrollment',
+    use_snapshot = True)) == len(df_all_rows)
+    assert len(afv.retrieve_data_from_table('curr_enrollment',
+    columns = columns, filters = filters, use_snapshot = True)) == len(
+        df_filtered) < len(df_all_rows)
@@ -0,0 +1,57 @@
+# Tests for the compact data types that apply_table_schema() assigns to each
+# table (see table_schemas)
+
+import os
+
+import pandas as pd
+import pytest
+
+import app_functions_and_variables as afv
+from conftest import dsd_folder
+
+table_names = ['curr_enrollment', 'test_results', 'grad_outcomes']
+
+
+def read_csv(table_name):
+    return pd.read_csv(os.path.join(os.path.dirname(dsd_folder),
+    f'{table_name}.csv'))
+
+
+def get_values(column_values):
+    '''Returns the values within a column as a list of Python objects
+    (with None in place of any missing values).'''
+    column_values = column_values.astype('object')
+    return column_values.where(column_values.notna(), None).tolist()
+
+
+@pytest.mark.parametrize('use_snapshot', [False, True])
+@pytest.mark.parametrize('table_name', table_names)
+def test_tables_use_their_declared_data_types(table_name, use_snapshot):
+    df = afv.retrieve_data_from_table(table_name,
+    use_snapshot = use_snapshot)
+    for column, dtype in afv.table_schemas[table_name].items():
+        if column in df.columns:
+            assert df[column].dtype == dtype, column
+
+
+@pytest.mark.parametrize('table_name', table_names)
+def test_data_types_preserve_values(table_name):
+    df_csv = read_csv(table_name)
+    df = afv.retrieve_data_from_table(table_name, use_snapshot = False)
+    assert list(df.columns) == list(df_csv.columns)
+    for column in df.columns:
+        csv_values = df_csv[column]
+        if isinstance(df[column].dtype, pd.CategoricalDtype):
+            # Dimension values are stored as strings:
+            csv_values = csv_values.astype('str').where(csv_values.notna())
+        assert get_values(df[column]) == get_values(csv_values), column
+
+def test_grades_match_across_tables():
+    '''Grade values are stored as strings within every table, so that they
+    match each other (and the filter menus) even if a table's Grade column
+    doesn't contain any 'K' values.'''
+    grade_values = [set(afv.get_filter_options(afv.retrieve_data_from_table(
+        table_name), 'Grade')) for table_name in table_names]
+    for values in grade_values:
+        assert all(isinstance(value, str) for value in values)
+        assert values <= grade_values[0]